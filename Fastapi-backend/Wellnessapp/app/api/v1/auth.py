@@ -10,6 +10,7 @@ from db.session import get_db
 from dotenv import load_dotenv
 import os
 from services.auth_service import create_access_token
+from utils.security import hash_token
 from schemas.auth import TokenRequest  
 from core.logging import logger
 from core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
@@ -49,7 +50,7 @@ async def verify_token(token_data: TokenRequest, authorization: str = Header(...
         logger.warning("엑세스 토큰 만료, 리프레시 토큰 확인 필요.")
         
         # 엑세스 토큰이 만료된 경우 리프레시 토큰으로 사용자 정보를 조회 (ORM 방식)
-        stmt = select(Auth, User).join(User, Auth.user_id == User.id).where(Auth.refresh_token == refresh_token)
+        stmt = select(Auth, User).join(User, Auth.user_id == User.id).where(Auth.refresh_token_digest == hash_token(refresh_token))
         result = await db.execute(stmt)
         auth_entry = result.first()
 
@@ -3,9 +3,8 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.sql import func  # 추가된 부분
-from db.session import get_db
 from db.models import History, User, Meal_Type, Food_List
-from services.auth_service import validate_token
+from services.auth_service import validate_token, get_read_db
 from datetime import datetime, date, timedelta
 import logging
 from core.logging import logger
@@ -17,7 +16,7 @@ router = APIRouter()
 @router.get("/meal_records")
 async def get_meal_records(
     today: date = Query(None, description="The date for recommendation in YYYY-MM-DD format"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(validate_token)
 ):
     logger.info(f"Request received from user ID: {current_user.id}")
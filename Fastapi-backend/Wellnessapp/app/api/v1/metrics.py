@@ -0,0 +1,75 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+from db.session import pool_stats, read_engine
+from db.replica import replica_router
+from services.admission import predict_admission
+from services.auth_cache import auth_cache
+from services.model_client import model_client
+from services.prediction_cache import prediction_cache
+from services.prediction_jobs import prediction_jobs
+
+router = APIRouter()
+
+
+# 오토스케일링/모니터링용 부하 지표 (인증 없음, 워커 프로세스 단위 값)
+@router.get("")
+async def get_metrics():
+    return JSONResponse(
+        {
+            "predict_admission": predict_admission.stats(),
+            "model_api": {
+                "circuit_state": model_client.breaker.state,
+                "local_transport": model_client.local.stats() if model_client.local else None,
+            },
+            "prediction_cache": prediction_cache.stats(),
+            "prediction_jobs": prediction_jobs.stats(),
+            "auth_cache": auth_cache.stats(),
+            "db_pool": pool_stats(),
+            "db_read_pool": pool_stats(read_engine) if read_engine is not None else None,
+            "db_replica": replica_router.stats(),
+        }
+    )
+
+
+# Prometheus text 형식 (HPA/KEDA 등 외부 지표 수집기용)
+@router.get("/prometheus")
+async def get_prometheus_metrics():
+    stats = predict_admission.stats()
+    jobs = prediction_jobs.stats()
+    pool = pool_stats()
+    lines = [
+        "# TYPE wellness_predict_in_flight gauge",
+        f"wellness_predict_in_flight {stats['in_flight']}",
+        "# TYPE wellness_predict_queued gauge",
+        f"wellness_predict_queued {stats['queued']}",
+        "# TYPE wellness_predict_utilization gauge",
+        f"wellness_predict_utilization {stats['utilization']}",
+        "# TYPE wellness_predict_admitted_total counter",
+        f"wellness_predict_admitted_total {stats['admitted']}",
+        "# TYPE wellness_predict_rejected_total counter",
+        f'wellness_predict_rejected_total{{reason="queue_full"}} {stats["rejected_queue_full"]}',
+        f'wellness_predict_rejected_total{{reason="queue_timeout"}} {stats["rejected_timeout"]}',
+        "# TYPE wellness_predict_jobs_queued gauge",
+        f"wellness_predict_jobs_queued {jobs['queued']}",
+        "# TYPE wellness_predict_jobs_running gauge",
+        f"wellness_predict_jobs_running {jobs['jobs']['running']}",
+        "# TYPE wellness_predict_jobs_rejected_total counter",
+        f"wellness_predict_jobs_rejected_total {jobs['rejected']}",
+        "# TYPE wellness_db_pool_checked_out gauge",
+        f"wellness_db_pool_checked_out {pool['checked_out']}",
+        "# TYPE wellness_db_pool_utilization gauge",
+        f"wellness_db_pool_utilization {pool['utilization']}",
+        "# TYPE wellness_db_pool_checkout_wait_seconds summary",
+        f"wellness_db_pool_checkout_wait_seconds_sum {pool['checkout_wait_seconds_total']}",
+        f"wellness_db_pool_checkout_wait_seconds_count {pool['checkouts']}",
+        "# TYPE wellness_db_pool_connect_seconds summary",
+        f"wellness_db_pool_connect_seconds_sum {pool['connect_seconds_total']}",
+        f"wellness_db_pool_connect_seconds_count {pool['connects']}",
+        "# TYPE wellness_db_pool_checkout_timeouts_total counter",
+        f"wellness_db_pool_checkout_timeouts_total {pool['checkout_timeouts']}",
+        "# TYPE wellness_db_replica_healthy gauge",
+        f"wellness_db_replica_healthy {int(replica_router.healthy)}",
+        "# TYPE wellness_db_replica_lag_seconds gauge",
+        f"wellness_db_replica_lag_seconds {replica_router.lag_seconds or 0}",
+    ]
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
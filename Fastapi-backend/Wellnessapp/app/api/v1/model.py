@@ -1,179 +1,189 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, status
-import requests
+from typing import List
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 from services.auth_service import validate_token
 from db.session import get_db
-from db.models import Food_List, Recommend 
-from utils.image_processing import extract_exif_data, determine_meal_type, format_date
-from utils.s3 import upload_image_to_s3
-import mimetypes
-from io import BytesIO
-import os
-import uuid
-import datetime
-from fastapi.responses import JSONResponse
-from decimal import Decimal
+import json
+from core.config import (
+    PREDICT_JOB_SSE_KEEPALIVE_SECONDS, PRESIGNED_UPLOAD_EXPIRES_SECONDS, PRESIGNED_UPLOAD_MAX_MB, MEAL_MAX_IMAGES,
+)
 from core.logging import logger
-from utils.format import decimal_to_float
 from db import models
-from core.config import MODEL_API_URL
+from services.classify_service import (
+    classify_food_image, classify_uploaded_image, classify_meal_images, guess_image_type, invalid_type_result,
+    upload_key_for, error_result,
+)
+from services.prediction_jobs import prediction_jobs, JobQueueFull
+from schemas.upload import UploadUrlRequest, ClassifyByKeyRequest
+from utils.s3 import storage
+from utils.upload import read_image_upload, spool_image_upload, UploadRejected
 
 router = APIRouter()
 
-# 허용된 이미지 파일 형식 (MIME 타입)
-ALLOWED_MIME_TYPES = ["image/jpeg", "image/png", "image/jpg"]
-
 
 @router.post("/predict")
 async def classify_image(
     current_user: models.User = Depends(validate_token),
-    file: UploadFile = File(...), 
+    file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db)
 ):
+    # 청크 단위로 읽으며 크기 제한/형식 확인 (이미지가 아니면 첫 청크에서 거절)
     try:
-        file_bytes = await file.read()
-        file_extension = file.filename.split(".")[-1]
-        unique_file_name = f"{uuid.uuid4()}.{file_extension}"
-        bucket_name = os.getenv("BUCKET_NAME", "default_bucket_name")
-        
-        # MIME 타입 확인
-        mime_type, _ = mimetypes.guess_type(file.filename)
-        if mime_type not in ALLOWED_MIME_TYPES:
-            return JSONResponse(
-                {
-                    "status": "Forbidden",
-                    "status_code": 403,
-                    "detail": "Invalid file type. Allowed types: jpg, jpeg, png."
-                },
-                status_code=status.HTTP_403_FORBIDDEN
-            )
-
-        # 이미지 S3 업로드 처리
+        file_bytes, mime_type = await read_image_upload(file)
+    except UploadRejected as e:
+        return error_result(e.status_code, e.status_text, e.detail).response()
+
+    result = await classify_food_image(db, current_user.id, file_bytes, mime_type)
+    return result.response()
+
+
+# 한 끼 여러 장 분류 (동시 업로드 + 배치 추론 한 번 + 음식 정보 쿼리 한 번, 사진별 영양소와 합계 반환)
+@router.post("/predict/meal")
+async def classify_meal(
+    current_user: models.User = Depends(validate_token),
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    if len(files) > MEAL_MAX_IMAGES:
+        return error_result(status.HTTP_400_BAD_REQUEST, "Bad Request",
+                            f"Too many images (max {MEAL_MAX_IMAGES}).").response()
+
+    images = []
+    for index, file in enumerate(files):
         try:
-            image_url = upload_image_to_s3(BytesIO(file_bytes), bucket_name, unique_file_name)
-        except Exception as e:
-            return JSONResponse(
-                {
-                    "status": "Bad Request",
-                    "status_code": 403,
-                    "detail": f"Failed to upload image to s3: {str(e)}"
-                },
-                status_code=status.HTTP_403_FORBIDDEN
-            )
-
-        # EXIF 데이터에서 날짜 추출        
-        date = extract_exif_data(file_bytes)
-        if date:
-            formatted_date = format_date(date)
-        else:
-            current_time = datetime.datetime.now()
-            formatted_date = current_time.strftime("%Y-%m-%d %H:%M:%S")
-            date = current_time  # datetime 객체를 date로 설정
-
-        # meal_type 및 meal_type_id 설정
-        meal_type = determine_meal_type(date) if date else "기타"
-        logger.info(f"Determined meal_type: {meal_type}, from date: {date}")
-        meal_type_id_map = {
-            "아침": 0,
-            "점심": 1,
-            "저녁": 2,
-            "기타": 3
+            images.append(await read_image_upload(file))
+        except UploadRejected as e:
+            return error_result(e.status_code, e.status_text, f"Image {index} ({file.filename}): {e.detail}").response()
+
+    result = await classify_meal_images(db, current_user.id, images)
+    return result.response()
+
+
+# 직접 업로드 URL 발급 (클라이언트가 S3에 바로 올린 뒤 key로 /predict/by-key 호출)
+@router.post("/upload-url")
+async def create_upload_url(request: UploadUrlRequest, current_user: models.User = Depends(validate_token)):
+    mime_type = guess_image_type(request.filename)
+    if mime_type is None or (request.content_type and request.content_type != mime_type):
+        return invalid_type_result().response()
+
+    key = upload_key_for(current_user.id, mime_type)
+    max_bytes = PRESIGNED_UPLOAD_MAX_MB * 1024 * 1024
+    presigned = await storage.presign_upload(key, mime_type, max_bytes, PRESIGNED_UPLOAD_EXPIRES_SECONDS)
+    return JSONResponse(
+        {
+            "status": "success",
+            "status_code": 200,
+            "detail": {
+                "key": key,
+                "url": presigned["url"],
+                "fields": presigned["fields"],
+                "content_type": mime_type,
+                "max_bytes": max_bytes,
+                "expires_in": PRESIGNED_UPLOAD_EXPIRES_SECONDS,
+            },
+            "message": "Upload URL created"
         }
-        meal_type_id = meal_type_id_map.get(meal_type, 3)
+    )
 
-        # Model API 호출
-        try:
-            response = requests.post(MODEL_API_URL, params={"image_url": image_url})
-            response.raise_for_status()
-        except requests.RequestException as e:
-            logger.error(f"Model API request failed: {str(e)}")
-            return JSONResponse(
-                {
-                    "status": "Internal Server Error",
-                    "status_code": 500,
-                    "detail": f"Model API request failed: {str(e)}"
-                },
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-        # 모델 응답에서 category_id 가져오기
-        category_id = response.json().get("category_id")
-        if category_id is None:
-            return JSONResponse(
-                {
-                    "status": "Bad Request",
-                    "status_code": 400,
-                    "detail": "Category ID is required"
-                },
-                status_code=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # 음식 카테고리 가져오기 (비동기 쿼리)
-        result = await db.execute(select(Food_List).where(Food_List.category_id == category_id))
-        food = result.scalars().first()
-        if not food:
-            return JSONResponse(
-                {
-                    "status": "Not Found",
-                    "status_code": 404,
-                    "detail": "Food category not found"
-                },
-                status_code=status.HTTP_404_NOT_FOUND
-            )
-
-        # 사용자 권장 영양소 정보 가져오기 (비동기 쿼리)
-        result = await db.execute(select(Recommend).where(Recommend.user_id == current_user.id))
-        recommend = result.scalars().first()
-        if not recommend:
-            return JSONResponse(
-                {
-                    "status": "Not Found",
-                    "status_code": 404,
-                    "detail": "Recommendation not found"
-                },
-                status_code=status.HTTP_404_NOT_FOUND,
-            )
-
-        # UTF-8 인코딩
-        meal_type_utf8 = meal_type.encode('utf-8').decode('utf-8')
-        category_name_utf8 = food.category_name.encode('utf-8').decode('utf-8')
-
-        # 응답 반환
+
+# 직접 업로드한 이미지 분류 (이미지 바이트가 앱 서버를 거치지 않음)
+@router.post("/predict/by-key")
+async def classify_uploaded(
+    request: ClassifyByKeyRequest,
+    current_user: models.User = Depends(validate_token),
+    db: AsyncSession = Depends(get_db)
+):
+    result = await classify_uploaded_image(db, current_user.id, request.key)
+    return result.response()
+
+
+# 비동기 예측 작업 등록 (이미지만 받고 바로 작업 ID 반환, 분류는 백그라운드에서 진행)
+@router.post("/predict/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_prediction_job(
+    current_user: models.User = Depends(validate_token),
+    file: UploadFile = File(...),
+):
+    try:
+        if prediction_jobs.is_full():
+            # 대기열이 가득 찼으면 파일을 옮기기 전에 거절
+            prediction_jobs.rejected += 1
+            raise JobQueueFull(prediction_jobs.retry_after())
+        # 요청이 끝나면 UploadFile이 닫히므로 작업용 임시 파일로 옮긴다 (크기 제한/형식 확인 포함)
+        image, mime_type = await spool_image_upload(file)
+        job = prediction_jobs.submit(current_user.id, image, mime_type)
+    except UploadRejected as e:
+        return error_result(e.status_code, e.status_text, e.detail).response()
+    except JobQueueFull as e:
+        logger.warning(f"Prediction job queue full, retry after {e.retry_after}s")
         return JSONResponse(
             {
-                "status": "success",
-                "status_code": 201,
-                "detail": {
-                    "wellness_image_info": {
-                        "date": formatted_date,
-                        "meal_type": meal_type_utf8,
-                        "meal_type_id": meal_type_id,
-                        "category_id": category_id,
-                        "category_name": category_name_utf8,
-                        "food_kcal": decimal_to_float(food.food_kcal),
-                        "food_car": round(float(food.food_car)),
-                        "food_prot": round(float(food.food_prot)),
-                        "food_fat": round(float(food.food_fat)),
-                        "rec_kcal": decimal_to_float(recommend.rec_kcal),
-                        "rec_car": round(float(recommend.rec_car)),
-                        "rec_prot": round(float(recommend.rec_prot)),
-                        "rec_fat": round(float(recommend.rec_fat)),
-                        "image_url": image_url
-                    }
-                },
-                "message": "Image Classify Information saved successfully"
+                "status": "Service Unavailable",
+                "status_code": 503,
+                "detail": "Server is busy. Please retry later."
             },
-            media_type="application/json; charset=utf-8"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(e.retry_after)}
         )
 
-    except Exception as e:
-        logger.error(f"Internal server error: {str(e)}")
-        return JSONResponse(
-            {
-                "status": "Internal Server Error",
-                "status_code": 500,
-                "detail": f"Internal server error: {str(e)}"
+    logger.info(f"Prediction job {job.id} queued for user {current_user.id}")
+    return JSONResponse(
+        {
+            "status": "accepted",
+            "status_code": 202,
+            "detail": {
+                "job_id": job.id,
+                "state": job.state,
+                "status_url": f"/api/v1/model/predict/jobs/{job.id}",
+                "events_url": f"/api/v1/model/predict/jobs/{job.id}/events",
             },
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+            "message": "Prediction job accepted"
+        },
+        status_code=status.HTTP_202_ACCEPTED
+    )
+
+
+def get_job_or_404(job_id: str, current_user: models.User):
+    job = prediction_jobs.store.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Prediction job not found")
+    return job
+
+
+# 예측 작업 상태 조회 (폴링, 끝난 작업은 /predict 응답 본문을 result에 포함)
+@router.get("/predict/jobs/{job_id}")
+async def get_prediction_job(job_id: str, current_user: models.User = Depends(validate_token)):
+    job = get_job_or_404(job_id, current_user)
+    return JSONResponse(
+        {
+            "status": "success",
+            "status_code": 200,
+            "detail": job.info()
+        },
+        media_type="application/json; charset=utf-8"
+    )
+
+
+# 예측 작업 상태 스트림 (SSE: 상태가 바뀔 때마다 state 이벤트, 끝나면 result 이벤트 후 종료)
+@router.get("/predict/jobs/{job_id}/events")
+async def stream_prediction_job(job_id: str, current_user: models.User = Depends(validate_token)):
+    job = get_job_or_404(job_id, current_user)
+
+    async def events():
+        state = None
+        while True:
+            if job.state != state:
+                state = job.state
+                yield f"event: state\ndata: {json.dumps({'job_id': job.id, 'state': state})}\n\n"
+            if job.finished:
+                yield f"event: result\ndata: {json.dumps(job.info(), ensure_ascii=False)}\n\n"
+                return
+            if not await job.wait_for_change(PREDICT_JOB_SSE_KEEPALIVE_SECONDS):
+                # 프록시/모바일 네트워크가 유휴 연결을 끊지 않도록 주석 전송
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from api.v1 import model
-from services.auth_service import validate_token
+from services.auth_service import validate_token, get_read_db
 from db import crud, models
 from db.session import get_db
 from decimal import Decimal
@@ -18,6 +18,7 @@ router = APIRouter()
 async def get_recommend_eaten(
     today: date = Query(None, description="The date for recommendation in YYYY-MM-DD format"),
     db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
     current_user: models.User = Depends(validate_token)     
 ):
     # 만약 today 값이 전달되지 않았다면, 현재 서버 날짜로 설정
@@ -40,8 +41,10 @@ async def get_recommend_eaten(
         raise HTTPException(status_code=404, detail="User not found")
 
     try:
-        # 권장 영양소 조회 (비동기 처리)
-        recommendation = await crud.get_or_update_recommendation(db, current_user)
+        # 권장 영양소 조회 (조회는 복제본, 새로 계산해야 할 때만 primary에서 갱신)
+        recommendation = await crud.get_recommend_by_user_id(read_db, current_user.id)
+        if recommendation is None or recommendation.updated_at < current_user.updated_at:
+            recommendation = await crud.get_or_update_recommendation(db, current_user)
     except HTTPException as e:
         logger.error(f"Error retrieving recommendations: {e.detail}")
         raise HTTPException(status_code=e.status_code, detail=e.detail)
@@ -52,7 +55,7 @@ async def get_recommend_eaten(
 
     # 오늘의 총 섭취량 조회 또는 생성 (비동기 처리)
     try:
-        total_today = await crud.get_total_today(db, current_user, date_obj)
+        total_today = await crud.get_total_today(read_db, current_user, date_obj)
     except HTTPException as e:
         logger.error(f"Error retrieving or creating total_today: {e.detail}")
         raise HTTPException(status_code=e.status_code, detail=e.detail)
@@ -60,17 +63,17 @@ async def get_recommend_eaten(
         logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail="Unexpected server error")
         
-    if total_today is not None:
-        total_today.condition = total_today.total_kcal > recommendation.rec_kcal
-    else:
+    if total_today is None:
         raise HTTPException(status_code=404, detail="total_today not found")
-    
-    # total_today 업데이트 (비동기 처리)
-    try:
-        await crud.update_total_today(db, total_today)
-    except Exception as e:
-        logger.error(f"Failed to update total_today: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to update total_today")
+
+    # condition이 바뀐 경우에만 primary에서 갱신 (비동기 처리)
+    condition = total_today.total_kcal > recommendation.rec_kcal
+    if total_today.condition != condition:
+        updated = await crud.update_total_today_condition(db, total_today.id, condition)
+        if updated is None:
+            logger.error("Failed to update total_today")
+            raise HTTPException(status_code=500, detail="Failed to update total_today")
+        total_today = updated
 
     return JSONResponse(
         content={
@@ -87,7 +90,7 @@ async def get_recommend_eaten(
                     "rec_car": round(decimal_to_float(recommendation.rec_car)),
                     "rec_prot": round(decimal_to_float(recommendation.rec_prot)),
                     "rec_fat": round(decimal_to_float(recommendation.rec_fat)),
-                    "condition": total_today.condition
+                    "condition": condition
                 }
             },
             "message": "Wellness user's total intake and recommended values have been successfully retrieved."
@@ -15,6 +15,90 @@ REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))  # 
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 MODEL_API_URL = os.getenv("MODEL_API_URL")
+# Model API 기본 주소 (설정이 없으면 MODEL_API_URL 의 /predict_url/ 앞부분 사용)
+MODEL_API_BASE_URL = os.getenv("MODEL_API_BASE_URL") or (MODEL_API_URL or "").rsplit("/predict_url", 1)[0]
 TIMEZONE = os.getenv("TIMEZONE")
 JWT_SECRET_KEY = os.getenv("SECRET_KEY")
 
+# DB 연결 풀 설정 (워커 프로세스마다 풀이 따로 생기므로 pool_size + max_overflow는 워커 수를 곱해 max_connections 이하로)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))  # 유지할 연결 수
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))  # 사용량이 많을 때 추가로 열 수 있는 연결 수
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", 10))  # 빈 연결을 기다리는 최대 시간(초)
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", 1800))  # 이 시간이 지난 연결은 새로 연결 (-1이면 사용 안 함)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"  # 꺼내기 전에 끊어진 연결인지 확인
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))  # 연결당 prepared statement 캐시 (pgbouncer transaction 모드면 0)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"  # 실행하는 SQL 로그 출력 (개발용)
+
+# 읽기 복제본 (설정이 없으면 모든 조회를 primary로)
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")  # 읽기 전용 복제본 주소 (postgresql+asyncpg://...)
+DB_READ_MAX_LAG_SECONDS = float(os.getenv("DB_READ_MAX_LAG_SECONDS", 5))  # 복제 지연이 이보다 크면 primary에서 조회
+DB_READ_LAG_CHECK_SECONDS = float(os.getenv("DB_READ_LAG_CHECK_SECONDS", 5))  # 복제 지연 확인 간격(초)
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", 10))  # 사용자가 쓴 뒤 그 사용자의 조회를 primary로 보내는 시간(초)
+
+# access 토큰 검증 캐시 (JWT는 로컬 검증, DB는 처음 보는 토큰/사용자일 때만 조회)
+AUTH_NOTIFY_CHANNEL = os.getenv("AUTH_NOTIFY_CHANNEL", "wellness_auth_changes")  # auth/user_info 변경 알림 채널
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))  # 확인된 토큰 최대 수 (0이면 매 요청 DB 확인)
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", 10000))  # 사용자 행 캐시 최대 수
+AUTH_USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", 300))  # 사용자 행 캐시 유지 시간(초)
+AUTH_CACHE_FALLBACK_TTL_SECONDS = float(os.getenv("AUTH_CACHE_FALLBACK_TTL_SECONDS", 30))  # 변경 알림을 받지 못할 때 캐시 유지 시간(초)
+AUTH_LISTENER_RETRY_SECONDS = float(os.getenv("AUTH_LISTENER_RETRY_SECONDS", 5))  # 알림 연결 재시도 간격(초)
+
+
+# Model API 클라이언트 설정
+MODEL_API_CONNECT_TIMEOUT = float(os.getenv("MODEL_API_CONNECT_TIMEOUT", 2.0))  # 연결 타임아웃(초)
+MODEL_API_READ_TIMEOUT = float(os.getenv("MODEL_API_READ_TIMEOUT", 10.0))  # 응답 대기 타임아웃(초)
+MODEL_API_MAX_CONNECTIONS = int(os.getenv("MODEL_API_MAX_CONNECTIONS", 20))  # 최대 동시 연결 수
+MODEL_API_MAX_KEEPALIVE = int(os.getenv("MODEL_API_MAX_KEEPALIVE", 10))  # keep-alive로 유지할 연결 수
+MODEL_API_MAX_RETRIES = int(os.getenv("MODEL_API_MAX_RETRIES", 2))  # 재시도 횟수
+MODEL_API_RETRY_BACKOFF = float(os.getenv("MODEL_API_RETRY_BACKOFF", 0.2))  # 재시도 기본 대기 시간(초)
+MODEL_API_BREAKER_THRESHOLD = int(os.getenv("MODEL_API_BREAKER_THRESHOLD", 5))  # 서킷 브레이커가 열리는 연속 실패 수
+MODEL_API_BREAKER_RESET_SECONDS = float(os.getenv("MODEL_API_BREAKER_RESET_SECONDS", 30))  # 서킷 브레이커 재시도 대기 시간(초)
+
+# 모델 서비스 로컬 전송 (같은 호스트일 때 Unix socket + 공유 메모리, 비어 있으면 HTTP만 사용)
+MODEL_LOCAL_SOCKET = os.getenv("MODEL_LOCAL_SOCKET", "")
+MODEL_LOCAL_RETRY_SECONDS = float(os.getenv("MODEL_LOCAL_RETRY_SECONDS", 30))  # 연결 실패 후 재시도까지 HTTP 사용 시간(초)
+
+# /api/v1/model/predict 동시 처리 제한 (워커 프로세스 단위, 초과 요청은 503 + Retry-After)
+PREDICT_MAX_CONCURRENCY = int(os.getenv("PREDICT_MAX_CONCURRENCY", 16))  # 동시에 처리할 최대 요청 수
+PREDICT_MAX_QUEUE = int(os.getenv("PREDICT_MAX_QUEUE", 32))  # 처리 대기열 최대 길이 (가득 차면 즉시 거절)
+PREDICT_QUEUE_TIMEOUT_SECONDS = float(os.getenv("PREDICT_QUEUE_TIMEOUT_SECONDS", 2))  # 대기열 최대 대기 시간(초)
+PREDICT_RETRY_AFTER_MAX_SECONDS = int(os.getenv("PREDICT_RETRY_AFTER_MAX_SECONDS", 30))  # Retry-After 상한(초)
+
+# 비동기 예측 작업 설정 (POST /api/v1/model/predict/jobs, 워커 프로세스 단위)
+PREDICT_JOB_WORKERS = int(os.getenv("PREDICT_JOB_WORKERS", 8))  # 작업을 동시에 처리할 백그라운드 워커 수
+PREDICT_JOB_QUEUE = int(os.getenv("PREDICT_JOB_QUEUE", 256))  # 대기 작업 최대 수 (가득 차면 503)
+PREDICT_JOB_MAX_JOBS = int(os.getenv("PREDICT_JOB_MAX_JOBS", 10000))  # 보관할 최대 작업 수
+PREDICT_JOB_TTL_SECONDS = float(os.getenv("PREDICT_JOB_TTL_SECONDS", 600))  # 끝난 작업 결과 보관 시간(초)
+PREDICT_JOB_SSE_KEEPALIVE_SECONDS = float(os.getenv("PREDICT_JOB_SSE_KEEPALIVE_SECONDS", 15))  # SSE keep-alive 주석 전송 간격(초)
+
+# 예측 결과 캐시 설정 (중복 업로드 시 S3 업로드/추론 생략)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", 1024))  # 최대 항목 수 (0이면 사용 안 함)
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", 600))  # 항목 유지 시간(초)
+PREDICTION_CACHE_PHASH = os.getenv("PREDICTION_CACHE_PHASH", "false").lower() == "true"  # 재인코딩된 사본도 perceptual hash로 매칭
+PREDICTION_CACHE_PHASH_DISTANCE = int(os.getenv("PREDICTION_CACHE_PHASH_DISTANCE", 4))  # 같은 이미지로 볼 최대 해밍 거리
+
+# 이미지 저장소 설정
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "s3")  # s3 | local
+LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", "./local_storage")  # local 저장소 경로
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", 20))  # S3 클라이언트 연결 풀 크기
+S3_UPLOAD_CONCURRENCY = int(os.getenv("S3_UPLOAD_CONCURRENCY", 16))  # 동시에 진행할 최대 업로드 수
+S3_MULTIPART_THRESHOLD_MB = int(os.getenv("S3_MULTIPART_THRESHOLD_MB", 8))  # 이 크기 이상이면 multipart 업로드
+S3_MULTIPART_CHUNK_MB = int(os.getenv("S3_MULTIPART_CHUNK_MB", 8))  # multipart 파트 크기
+S3_MULTIPART_CONCURRENCY = int(os.getenv("S3_MULTIPART_CONCURRENCY", 4))  # 파일 하나당 병렬 파트 업로드 수
+
+# 이미지 업로드 수신 설정 (청크 단위로 읽으며 크기 제한/형식 확인)
+UPLOAD_MAX_MB = int(os.getenv("UPLOAD_MAX_MB", 15))  # 이미지 한 장 최대 크기
+UPLOAD_CHUNK_KB = int(os.getenv("UPLOAD_CHUNK_KB", 64))  # 업로드 파일을 읽는 단위
+UPLOAD_SPOOL_MEMORY_MB = int(os.getenv("UPLOAD_SPOOL_MEMORY_MB", 1))  # 대기 작업 이미지를 메모리에 둘 최대 크기 (넘으면 임시 파일)
+# 요청 본문 최대 크기 (multipart 헤더 여유분 포함, 넘으면 본문을 다 받기 전에 413)
+MAX_REQUEST_BODY_MB = int(os.getenv("MAX_REQUEST_BODY_MB", UPLOAD_MAX_MB + 1))
+
+# 한 끼 여러 장 업로드 설정 (POST /api/v1/model/predict/meal)
+MEAL_MAX_IMAGES = int(os.getenv("MEAL_MAX_IMAGES", 8))  # 요청당 최대 사진 수 (Model API PREDICT_BATCH_MAX_IMAGES 이하)
+MEAL_MAX_REQUEST_BODY_MB = int(os.getenv("MEAL_MAX_REQUEST_BODY_MB", 40))  # 요청 본문 최대 크기 (사진 전체 합계)
+
+# 클라이언트 직접 업로드 설정 (presigned POST, 이미지 바이트가 앱 서버를 거치지 않음)
+UPLOAD_KEY_PREFIX = os.getenv("UPLOAD_KEY_PREFIX", "uploads")  # 업로드 키 앞부분 (uploads/{user_id}/...)
+PRESIGNED_UPLOAD_EXPIRES_SECONDS = int(os.getenv("PRESIGNED_UPLOAD_EXPIRES_SECONDS", 300))  # 업로드 URL 유효 시간(초)
+PRESIGNED_UPLOAD_MAX_MB = int(os.getenv("PRESIGNED_UPLOAD_MAX_MB", UPLOAD_MAX_MB))  # 업로드 허용 최대 크기
+EXIF_RANGE_BYTES = int(os.getenv("EXIF_RANGE_BYTES", 64 * 1024))  # 촬영 시각을 읽기 위해 내려받는 앞부분 크기 (JPEG APP1 최대 64KB)
@@ -11,6 +11,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None),  # Retry-After, WWW-Authenticate 등 유지
     )
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
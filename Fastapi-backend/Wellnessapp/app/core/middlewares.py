@@ -1,6 +1,6 @@
 import time
-from fastapi import Request
-from fastapi.responses import Response
+from fastapi import HTTPException, Request, status
+from fastapi.responses import Response, JSONResponse
 from datetime import datetime
 from core.logging import logger
 from db.crud import create_log
@@ -8,8 +8,10 @@ from schemas.log import LogCreate
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.session import engine
 import pytz
+from typing import Dict, Optional
 from core.config import JWT_SECRET_KEY
 from utils.format import KST
+from services.admission import predict_admission, AdmissionRejected
 
 
 # 요청 및 응답을 기록하는 미들웨어
@@ -24,6 +26,21 @@ async def log_requests(request: Request, call_next):
 
     response = await call_next(request)
 
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        # SSE 스트림은 끝날 때까지 버퍼링하면 이벤트가 전달되지 않으므로 본문 없이 기록
+        logger.info(f"Streaming response started - Status Code: {response.status_code}")
+        async with AsyncSession(engine) as db:
+            await create_log(db, LogCreate(
+                req_url=str(request.url),
+                method=request.method,
+                req_param=req_param,
+                res_param="",
+                msg="Event stream started",
+                code=response.status_code,
+                time_stamp=datetime.now(KST).replace(tzinfo=None)
+            ), JWT_SECRET_KEY)
+        return response
+
     response_body = b""
     async for chunk in response.body_iterator:
         response_body += chunk
@@ -48,3 +65,84 @@ async def log_requests(request: Request, call_next):
         
     return Response(content=response_body, status_code=response.status_code,
                     headers=dict(response.headers), media_type=response.media_type)
+
+
+# 동시 처리 수를 제한할 경로 (인증/본문 파싱/요청 로그 기록 전에 거절해 과부하 시 비용을 줄인다)
+ADMISSION_CONTROLLED_PATHS = {
+    ("POST", "/api/v1/model/predict"): predict_admission,
+    # 여러 장도 배치 추론 한 번이므로 같은 슬롯 하나로 계산
+    ("POST", "/api/v1/model/predict/meal"): predict_admission,
+    # 직접 업로드한 이미지도 같은 모델 서비스를 호출하므로 같은 제한을 적용
+    ("POST", "/api/v1/model/predict/by-key"): predict_admission,
+}
+
+
+# 처리 용량을 넘는 요청을 대기열에서 짧게 기다리게 하고, 초과분은 즉시 503 + Retry-After로 거절하는 미들웨어
+async def admission_control(request: Request, call_next):
+    controller = ADMISSION_CONTROLLED_PATHS.get((request.method, request.url.path))
+    if controller is None:
+        return await call_next(request)
+
+    try:
+        async with controller.slot():
+            return await call_next(request)
+    except AdmissionRejected as e:
+        logger.warning(f"Load shedding {request.method} {request.url.path}: {e.reason} "
+                       f"(in_flight={controller.in_flight}, queued={controller.queued}, retry_after={e.retry_after}s)")
+        return JSONResponse(
+            {
+                "status": "Service Unavailable",
+                "status_code": 503,
+                "detail": "Server is busy. Please retry later."
+            },
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+# 요청 본문 크기 제한 (ASGI 미들웨어)
+# Content-Length가 제한을 넘으면 본문을 읽지 않고 바로 413, chunked 본문은 받은 양이 제한을 넘는 순간 중단한다.
+# multipart 파서가 큰 업로드를 끝까지 받아 임시 파일에 쓰기 전에 거절하기 위해 사용한다.
+class RequestBodyLimitMiddleware:
+    def __init__(self, app, max_bytes: int, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_bytes = max_bytes
+        # 여러 장을 한 번에 받는 경로 등 기본값과 다른 제한 (경로 -> 최대 바이트)
+        self.path_limits = path_limits or {}
+
+    def _too_large(self, max_bytes: int) -> JSONResponse:
+        return JSONResponse(
+            {
+                "status": "Payload Too Large",
+                "status_code": 413,
+                "detail": f"Request body exceeds {max_bytes // (1024 * 1024)}MB."
+            },
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = self.path_limits.get(scope["path"], self.max_bytes)
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+            logger.warning(f"Rejected request body of {int(content_length)} bytes: {scope['path']}")
+            await self._too_large(max_bytes)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # 본문 파싱 중에 발생하면 FastAPI가 그대로 다시 발생시켜 예외 처리기에서 413 응답
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                        detail=f"Request body exceeds {max_bytes // (1024 * 1024)}MB.")
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -18,6 +18,7 @@ import jwt
 import pytz
 import hashlib
 from sqlalchemy import delete
+from utils.security import hash_token
 
 
 # 공통 예외 처리 헬퍼 함수
@@ -30,10 +31,6 @@ async def execute_db_operation(db: AsyncSession, operation):
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Database operation failed: {str(e)}")
     
-def hash_token(token: str) -> str:
-    """토큰을 해시화하는 함수"""
-    return hashlib.sha256(token.encode()).hexdigest()
-
 def mask_email(email: str) -> str:
     """이메일을 마스킹하는 함수, '@' 기호만 남기고 나머지는 '*'로 처리"""
     if not email or '@' not in email:
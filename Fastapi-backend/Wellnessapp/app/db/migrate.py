@@ -0,0 +1,56 @@
+# /app/db/migrate.py
+# 스키마를 최신 마이그레이션까지 올림 (배포 시 한 번 실행: python -m db.migrate, app 디렉터리에서)
+#
+#  - 빈 DB: 현재 모델로 테이블을 만든 뒤 alembic upgrade head (테이블 변경 revision은 건너뛰고 트리거 등만 적용)
+#  - 기존 DB: alembic upgrade head (alembic_version이 없는 create_all 시절 DB도 0001부터 적용)
+# 각 revision은 이미 적용된 변경을 확인해 건너뛰므로 재실행해도 안전하다.
+# 여러 워커가 동시에 실행하지 않도록 앱 시작 시에는 호출하지 않는다 (docker-compose.yml의 wellnessmigrate 서비스가 앱보다 먼저 실행).
+import asyncio
+import os
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, pool
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.config import DATABASE_URL
+from core.logging import logger
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(APP_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(APP_DIR, "migrations"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+async def _create_tables_if_empty() -> bool:
+    """테이블이 하나도 없으면 모델 기준으로 만들고 True 반환"""
+    from db.session import Base
+    import db.models  # noqa: F401 (모델을 Base.metadata에 등록)
+
+    engine = create_async_engine(DATABASE_URL, poolclass=pool.NullPool)
+    try:
+        async with engine.begin() as conn:
+            tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+            if tables:
+                return False
+            await conn.run_sync(Base.metadata.create_all)
+            return True
+    finally:
+        await engine.dispose()
+
+
+def upgrade_database():
+    config = alembic_config()
+    if asyncio.run(_create_tables_if_empty()):
+        # 모델에 없는 DB 객체(변경 알림 트리거 등)는 revision에서만 만들어지므로 stamp 대신 upgrade
+        logger.info("Created database schema from models")
+    logger.info("Upgrading database schema to head revision")
+    command.upgrade(config, "head")
+
+
+if __name__ == "__main__":
+    upgrade_database()
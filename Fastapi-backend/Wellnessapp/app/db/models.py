@@ -1,25 +1,45 @@
-from sqlalchemy import ForeignKey, Column, Integer, String, DECIMAL, TIMESTAMP, DATE, text, Boolean, DateTime, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import ForeignKey, Column, Integer, String, CHAR, DECIMAL, TIMESTAMP, DATE, text, Boolean, DateTime, Text, Index, UniqueConstraint
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from db.session import Base
 from sqlalchemy.dialects.postgresql import ARRAY
 from datetime import datetime
 import pytz
+from utils.security import hash_token
 
 class Auth(Base):
     __tablename__ = 'auth'
     
     id= Column(Integer, primary_key=True,autoincrement=True)
     user_id= Column(Integer, ForeignKey('user_info.id'), nullable=False)
-    access_token= Column(String(255), nullable=False, unique=True)
+    access_token= Column(String(255), nullable=False)
+    # 조회용 고정 길이 digest (SHA-256 hex, 토큰 원문 대신 unique 인덱스를 건다)
+    access_token_digest= Column(CHAR(64), nullable=False, unique=True)
     access_created_at= Column(DateTime(timezone=True), nullable=False)
     access_expired_at= Column(DateTime(timezone=True), nullable=False)
-    refresh_token= Column(String(255), nullable=False, unique=True)
+    refresh_token= Column(String(255), nullable=False)
+    refresh_token_digest= Column(CHAR(64), nullable=False, unique=True)
     refresh_created_at= Column(DateTime(timezone=True), nullable=False)
     refresh_expired_at= Column(DateTime(timezone=True), nullable=False)
     
     user= relationship("User", back_populates="auth")
 
+    # 인덱스는 migrations/versions/0002_hot_query_indexes.py와 이름을 맞춘다 (로그인 시 user_id로 조회)
+    __table_args__ = (
+        Index("ix_auth_user_id", "user_id"),
+    )
+
+    # 토큰이 설정될 때마다 digest도 함께 갱신 (생성자 인자, 속성 대입 모두 적용)
+    @validates("access_token")
+    def _set_access_token_digest(self, key, token):
+        self.access_token_digest = hash_token(token)
+        return token
+
+    @validates("refresh_token")
+    def _set_refresh_token_digest(self, key, token):
+        self.refresh_token_digest = hash_token(token)
+        return token
+
 class User(Base): 
     __tablename__ = 'user_info'
 
@@ -55,6 +75,10 @@ class Recommend(Base):
     # User와 관계 설정
     user = relationship("User", back_populates="recommendations")
 
+    __table_args__ = (
+        Index("ix_recommend_user_id", "user_id"),
+    )
+
 
 class Food_List(Base):
     __tablename__ = 'food_list'
@@ -70,6 +94,11 @@ class Food_List(Base):
 
     history = relationship("History", back_populates="food")
 
+    # 식사 기록/분류 결과를 category_id로 조인
+    __table_args__ = (
+        Index("ix_food_list_category_id", "category_id"),
+    )
+
 
 class Meal_Type(Base):
     __tablename__ = 'meal_type'
@@ -96,6 +125,11 @@ class History(Base):
     food = relationship("Food_List", back_populates="history")
     meal_type = relationship("Meal_Type", back_populates="histories")
 
+    # 사용자의 하루 식사 기록 조회 (user_id = ? AND date 범위)
+    __table_args__ = (
+        Index("ix_history_user_id_date", "user_id", "date"),
+    )
+
 
 class Total_Today(Base):
     __tablename__ = 'total_today'
@@ -113,6 +147,11 @@ class Total_Today(Base):
     history_ids = Column(ARRAY(Integer), nullable=False)
 
     user = relationship("User", back_populates="total_today")
+
+    # 사용자별 하루 한 행 (조회 인덱스 겸용)
+    __table_args__ = (
+        UniqueConstraint("user_id", "today", name="uq_total_today_user_id_today"),
+    )
     
 class Log(Base):
     __tablename__ = 'logs'
@@ -126,5 +165,10 @@ class Log(Base):
     code = Column(Integer, nullable=False)            # 응답 코드 (예: 200, 404, 500 등)
     time_stamp = Column(DateTime, default=datetime.now(pytz.utc))  # 로그 생성 시간
 
+    # 일별 로그 내보내기/오래된 로그 삭제 (time_stamp 범위)
+    __table_args__ = (
+        Index("ix_logs_time_stamp", "time_stamp"),
+    )
+
     def __repr__(self):
         return f"<Log(id={self.id}, req_url={self.req_url}, method={self.method}, code={self.code})>"
\ No newline at end of file
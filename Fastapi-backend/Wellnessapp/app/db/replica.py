@@ -0,0 +1,202 @@
+# /app/db/replica.py
+# 읽기 복제본 라우팅 (워커 프로세스 단위)
+#
+# 조회 전용 요청은 복제본 세션을 사용하되, 다음 경우에는 primary로 보낸다.
+#  - DATABASE_READ_URL이 없거나, 복제 지연이 DB_READ_MAX_LAG_SECONDS를 넘었거나, 지연 확인에 실패한 경우
+#  - 사용자가 방금 쓴 데이터를 다시 읽는 경우 (read-your-writes: 커밋 후 DB_READ_YOUR_WRITES_SECONDS 동안)
+# 쓰기 표시는 커밋된 행의 user_id로 자동으로 남는다. 프로세스 메모리에 있으므로 다른 워커로 간 요청에는 적용되지 않는다.
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+
+from core.logging import logger
+from core.config import DB_READ_MAX_LAG_SECONDS, DB_READ_LAG_CHECK_SECONDS, DB_READ_YOUR_WRITES_SECONDS
+from db.session import AsyncSessionLocal, ReadSessionLocal, read_engine
+
+# 복제본이 마지막 트랜잭션을 재생한 뒤 지난 시간 (재생할 WAL이 남아 있지 않으면 0)
+REPLICA_LAG_SQL = text("""
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END AS lag_seconds
+""")
+
+
+class ReplicaRouter:
+    def __init__(self, session_factory, max_lag: float, check_seconds: float, read_your_writes: float,
+                 max_marks: int = 100000):
+        self.session_factory = session_factory
+        self.max_lag = max_lag
+        self.check_seconds = check_seconds
+        self.read_your_writes = read_your_writes
+        self.max_marks = max_marks
+        self._written: Dict[int, float] = {}  # user_id -> primary로 읽을 마감 시각 (monotonic)
+        self._checker_task: Optional[asyncio.Task] = None
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = 0.0
+        self.healthy = False
+
+        # 통계
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.fallback_reads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.session_factory is not None
+
+    # read-your-writes
+    def mark_write(self, user_id: int):
+        now = time.monotonic()
+        self._written[user_id] = now + self.read_your_writes
+        if len(self._written) > self.max_marks:
+            # 만료된 표시 정리
+            self._written = {uid: until for uid, until in self._written.items() if until > now}
+
+    def recently_wrote(self, user_id: Optional[int]) -> bool:
+        until = self._written.get(user_id)
+        if until is None:
+            return False
+        if until < time.monotonic():
+            del self._written[user_id]
+            return False
+        return True
+
+    def use_replica(self, user_id: Optional[int] = None) -> bool:
+        if not self.enabled or not self.healthy:
+            return False
+        # 지연 확인이 멈춘 경우 (확인 간격의 3배 이상 결과가 없으면) 오래된 결과를 믿지 않는다
+        if time.monotonic() - self.checked_at > self.check_seconds * 3:
+            return False
+        return not self.recently_wrote(user_id)
+
+    @asynccontextmanager
+    async def session(self, user_id: Optional[int] = None,
+                      primary_db: Optional[AsyncSession] = None) -> AsyncIterator[AsyncSession]:
+        """조회용 세션 (복제본을 쓸 수 없으면 primary 세션)
+
+        primary_db가 있으면 primary로 읽을 때 새 세션을 열지 않고 그 세션을 그대로 쓴다 (요청당 연결 하나).
+        """
+        if self.use_replica(user_id):
+            self.replica_reads += 1
+            async with self.session_factory() as session:
+                yield session
+            return
+
+        self.primary_reads += 1
+        if primary_db is not None:
+            yield primary_db
+            return
+        async with AsyncSessionLocal() as session:
+            yield session
+
+    async def fetch_one(self, primary_db: AsyncSession, statement, params: dict, user_id: Optional[int] = None):
+        """복제본에서 한 행 조회하고, 없으면 (아직 복제되지 않은 새 행일 수 있으므로) primary에서 다시 조회"""
+        if self.use_replica(user_id):
+            self.replica_reads += 1
+            async with self.session_factory() as session:
+                row = (await session.execute(statement, params)).fetchone()
+            if row is not None:
+                return row
+            self.fallback_reads += 1
+        else:
+            self.primary_reads += 1
+        return (await primary_db.execute(statement, params)).fetchone()
+
+    # 복제 지연 확인
+    async def check_lag(self):
+        try:
+            async with read_engine.connect() as conn:
+                lag = float((await conn.execute(REPLICA_LAG_SQL)).scalar() or 0)
+        except Exception as e:
+            if self.healthy or not self.checked_at:
+                logger.warning(f"Read replica check failed, reading from primary: {e!r}")
+            self.healthy = False
+            self.lag_seconds = None
+            return
+
+        healthy = lag <= self.max_lag
+        if healthy != self.healthy:
+            if healthy:
+                logger.info(f"Read replica caught up (lag {lag:.1f}s), routing reads to replica")
+            else:
+                logger.warning(f"Read replica lag {lag:.1f}s exceeds {self.max_lag}s, reading from primary")
+        self.lag_seconds = lag
+        self.healthy = healthy
+        self.checked_at = time.monotonic()
+
+    async def _check_loop(self):
+        while True:
+            await self.check_lag()
+            await asyncio.sleep(self.check_seconds)
+
+    async def start(self):
+        if not self.enabled or self._checker_task is not None:
+            return
+        self._checker_task = asyncio.create_task(self._check_loop())
+
+    async def stop(self):
+        if self._checker_task is not None:
+            self._checker_task.cancel()
+            try:
+                await self._checker_task
+            except asyncio.CancelledError:
+                pass
+            self._checker_task = None
+        if read_engine is not None:
+            await read_engine.dispose()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag,
+            "recent_writers": len(self._written),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "fallback_reads": self.fallback_reads,
+        }
+
+
+# 워커 프로세스 단위 복제본 라우터
+replica_router = ReplicaRouter(
+    ReadSessionLocal,
+    DB_READ_MAX_LAG_SECONDS,
+    DB_READ_LAG_CHECK_SECONDS,
+    DB_READ_YOUR_WRITES_SECONDS,
+)
+
+
+def _written_user_id(instance) -> Optional[int]:
+    if getattr(instance, "__tablename__", None) == "user_info":
+        return instance.id
+    return getattr(instance, "user_id", None)
+
+
+# 커밋된 쓰기의 사용자 기록 (flush 때 모아 두고 커밋되면 read-your-writes 표시)
+@event.listens_for(Session, "after_flush")
+def _collect_written_users(session, flush_context):
+    written = session.info.setdefault("written_user_ids", set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        user_id = _written_user_id(instance)
+        if user_id is not None:
+            written.add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_written_users(session):
+    for user_id in session.info.pop("written_user_ids", ()):
+        replica_router.mark_write(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_users(session):
+    session.info.pop("written_user_ids", None)
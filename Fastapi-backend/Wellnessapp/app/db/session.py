@@ -1,30 +1,160 @@
+import time
+from contextvars import ContextVar
 from sqlalchemy import event
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.sql import text
-from typing import AsyncGenerator
-from core.config import DATABASE_URL # config.py에서 환경 변수 가져오기
-import os
-from pytz import timezone
-from dotenv import load_dotenv
-from core.config import DATABASE_URL, TIMEZONE
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from typing import AsyncGenerator, Optional
+from core.config import (
+    DATABASE_URL, TIMEZONE, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT_SECONDS, DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_PRE_PING, DB_STATEMENT_CACHE_SIZE, DB_ECHO, DATABASE_READ_URL,
+)
+
+
+# 현재 checkout 중 새 연결을 여는 데 걸린 시간 (greenlet/태스크마다 따로 기록)
+_checkout_connect_seconds: ContextVar[Optional[list]] = ContextVar("checkout_connect_seconds", default=None)
+
+
+class PoolStats:
+    """연결 풀 checkout 통계 (빈 연결 대기 시간과 새 연결 생성 시간을 따로 기록)"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        # 최근 대기 시간 지수 이동 평균
+        self.wait_seconds_avg = 0.0
+        self.connects = 0
+        self.connect_seconds_total = 0.0
+        self.connect_seconds_max = 0.0
+
+    def record(self, wait_seconds: float):
+        self.checkouts += 1
+        self.wait_seconds_total += wait_seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+        self.wait_seconds_avg = 0.9 * self.wait_seconds_avg + 0.1 * wait_seconds
+
+    def record_connect(self, connect_seconds: float):
+        self.connects += 1
+        self.connect_seconds_total += connect_seconds
+        self.connect_seconds_max = max(self.connect_seconds_max, connect_seconds)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """checkout 대기 시간을 기록하는 풀 (빈 연결이 없으면 pool_timeout까지 기다린다)
+
+    _do_get은 여유가 있으면 새 연결을 열기도 하므로, 그 시간은 연결 생성 시간으로 따로 기록하고
+    대기 시간에서는 뺀다 (DB 연결 지연이 풀 경합처럼 보이지 않도록).
+    연결 생성 시간은 엔진의 do_connect/connect 이벤트로 잰다 (track_connects, pool_recycle/invalidate 후 재연결 포함).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def record_connect(self, elapsed: float):
+        self.stats.record_connect(elapsed)
+        connect_seconds = _checkout_connect_seconds.get()
+        if connect_seconds is not None:
+            connect_seconds[0] += elapsed
+
+    def _do_get(self):
+        connect_seconds = [0.0]
+        token = _checkout_connect_seconds.set(connect_seconds)
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            _checkout_connect_seconds.reset(token)
+        self.stats.record(max(time.perf_counter() - started - connect_seconds[0], 0.0))
+        return connection
+
+
+def track_connects(sync_engine):
+    """새 DBAPI 연결마다 (첫 연결, recycle/invalidate 후 재연결 모두) 연결 시간을 풀 통계에 기록"""
+
+    @event.listens_for(sync_engine, "do_connect")
+    def _connect_started(dialect, connection_record, cargs, cparams):
+        connection_record.info["connect_started"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "connect")
+    def _connect_finished(dbapi_connection, connection_record):
+        started = connection_record.info.pop("connect_started", None)
+        if started is not None and isinstance(sync_engine.pool, TimedQueuePool):
+            sync_engine.pool.record_connect(time.perf_counter() - started)
+
+
+def build_engine(url: str, application_name: str, read_only: bool = False):
+    """공통 풀 설정으로 비동기 엔진 생성"""
+    # 연결 시작 파라미터로 세션 타임존 설정 (연결마다 SET 쿼리를 보내지 않음)
+    server_settings = {"application_name": application_name}
+    if TIMEZONE:
+        server_settings["timezone"] = TIMEZONE
+    if read_only:
+        # 복제본 세션에서 실수로 쓰기를 시도하면 바로 에러가 나도록
+        server_settings["default_transaction_read_only"] = "on"
+
+    async_engine = create_async_engine(
+        url,
+        echo=DB_ECHO,
+        poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={
+            "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    )
+    track_connects(async_engine.sync_engine)
+    return async_engine
 
 
 # SQLAlchemy 비동기 엔진 생성
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = build_engine(DATABASE_URL, "wellness-app")
+
+# 읽기 복제본 엔진 (DATABASE_READ_URL이 없으면 None, 라우팅은 db/replica.py)
+read_engine = build_engine(DATABASE_READ_URL, "wellness-app-read", read_only=True) if DATABASE_READ_URL else None
 
 
-# 타임존 설정을 위한 이벤트 리스너
-@event.listens_for(engine.sync_engine, "connect")
-def set_timezone(dbapi_connection, connection_record):
-    cursor = dbapi_connection.cursor()
-    cursor.execute(f"SET timezone TO '{TIMEZONE}'")
-    cursor.close()
+def pool_stats(target=None) -> dict:
+    """연결 풀 사용량 (워커 프로세스 단위)"""
+    pool = (target or engine).pool
+    capacity = DB_POOL_SIZE + max(DB_MAX_OVERFLOW, 0)
+    checked_out = pool.checkedout()
+    stats = pool.stats
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "utilization": round(checked_out / capacity, 3) if capacity else 0.0,
+        "checkouts": stats.checkouts,
+        "checkout_timeouts": stats.timeouts,
+        "checkout_wait_ms_avg": round(stats.wait_seconds_avg * 1000, 2),
+        "checkout_wait_ms_max": round(stats.wait_seconds_max * 1000, 2),
+        "checkout_wait_seconds_total": round(stats.wait_seconds_total, 6),
+        "connects": stats.connects,
+        "connect_ms_max": round(stats.connect_seconds_max * 1000, 2),
+        "connect_seconds_total": round(stats.connect_seconds_total, 6),
+    }
+
 
 # 비동기 세션 생성
 AsyncSessionLocal = sessionmaker(
     bind=engine, class_=AsyncSession, expire_on_commit=False
 )
+ReadSessionLocal = sessionmaker(
+    bind=read_engine, class_=AsyncSession, expire_on_commit=False
+) if read_engine is not None else None
 
 
 # Base 클래스 생성
@@ -37,9 +167,3 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
-
-# 테이블 생성
-async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
@@ -1,12 +1,18 @@
 # /app/main.py
 from fastapi import FastAPI, Depends
 from fastapi.security import OAuth2PasswordBearer
-from api.v1 import recommend, model, register, login, auth, mealrecords
+from api.v1 import recommend, model, register, login, auth, mealrecords, metrics
 from services.auth_service import validate_token
-from db.session import get_db
+from db.session import get_db, engine
+from db.replica import replica_router
 from api.v1.history import router as history_router
 from core.logging import logger
-from core.middlewares import log_requests
+from core.middlewares import log_requests, admission_control, RequestBodyLimitMiddleware
+from core.config import MAX_REQUEST_BODY_MB, MEAL_MAX_REQUEST_BODY_MB
+from services.model_client import model_client
+from services.prediction_jobs import prediction_jobs
+from services.auth_cache import auth_cache
+from utils.s3 import storage
 from core.exception_handlers import http_exception_handler, StarletteHTTPException, RequestValidationError, validation_exception_handler
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -15,6 +21,14 @@ app = FastAPI()
 
 # 미들웨어 추가
 app.middleware("http")(log_requests)
+# 나중에 등록한 미들웨어가 먼저 실행됨 -> 과부하 시 요청 로그 기록 전에 거절
+app.middleware("http")(admission_control)
+# 본문 크기 제한은 가장 바깥에서 적용 (너무 큰 업로드는 본문을 받기 전에 거절)
+app.add_middleware(
+    RequestBodyLimitMiddleware,
+    max_bytes=MAX_REQUEST_BODY_MB * 1024 * 1024,
+    path_limits={"/api/v1/model/predict/meal": MEAL_MAX_REQUEST_BODY_MB * 1024 * 1024},
+)
 
 # 예외 처리기 등록
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)
@@ -27,6 +41,37 @@ app.include_router(register.router, prefix="/api/v1/user", tags=["user_Register"
 app.include_router(mealrecords.router, prefix="/api/v1/record", tags=["Meal_Record"], dependencies=[Depends(validate_token)])
 app.include_router(recommend.router, prefix="/api/v1/recommend", tags=["Recommend"], dependencies=[Depends(validate_token)])
 app.include_router(model.router, prefix="/api/v1/model", tags=["Model"], dependencies=[Depends(validate_token)])
+app.include_router(metrics.router, prefix="/api/v1/metrics", tags=["Metrics"])
 app.include_router(history_router, prefix="/api/v1/history", tags=["History"], dependencies=[Depends(validate_token)])
 
+# 시작 시 이미지 저장소 클라이언트 생성 (자격 증명 조회, 연결 풀 생성을 한 번만 수행)
+@app.on_event("startup")
+async def start_storage():
+    await storage.start()
+
+# 토큰 검증 캐시의 auth/user_info 변경 알림 수신 시작 (트리거는 마이그레이션 0003에서 설치)
+@app.on_event("startup")
+async def start_auth_cache():
+    await auth_cache.start()
+
+# 읽기 복제본 지연 확인 시작 (DATABASE_READ_URL이 있을 때만)
+@app.on_event("startup")
+async def start_replica_router():
+    await replica_router.start()
+
+# 비동기 예측 작업 워커 시작
+@app.on_event("startup")
+async def start_prediction_jobs():
+    await prediction_jobs.start()
+
+# 종료 시 Model API 연결 풀 및 저장소 클라이언트 정리
+@app.on_event("shutdown")
+async def close_clients():
+    await prediction_jobs.stop()
+    await auth_cache.stop()
+    await model_client.close()
+    await storage.close()
+    await replica_router.stop()
+    await engine.dispose()
+
 logger.info("FastAPI application has started.")
@@ -0,0 +1,42 @@
+"""auth 토큰 조회용 digest 컬럼 추가
+
+access_token / refresh_token 원문(최대 255자)에 걸린 unique 인덱스를 고정 길이 SHA-256 digest(CHAR(64)) 인덱스로 교체한다.
+기존 행은 DB에서 바로 digest를 계산해 채운다 (utils.security.hash_token과 같은 값).
+create_all로 이미 digest 컬럼이 만들어진 DB에서는 컬럼 추가/채우기를 건너뛴다.
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TOKEN_KINDS = ("access", "refresh")
+
+
+def upgrade():
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("auth")}
+    for kind in TOKEN_KINDS:
+        digest_column = f"{kind}_token_digest"
+        if digest_column not in columns:
+            op.add_column("auth", sa.Column(digest_column, sa.CHAR(64), nullable=True))
+            op.execute(
+                f"UPDATE auth SET {digest_column} = encode(sha256(convert_to({kind}_token, 'UTF8')), 'hex')"
+            )
+            op.alter_column("auth", digest_column, nullable=False)
+            op.create_unique_constraint(f"auth_{digest_column}_key", "auth", [digest_column])
+        # 토큰 원문 unique 제약(create_all 기본 이름)은 digest 제약으로 대체
+        op.execute(f"ALTER TABLE auth DROP CONSTRAINT IF EXISTS auth_{kind}_token_key")
+
+
+def downgrade():
+    for kind in TOKEN_KINDS:
+        digest_column = f"{kind}_token_digest"
+        op.create_unique_constraint(f"auth_{kind}_token_key", "auth", [f"{kind}_token"])
+        op.drop_constraint(f"auth_{digest_column}_key", "auth", type_="unique")
+        op.drop_column("auth", digest_column)
@@ -0,0 +1,83 @@
+"""자주 쓰는 조회 조건에 인덱스 추가, total_today (user_id, today) unique 제약
+
+인덱스는 CREATE INDEX CONCURRENTLY로 만들어 운영 중에도 쓰기를 막지 않는다 (트랜잭션 밖에서 실행).
+이전 실행이 남긴 invalid 인덱스는 지우고 다시 만든다.
+total_today unique 제약은 같은 방식으로 만든 unique 인덱스를 제약으로 붙인다.
+중복된 (user_id, today) 행이 있으면 합칠 방법을 정할 수 없으므로 정리하라는 에러를 내고 중단한다.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (인덱스 이름, 테이블, 컬럼) - db/models.py의 __table_args__와 같은 이름
+INDEXES = (
+    ("ix_history_user_id_date", "history", ("user_id", "date")),
+    ("ix_recommend_user_id", "recommend", ("user_id",)),
+    ("ix_food_list_category_id", "food_list", ("category_id",)),
+    ("ix_auth_user_id", "auth", ("user_id",)),
+    ("ix_logs_time_stamp", "logs", ("time_stamp",)),
+)
+
+TOTAL_TODAY_UNIQUE = "uq_total_today_user_id_today"
+
+
+def create_index_concurrently(bind, name: str, ddl: str):
+    """CONCURRENTLY 인덱스 생성 (이미 유효한 인덱스가 있으면 건너뜀)
+
+    CONCURRENTLY 빌드가 중간에 실패하면 invalid 인덱스가 남고, IF NOT EXISTS는 이를 그대로 두므로
+    pg_index.indisvalid가 false면 지우고 다시 만든다.
+    """
+    valid = bind.execute(sa.text(
+        "SELECT i.indisvalid FROM pg_index AS i JOIN pg_class AS c ON c.oid = i.indexrelid WHERE c.relname = :name"
+    ), {"name": name}).scalar()
+    if valid:
+        return
+    if valid is not None:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute(ddl)
+
+
+def upgrade():
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(
+        "SELECT count(*) FROM (SELECT 1 FROM total_today GROUP BY user_id, today HAVING count(*) > 1) AS d"
+    )).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"total_today has {duplicates} duplicated (user_id, today) groups; "
+            "merge them before adding the unique constraint"
+        )
+    constraint_exists = bind.execute(
+        sa.text("SELECT 1 FROM pg_constraint WHERE conname = :name"), {"name": TOTAL_TODAY_UNIQUE}
+    ).scalar()
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            create_index_concurrently(
+                bind, name, f"CREATE INDEX CONCURRENTLY {name} ON {table} ({', '.join(columns)})"
+            )
+        if not constraint_exists:
+            create_index_concurrently(
+                bind, TOTAL_TODAY_UNIQUE,
+                f"CREATE UNIQUE INDEX CONCURRENTLY {TOTAL_TODAY_UNIQUE} ON total_today (user_id, today)",
+            )
+
+    if not constraint_exists:
+        op.execute(
+            f"ALTER TABLE total_today ADD CONSTRAINT {TOTAL_TODAY_UNIQUE} UNIQUE USING INDEX {TOTAL_TODAY_UNIQUE}"
+        )
+
+
+def downgrade():
+    op.execute(f"ALTER TABLE total_today DROP CONSTRAINT IF EXISTS {TOTAL_TODAY_UNIQUE}")
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
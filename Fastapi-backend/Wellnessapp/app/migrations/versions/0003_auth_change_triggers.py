@@ -0,0 +1,61 @@
+"""auth / user_info 변경 알림 트리거 (services/auth_cache.py의 LISTEN이 받아 토큰/사용자 캐시에서 제거)
+
+트리거 함수는 core.config의 AUTH_NOTIFY_CHANNEL로 NOTIFY 하므로 채널 이름을 바꾸면 downgrade 후 다시 upgrade 한다.
+이전에 앱 워커가 직접 만든 트리거가 있으면 지우고 다시 만든다.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-10-18
+"""
+from alembic import op
+
+from core.config import AUTH_NOTIFY_CHANNEL
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+FUNCTION_NAME = "wellness_notify_auth_change"
+
+# (트리거 이름, 테이블)
+TRIGGERS = (
+    ("wellness_auth_change", "auth"),
+    ("wellness_user_info_change", "user_info"),
+)
+
+TRIGGER_FUNCTION_SQL = f"""
+CREATE OR REPLACE FUNCTION {FUNCTION_NAME}() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'auth' THEN
+        IF TG_OP = 'DELETE' OR OLD.access_token_digest IS DISTINCT FROM NEW.access_token_digest THEN
+            PERFORM pg_notify('{AUTH_NOTIFY_CHANNEL}', json_build_object(
+                'table', 'auth',
+                'user_id', OLD.user_id,
+                'token', OLD.access_token_digest,
+                'expires_at', extract(epoch FROM OLD.access_expired_at)
+            )::text);
+        END IF;
+    ELSE
+        PERFORM pg_notify('{AUTH_NOTIFY_CHANNEL}', json_build_object('table', 'user_info', 'user_id', OLD.id)::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade():
+    op.execute(TRIGGER_FUNCTION_SQL)
+    for name, table in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE PROCEDURE {FUNCTION_NAME}()"
+        )
+
+
+def downgrade():
+    for name, table in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+    op.execute(f"DROP FUNCTION IF EXISTS {FUNCTION_NAME}()")
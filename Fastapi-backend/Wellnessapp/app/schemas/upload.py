@@ -0,0 +1,12 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+# 직접 업로드 URL 발급 요청
+class UploadUrlRequest(BaseModel):
+    filename: str
+    content_type: Optional[str] = None
+
+# 업로드된 이미지 분류 요청 (업로드 URL 발급 시 받은 key)
+class ClassifyByKeyRequest(BaseModel):
+    key: str
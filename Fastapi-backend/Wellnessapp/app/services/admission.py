@@ -0,0 +1,125 @@
+# /app/services/admission.py
+# 추론 경로 동시 처리 수 제한 (admission control + load shedding)
+#
+# 동시에 처리하는 요청은 max_concurrent개로 제한하고, 초과분은 최대 max_queue개까지 짧게(queue_timeout초) 대기시킨다.
+# 대기열이 가득 찼거나 대기 시간 안에 차례가 오지 않으면 AdmissionRejected를 발생시켜 즉시 503 + Retry-After로 응답한다.
+# in_flight/queued 값은 /api/v1/metrics로 노출되어 오토스케일링 지표로 사용한다.
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque
+
+from core.config import (
+    PREDICT_MAX_CONCURRENCY, PREDICT_MAX_QUEUE, PREDICT_QUEUE_TIMEOUT_SECONDS, PREDICT_RETRY_AFTER_MAX_SECONDS,
+)
+
+
+class AdmissionRejected(Exception):
+    """처리 용량 초과로 요청을 받지 않음 (HTTP 503으로 변환)"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float, max_retry_after: int = 30):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.max_retry_after = max(1, max_retry_after)
+        self.in_flight = 0
+        # 대기 중인 요청 (FIFO). 슬롯이 비면 맨 앞 요청에 슬롯을 그대로 넘긴다
+        self._waiters: Deque[asyncio.Future] = deque()
+        # 요청 처리 시간 지수 이동 평균 (Retry-After 추정용)
+        self._service_seconds = 1.0
+
+        # 통계
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """현재 대기열이 비워지는 데 걸릴 예상 시간(초)"""
+        estimate = self._service_seconds * (self.queued + 1) / self.max_concurrent
+        return min(self.max_retry_after, max(1, math.ceil(estimate)))
+
+    async def _acquire(self):
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected("queue_full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued_total += 1
+        try:
+            # wait_for는 타임아웃 시점에 이미 슬롯을 넘겨받았다면 결과를 그대로 반환한다
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise AdmissionRejected("queue_timeout", self.retry_after())
+        except asyncio.CancelledError:
+            # 클라이언트 연결 종료 등으로 취소됐는데 슬롯을 이미 넘겨받은 경우 다음 요청에 넘긴다
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def _release(self):
+        # 슬롯을 반납하지 않고 대기 중인 다음 요청에 바로 넘긴다 (in_flight 유지)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        """처리 슬롯을 얻을 때까지 대기 (용량 초과 시 AdmissionRejected)"""
+        await self._acquire()
+        self.admitted += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._service_seconds = 0.8 * self._service_seconds + 0.2 * (time.monotonic() - started)
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "utilization": round((self.in_flight + self.queued) / (self.max_concurrent + self.max_queue), 4),
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_service_ms": round(self._service_seconds * 1000, 1),
+        }
+
+
+# 워커 프로세스 단위 /predict 동시 처리 제한
+predict_admission = AdmissionController(
+    PREDICT_MAX_CONCURRENCY,
+    PREDICT_MAX_QUEUE,
+    PREDICT_QUEUE_TIMEOUT_SECONDS,
+    max_retry_after=PREDICT_RETRY_AFTER_MAX_SECONDS,
+)
@@ -0,0 +1,183 @@
+# /app/services/auth_cache.py
+# access 토큰 검증 캐시 (워커 프로세스 단위)
+#
+# validate_token은 JWT 서명/만료를 로컬에서 검증하고, DB 확인은 처음 보는 토큰일 때만 한다.
+# 토큰은 원문 대신 auth.access_token_digest와 같은 값(utils.security.hash_token)으로 다룬다.
+#  - verified: DB에서 현재 유효한 토큰임을 확인한 토큰 digest -> user_id (토큰 exp까지 유지)
+#  - users   : user_info 행 캐시 (user_id -> 행)
+#  - revoked : 교체/삭제된 토큰 digest (확인 쿼리와 변경 알림이 엇갈려도 다시 캐시되지 않도록)
+# auth / user_info 행이 바뀌면 DB 트리거(마이그레이션 0003)가 NOTIFY를 보내고, 전용 asyncpg 연결의 LISTEN이 받아 캐시에서 제거한다.
+# 알림 연결이 끊긴 동안에는 변경을 놓칠 수 있으므로 캐시 유지 시간을 fallback_ttl로 줄이고, 다시 연결되면 캐시를 비운다.
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from core.logging import logger
+from core.config import (
+    DATABASE_URL, AUTH_NOTIFY_CHANNEL, AUTH_TOKEN_CACHE_SIZE, AUTH_USER_CACHE_SIZE, AUTH_USER_CACHE_TTL_SECONDS,
+    AUTH_CACHE_FALLBACK_TTL_SECONDS, AUTH_LISTENER_RETRY_SECONDS,
+)
+
+class AuthCache:
+    def __init__(self, channel: str, token_size: int, user_size: int, user_ttl: float, fallback_ttl: float,
+                 retry_seconds: float, keepalive_seconds: float = 30.0):
+        self.channel = channel
+        self.token_size = token_size
+        self.user_size = user_size
+        self.user_ttl = user_ttl
+        self.fallback_ttl = fallback_ttl
+        self.retry_seconds = retry_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self._verified: "OrderedDict[str, tuple]" = OrderedDict()  # digest -> (user_id, expires_at)
+        self._users: "OrderedDict[int, tuple]" = OrderedDict()  # user_id -> (row, expires_at)
+        self._revoked: "OrderedDict[str, float]" = OrderedDict()  # digest -> 토큰 만료 시각
+        self._listener_task: Optional[asyncio.Task] = None
+        self.listening = False
+
+        # 통계
+        self.token_hits = 0
+        self.token_misses = 0
+        self.user_hits = 0
+        self.user_misses = 0
+        self.notifications = 0
+
+    # 토큰 캐시
+    def is_revoked(self, digest: str) -> bool:
+        expires_at = self._revoked.get(digest)
+        if expires_at is None:
+            return False
+        if expires_at < time.time():
+            del self._revoked[digest]
+            return False
+        return True
+
+    def get_token(self, digest: str) -> Optional[int]:
+        entry = self._verified.get(digest)
+        if entry is None or entry[1] < time.time():
+            self.token_misses += 1
+            return None
+        self.token_hits += 1
+        return entry[0]
+
+    def put_token(self, digest: str, user_id: int, token_exp: float):
+        # 확인 쿼리 이후에 교체 알림이 먼저 도착한 경우 캐시하지 않는다
+        if self.token_size <= 0 or self.is_revoked(digest):
+            return
+        now = time.time()
+        expires_at = token_exp if self.listening else min(token_exp, now + self.fallback_ttl)
+        self._verified[digest] = (user_id, expires_at)
+        self._verified.move_to_end(digest)
+        while len(self._verified) > self.token_size:
+            self._verified.popitem(last=False)
+
+    # 사용자 캐시
+    def get_user(self, user_id: int) -> Optional[Any]:
+        entry = self._users.get(user_id)
+        if entry is None or entry[1] < time.monotonic():
+            self.user_misses += 1
+            return None
+        self._users.move_to_end(user_id)
+        self.user_hits += 1
+        return entry[0]
+
+    def put_user(self, user_id: int, user: Any):
+        if self.user_size <= 0:
+            return
+        ttl = self.user_ttl if self.listening else min(self.user_ttl, self.fallback_ttl)
+        self._users[user_id] = (user, time.monotonic() + ttl)
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.user_size:
+            self._users.popitem(last=False)
+
+    def clear(self):
+        self._verified.clear()
+        self._users.clear()
+
+    # 변경 알림
+    def _on_notify(self, connection, pid, channel, payload: str):
+        self.notifications += 1
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Invalid auth change notification: {payload}")
+            return
+
+        user_id = change.get("user_id")
+        if change.get("table") == "auth":
+            digest = change.get("token")
+            if digest:
+                self._verified.pop(digest, None)
+                self._revoked[digest] = float(change.get("expires_at") or time.time() + self.fallback_ttl)
+                while len(self._revoked) > self.token_size:
+                    self._revoked.popitem(last=False)
+        self._users.pop(user_id, None)
+
+    async def _listen(self):
+        # SQLAlchemy URL(postgresql+asyncpg://...) -> asyncpg DSN
+        dsn = make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                await connection.add_listener(self.channel, self._on_notify)
+                # 연결되지 않은 동안의 변경은 알 수 없으므로 캐시를 비우고 시작
+                self.clear()
+                self.listening = True
+                logger.info(f"Listening for auth changes on '{self.channel}'")
+                while not connection.is_closed():
+                    await asyncio.sleep(self.keepalive_seconds)
+                    # 끊어진 연결을 감지하기 위한 keep-alive
+                    await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Auth change listener disconnected: {e!r}")
+            finally:
+                self.listening = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.retry_seconds)
+
+    async def start(self):
+        # 트리거는 배포 시 마이그레이션으로 설치되므로 여기서는 LISTEN만 시작
+        if self._listener_task is not None:
+            return
+        self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+    def stats(self) -> dict:
+        return {
+            "listening": self.listening,
+            "verified_tokens": len(self._verified),
+            "revoked_tokens": len(self._revoked),
+            "users": len(self._users),
+            "token_hits": self.token_hits,
+            "token_misses": self.token_misses,
+            "user_hits": self.user_hits,
+            "user_misses": self.user_misses,
+            "notifications": self.notifications,
+        }
+
+
+# 워커 프로세스 단위 토큰/사용자 캐시
+auth_cache = AuthCache(
+    AUTH_NOTIFY_CHANNEL,
+    AUTH_TOKEN_CACHE_SIZE,
+    AUTH_USER_CACHE_SIZE,
+    AUTH_USER_CACHE_TTL_SECONDS,
+    AUTH_CACHE_FALLBACK_TTL_SECONDS,
+    AUTH_LISTENER_RETRY_SECONDS,
+)
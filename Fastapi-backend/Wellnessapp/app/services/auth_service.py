@@ -1,14 +1,18 @@
 from datetime import datetime, timedelta
+from typing import AsyncGenerator
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import ExpiredSignatureError, JWTError, jwt
 import pytz
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from db.session import get_db
+from db.replica import replica_router
 from db.models import Auth, User
 from schemas.auth import Token, TokenData
 from core.logging import logger
+from services.auth_cache import auth_cache
+from utils.security import hash_token
 import os
 from sqlalchemy import text
 from core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
@@ -63,53 +67,83 @@ def verify_refresh_token(token: str, expiry_time: datetime):
 
 
 # 비동기 토큰 검증 및 유저 반환 함수
-# 비동기 토큰 검증 및 유저 반환 함수
+# JWT 서명/만료는 로컬에서 검증하고, auth/user_info 조회는 캐시에 없을 때만 수행 (services/auth_cache.py)
 async def validate_token(db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)):
-    # 토큰을 확인하는 로그 추가
-    logger.info(f"Received token: {token}")
-
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid token",
         headers={"WWW-Authenticate": "Bearer"},
     )
-
-    # 데이터베이스에서 토큰 조회 (비동기)
-    auth_entry = await db.execute(
-        text("SELECT * FROM auth WHERE access_token = :token"),  # text 함수 사용
-        {"token": token}
+    expired_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has expired",
+        headers={"WWW-Authenticate": "Bearer"},
     )
-    auth_entry = auth_entry.fetchone()
 
-    if auth_entry is None:
-        # 토큰 조회 실패 시 로그 기록
-        logger.error(f"Token not found in the database: {token}")
+    # 서명 및 만료 시간 확인 (DB 조회 없음)
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except ExpiredSignatureError:
+        logger.error("Token expired")
+        raise expired_exception
+    except JWTError as e:
+        logger.error(f"Invalid token signature: {e}")
         raise credentials_exception
 
-    # 토큰 만료 여부 확인
-    if auth_entry.access_expired_at < datetime.utcnow():
-        # 만료된 토큰일 경우 로그 기록
-        logger.error(f"Token expired: {token}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired",
-            headers={"WWW-Authenticate": "Bearer"},
+    # 교체/삭제된 토큰 (auth 변경 알림으로 갱신)
+    digest = hash_token(token)
+    if auth_cache.is_revoked(digest):
+        logger.error("Token has been revoked")
+        raise credentials_exception
+
+    user_id = auth_cache.get_token(digest)
+    if user_id is None:
+        # 처음 보는 토큰: 현재 발급된 토큰인지 데이터베이스에서 확인 (고정 길이 digest 인덱스 조회)
+        # 복제본에서 먼저 조회하고, 방금 로그인해 아직 복제되지 않은 토큰이면 primary에서 다시 조회
+        auth_entry = await replica_router.fetch_one(
+            db,
+            text("SELECT user_id, access_expired_at FROM auth WHERE access_token_digest = :digest"),
+            {"digest": digest}
         )
 
-    # 여기서 User 객체 반환
-    user_result = await db.execute(
-        text("SELECT * FROM user_info WHERE id = :user_id"),  # text 함수 사용
-        {"user_id": auth_entry.user_id}
-    )
-    user = user_result.fetchone()
+        if auth_entry is None:
+            # 토큰 조회 실패 시 로그 기록
+            logger.error("Token not found in the database")
+            raise credentials_exception
 
+        # 토큰 만료 여부 확인
+        if auth_entry.access_expired_at < datetime.utcnow():
+            logger.error("Token expired")
+            raise expired_exception
+
+        user_id = auth_entry.user_id
+        auth_cache.put_token(digest, user_id, payload.get("exp", 0))
+
+    user = auth_cache.get_user(user_id)
     if user is None:
-        logger.error(f"User not found for token: {token}")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
+        user = await replica_router.fetch_one(
+            db,
+            text("SELECT * FROM user_info WHERE id = :user_id"),  # text 함수 사용
+            {"user_id": user_id},
+            user_id=user_id
         )
 
-    logger.info(f"Returning user object: {user} of type {type(user)}")
-    return user
\ No newline at end of file
+        if user is None:
+            logger.error(f"User not found for user_id: {user_id}")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        auth_cache.put_user(user_id, user)
+
+    return user
+
+
+# 조회 전용 라우트용 세션 (복제본이 정상이고 사용자가 최근에 쓰지 않았으면 복제본, 아니면 primary)
+# primary로 읽을 때는 같은 요청의 get_db 세션을 재사용 (복제본이 없는 배포에서 요청당 연결을 두 개 잡지 않도록)
+async def get_read_db(
+    current_user: User = Depends(validate_token), db: AsyncSession = Depends(get_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    async with replica_router.session(current_user.id, db) as session:
+        yield session
@@ -0,0 +1,445 @@
+# /app/services/classify_service.py
+# 음식 사진 분류 처리 (동기 /predict 요청, 비동기 예측 작업, 직접 업로드 이미지 분류가 함께 사용)
+import asyncio
+import datetime
+import mimetypes
+import uuid
+from decimal import Decimal
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from core.logging import logger
+from core.config import UPLOAD_KEY_PREFIX, PRESIGNED_UPLOAD_MAX_MB, EXIF_RANGE_BYTES
+from db.models import Food_List, Recommend
+from services.model_client import model_client, CircuitOpenError
+from services.prediction_cache import prediction_cache, content_hash
+from utils.format import decimal_to_float
+from utils.image_processing import extract_exif_data, determine_meal_type, format_date
+from utils.s3 import upload_image, storage
+from utils.upload import IMAGE_EXTENSIONS
+
+# 허용된 이미지 파일 형식 (MIME 타입)
+ALLOWED_MIME_TYPES = ["image/jpeg", "image/png", "image/jpg"]
+
+MEAL_TYPE_ID_MAP = {
+    "아침": 0,
+    "점심": 1,
+    "저녁": 2,
+    "기타": 3
+}
+
+
+class ClassifyResult(NamedTuple):
+    """분류 결과 응답 (상태 코드 + 응답 본문)"""
+    status_code: int
+    content: dict
+    headers: Optional[dict] = None
+
+    def response(self) -> JSONResponse:
+        return JSONResponse(
+            self.content,
+            status_code=self.status_code,
+            headers=self.headers,
+            media_type="application/json; charset=utf-8",
+        )
+
+
+def guess_image_type(filename: str) -> Optional[str]:
+    """파일 이름으로 MIME 타입 확인 (허용되지 않은 형식이면 None)"""
+    mime_type, _ = mimetypes.guess_type(filename or "")
+    return mime_type if mime_type in ALLOWED_MIME_TYPES else None
+
+
+def invalid_type_result() -> ClassifyResult:
+    return ClassifyResult(
+        status.HTTP_403_FORBIDDEN,
+        {
+            "status": "Forbidden",
+            "status_code": 403,
+            "detail": "Invalid file type. Allowed types: jpg, jpeg, png."
+        },
+    )
+
+
+def error_result(status_code: int, status_text: str, detail: str, headers: Optional[dict] = None) -> ClassifyResult:
+    return ClassifyResult(
+        status_code,
+        {
+            "status": status_text,
+            "status_code": status_code,
+            "detail": detail
+        },
+        headers,
+    )
+
+
+def meal_info(date) -> tuple:
+    """EXIF 촬영 시각(없으면 현재 시각)으로 (표시용 날짜, meal_type, meal_type_id) 결정"""
+    if date:
+        formatted_date = format_date(date)
+    else:
+        current_time = datetime.datetime.now()
+        formatted_date = current_time.strftime("%Y-%m-%d %H:%M:%S")
+        date = current_time  # datetime 객체를 date로 설정
+
+    meal_type = determine_meal_type(date) if date else "기타"
+    logger.info(f"Determined meal_type: {meal_type}, from date: {date}")
+    return formatted_date, meal_type, MEAL_TYPE_ID_MAP.get(meal_type, 3)
+
+
+def prediction_error(prediction) -> Optional[ClassifyResult]:
+    """Model API 호출 결과가 실패면 응답으로 변환 (정상이면 None)"""
+    if isinstance(prediction, CircuitOpenError):
+        # Model API 장애 중에는 요청을 쌓지 않고 즉시 실패
+        logger.warning(f"Model API circuit open, retry after {prediction.retry_after:.1f}s")
+        return error_result(status.HTTP_503_SERVICE_UNAVAILABLE, "Service Unavailable",
+                            "Model API is temporarily unavailable. Please retry later.",
+                            headers={"Retry-After": str(max(1, int(prediction.retry_after)))})
+    if isinstance(prediction, Exception):
+        logger.error(f"Model API request failed: {str(prediction)}")
+        return error_result(status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal Server Error",
+                            f"Model API request failed: {str(prediction)}")
+    # 모델 응답에서 category_id 확인
+    if prediction.get("category_id") is None:
+        return error_result(status.HTTP_400_BAD_REQUEST, "Bad Request", "Category ID is required")
+    return None
+
+
+async def build_classify_result(db: AsyncSession, user_id: int, meal: tuple, category_id: int,
+                                top_k: list, image_url: str) -> ClassifyResult:
+    """예측 카테고리에 음식/권장 영양소 정보를 합쳐 응답 본문을 만든다"""
+    formatted_date, meal_type, meal_type_id = meal
+
+    # 예측 카테고리와 대안 후보 카테고리를 한 번에 가져오기 (비동기 쿼리)
+    candidate_ids = {category_id} | {candidate["category_id"] for candidate in top_k}
+    result = await db.execute(select(Food_List).where(Food_List.category_id.in_(candidate_ids)))
+    foods = {row.category_id: row for row in result.scalars().all()}
+    food = foods.get(category_id)
+    if not food:
+        return error_result(status.HTTP_404_NOT_FOUND, "Not Found", "Food category not found")
+
+    # 사용자 권장 영양소 정보 가져오기 (비동기 쿼리)
+    result = await db.execute(select(Recommend).where(Recommend.user_id == user_id))
+    recommend = result.scalars().first()
+    if not recommend:
+        return error_result(status.HTTP_404_NOT_FOUND, "Not Found", "Recommendation not found")
+
+    # 클라이언트가 추가 요청 없이 보여줄 수 있는 대안 후보 (예측 카테고리 제외)
+    confidence = next((c["confidence"] for c in top_k if c["category_id"] == category_id), None)
+    alternatives = [
+        {
+            "category_id": candidate["category_id"],
+            "category_name": foods[candidate["category_id"]].category_name,
+            "confidence": candidate["confidence"],
+        }
+        for candidate in top_k
+        if candidate["category_id"] != category_id and candidate["category_id"] in foods
+    ]
+
+    # UTF-8 인코딩
+    meal_type_utf8 = meal_type.encode('utf-8').decode('utf-8')
+    category_name_utf8 = food.category_name.encode('utf-8').decode('utf-8')
+
+    return ClassifyResult(
+        status.HTTP_200_OK,
+        {
+            "status": "success",
+            "status_code": 201,
+            "detail": {
+                "wellness_image_info": {
+                    "date": formatted_date,
+                    "meal_type": meal_type_utf8,
+                    "meal_type_id": meal_type_id,
+                    "category_id": category_id,
+                    "category_name": category_name_utf8,
+                    "confidence": confidence,
+                    "alternatives": alternatives,
+                    "food_kcal": decimal_to_float(food.food_kcal),
+                    "food_car": round(float(food.food_car)),
+                    "food_prot": round(float(food.food_prot)),
+                    "food_fat": round(float(food.food_fat)),
+                    "rec_kcal": decimal_to_float(recommend.rec_kcal),
+                    "rec_car": round(float(recommend.rec_car)),
+                    "rec_prot": round(float(recommend.rec_prot)),
+                    "rec_fat": round(float(recommend.rec_fat)),
+                    "image_url": image_url
+                }
+            },
+            "message": "Image Classify Information saved successfully"
+        },
+    )
+
+
+async def classify_food_image(db: AsyncSession, user_id: int, file_bytes: bytes, mime_type: str) -> ClassifyResult:
+    """사진을 저장소에 올리고 분류한 뒤 음식/권장 영양소 정보를 합친 응답을 만든다
+
+    mime_type은 파일 시그니처로 확인한 값 (utils.upload)
+    """
+    try:
+        unique_file_name = f"{uuid.uuid4()}.{IMAGE_EXTENSIONS[mime_type]}"
+
+        # 같은 사진을 다시 올린 경우 캐시된 결과 사용 (S3 업로드/추론 생략)
+        image_hash = content_hash(file_bytes)
+        cached = await prediction_cache.get(user_id, image_hash, file_bytes)
+        if cached:
+            logger.info(f"Prediction cache hit for user {user_id}: category_id={cached.category_id}")
+        else:
+            # 이미지 S3 업로드와 모델 추론을 동시에 시작 (모델은 S3를 거치지 않고 이미 가진 바이트로 추론)
+            upload_task = asyncio.create_task(upload_image(file_bytes, unique_file_name, mime_type))
+            predict_task = asyncio.create_task(model_client.predict_bytes(file_bytes, mime_type))
+
+        # EXIF 데이터에서 날짜 추출 (업로드/추론 진행 중에 처리)
+        meal = meal_info(extract_exif_data(file_bytes))
+
+        if cached:
+            image_url, category_id, top_k = cached.image_url, cached.category_id, cached.top_k
+        else:
+            # 업로드와 추론 결과를 모두 기다린 뒤 응답
+            upload_result, prediction = await asyncio.gather(upload_task, predict_task, return_exceptions=True)
+
+            # 이미지 S3 업로드 결과 처리
+            if isinstance(upload_result, Exception):
+                return error_result(status.HTTP_403_FORBIDDEN, "Bad Request",
+                                    f"Failed to upload image to s3: {str(upload_result)}")
+            image_url = upload_result
+
+            # Model API 호출 결과 처리
+            error = prediction_error(prediction)
+            if error:
+                return error
+
+            # 상위 후보 목록 (confidence 순, 첫 항목이 category_id)
+            category_id = prediction["category_id"]
+            top_k = prediction.get("top_k") or []
+            await prediction_cache.put(user_id, image_hash, file_bytes, category_id, image_url, top_k)
+
+        return await build_classify_result(db, user_id, meal, category_id, top_k, image_url)
+
+    except Exception as e:
+        logger.error(f"Internal server error: {str(e)}")
+        return error_result(status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal Server Error",
+                            f"Internal server error: {str(e)}")
+
+
+async def classify_meal_images(db: AsyncSession, user_id: int, images: List[Tuple[bytes, str]]) -> ClassifyResult:
+    """한 끼의 여러 사진을 한 번에 분류하고 사진별 영양소와 한 끼 합계를 반환
+
+    업로드는 동시에 진행하고, 추론은 캐시에 없는 사진만 모아 Model API 배치 호출 한 번으로 처리한다.
+    음식 정보는 모든 사진의 후보 카테고리를 모아 쿼리 한 번으로 가져온다.
+    실패한 사진은 해당 항목에만 status_code/detail을 넣고 나머지 결과는 정상 반환한다.
+    """
+    try:
+        count = len(images)
+        image_urls: List[Optional[str]] = [None] * count
+        predictions: List[Optional[dict]] = [None] * count
+        item_errors: Dict[int, dict] = {}
+
+        # 같은 사진을 다시 올린 경우 캐시된 결과 사용
+        hashes = [content_hash(file_bytes) for file_bytes, _ in images]
+        pending = []
+        for i, (file_bytes, _) in enumerate(images):
+            cached = await prediction_cache.get(user_id, hashes[i], file_bytes)
+            if cached:
+                image_urls[i] = cached.image_url
+                predictions[i] = {"category_id": cached.category_id, "top_k": cached.top_k}
+            else:
+                pending.append(i)
+
+        if pending:
+            # 업로드 N건과 배치 추론 1건을 동시에 진행
+            upload_tasks = [
+                asyncio.create_task(upload_image(
+                    images[i][0], f"{uuid.uuid4()}.{IMAGE_EXTENSIONS[images[i][1]]}", images[i][1],
+                ))
+                for i in pending
+            ]
+            predict_task = asyncio.create_task(model_client.predict_batch([images[i] for i in pending]))
+            results = await asyncio.gather(predict_task, *upload_tasks, return_exceptions=True)
+            batch, uploads = results[0], results[1:]
+
+            # 배치 호출 자체가 실패하면 전체 실패 (서킷 브레이커 열림 등)
+            if isinstance(batch, Exception):
+                return prediction_error(batch)
+            # 결과 수가 다르면 사진과 결과를 짝지을 수 없으므로 전체 실패 (zip은 남는 사진을 조용히 버린다, Python 3.9라 strict 없음)
+            if len(batch) != len(pending):
+                logger.error(f"Model API returned {len(batch)} predictions for {len(pending)} images")
+                return error_result(status.HTTP_502_BAD_GATEWAY, "Bad Gateway",
+                                    f"Model API returned {len(batch)} predictions for {len(pending)} images.")
+
+            for i, upload_result, prediction in zip(pending, uploads, batch):
+                if isinstance(upload_result, Exception):
+                    item_errors[i] = {"status_code": 403, "detail": f"Failed to upload image to s3: {str(upload_result)}"}
+                elif "error" in prediction or prediction.get("category_id") is None:
+                    item_errors[i] = {"status_code": prediction.get("status_code", 400),
+                                      "detail": prediction.get("error", "Category ID is required")}
+                else:
+                    image_urls[i], predictions[i] = upload_result, prediction
+                    await prediction_cache.put(user_id, hashes[i], images[i][0], prediction["category_id"],
+                                               upload_result, prediction.get("top_k") or [])
+
+        # 한 끼 시각은 촬영 시각이 있는 첫 사진 기준 (없으면 현재 시각)
+        date = next((d for d in (extract_exif_data(file_bytes) for file_bytes, _ in images) if d), None)
+        formatted_date, meal_type, meal_type_id = meal_info(date)
+
+        # 모든 사진의 예측/대안 카테고리를 한 번에 가져오기 (비동기 쿼리)
+        candidate_ids = set()
+        for prediction in predictions:
+            if prediction:
+                candidate_ids.add(prediction["category_id"])
+                candidate_ids.update(candidate["category_id"] for candidate in prediction["top_k"] or [])
+        foods = {}
+        if candidate_ids:
+            result = await db.execute(select(Food_List).where(Food_List.category_id.in_(candidate_ids)))
+            foods = {row.category_id: row for row in result.scalars().all()}
+
+        # 사용자 권장 영양소 정보 가져오기 (비동기 쿼리)
+        result = await db.execute(select(Recommend).where(Recommend.user_id == user_id))
+        recommend = result.scalars().first()
+        if not recommend:
+            return error_result(status.HTTP_404_NOT_FOUND, "Not Found", "Recommendation not found")
+
+        items = []
+        total = {"food_kcal": Decimal(0), "food_car": Decimal(0), "food_prot": Decimal(0), "food_fat": Decimal(0)}
+        for i in range(count):
+            prediction = predictions[i]
+            food = foods.get(prediction["category_id"]) if prediction else None
+            if prediction and not food:
+                item_errors[i] = {"status_code": 404, "detail": "Food category not found"}
+            if i in item_errors:
+                items.append({"index": i, "status": "failed", **item_errors[i]})
+                continue
+
+            top_k = prediction["top_k"] or []
+            category_id = prediction["category_id"]
+            for key in total:
+                total[key] += Decimal(getattr(food, key))
+            items.append({
+                "index": i,
+                "status": "success",
+                "category_id": category_id,
+                "category_name": food.category_name,
+                "confidence": next((c["confidence"] for c in top_k if c["category_id"] == category_id), None),
+                "alternatives": [
+                    {
+                        "category_id": candidate["category_id"],
+                        "category_name": foods[candidate["category_id"]].category_name,
+                        "confidence": candidate["confidence"],
+                    }
+                    for candidate in top_k
+                    if candidate["category_id"] != category_id and candidate["category_id"] in foods
+                ],
+                "food_kcal": decimal_to_float(food.food_kcal),
+                "food_car": round(float(food.food_car)),
+                "food_prot": round(float(food.food_prot)),
+                "food_fat": round(float(food.food_fat)),
+                "image_url": image_urls[i],
+            })
+
+        succeeded = count - len(item_errors)
+        if succeeded == 0:
+            return ClassifyResult(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                {
+                    "status": "Unprocessable Entity",
+                    "status_code": 422,
+                    "detail": {"images": items},
+                },
+            )
+
+        return ClassifyResult(
+            status.HTTP_200_OK,
+            {
+                "status": "success",
+                "status_code": 201,
+                "detail": {
+                    "wellness_meal_info": {
+                        "date": formatted_date,
+                        "meal_type": meal_type,
+                        "meal_type_id": meal_type_id,
+                        "images": items,
+                        "image_count": count,
+                        "failed_count": len(item_errors),
+                        "meal_total": {
+                            "food_kcal": decimal_to_float(total["food_kcal"]),
+                            "food_car": round(float(total["food_car"])),
+                            "food_prot": round(float(total["food_prot"])),
+                            "food_fat": round(float(total["food_fat"])),
+                        },
+                        "rec_kcal": decimal_to_float(recommend.rec_kcal),
+                        "rec_car": round(float(recommend.rec_car)),
+                        "rec_prot": round(float(recommend.rec_prot)),
+                        "rec_fat": round(float(recommend.rec_fat)),
+                    }
+                },
+                "message": "Meal Classify Information saved successfully"
+            },
+        )
+
+    except Exception as e:
+        logger.error(f"Internal server error: {str(e)}")
+        return error_result(status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal Server Error",
+                            f"Internal server error: {str(e)}")
+
+
+def upload_key_for(user_id: int, mime_type: str) -> str:
+    """직접 업로드용 저장소 키 (사용자별 prefix로 다른 사용자의 이미지를 분류할 수 없게 한다)"""
+    return f"{UPLOAD_KEY_PREFIX}/{user_id}/{uuid.uuid4()}.{IMAGE_EXTENSIONS[mime_type]}"
+
+
+def owns_upload_key(user_id: int, key: str) -> bool:
+    return key.startswith(f"{UPLOAD_KEY_PREFIX}/{user_id}/") and ".." not in key.split("/")
+
+
+async def classify_uploaded_image(db: AsyncSession, user_id: int, key: str) -> ClassifyResult:
+    """클라이언트가 presigned POST로 직접 올린 이미지를 분류 (이미지 바이트는 앱 서버를 거치지 않는다)
+
+    촬영 시각은 앞부분만 ranged GET으로 읽어 구하고, 추론은 모델 서비스가 저장소에서 직접 내려받아 수행한다.
+    """
+    try:
+        if not owns_upload_key(user_id, key):
+            return error_result(status.HTTP_403_FORBIDDEN, "Forbidden", "Invalid upload key.")
+
+        uploaded = await storage.read_head(key, EXIF_RANGE_BYTES)
+        if uploaded is None:
+            return error_result(status.HTTP_404_NOT_FOUND, "Not Found", "Uploaded image not found")
+        if uploaded.content_type not in ALLOWED_MIME_TYPES:
+            return invalid_type_result()
+        if uploaded.size > PRESIGNED_UPLOAD_MAX_MB * 1024 * 1024:
+            return error_result(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "Payload Too Large",
+                                f"Image exceeds {PRESIGNED_UPLOAD_MAX_MB}MB.")
+
+        # 같은 객체(ETag)를 다시 분류하는 경우 캐시된 결과 사용
+        # 앞부분만 가지고 있으므로 perceptual hash 비교에는 쓰지 않는다
+        image_hash = f"etag:{uploaded.etag}"
+        cached = await prediction_cache.get(user_id, image_hash, b"")
+        if cached:
+            logger.info(f"Prediction cache hit for user {user_id}: category_id={cached.category_id}")
+        else:
+            predict_task = asyncio.create_task(model_client.predict_url(storage.model_url_for(key)))
+
+        # EXIF 데이터에서 날짜 추출 (추론 진행 중에 처리)
+        meal = meal_info(extract_exif_data(uploaded.head))
+
+        if cached:
+            category_id, top_k = cached.category_id, cached.top_k
+        else:
+            prediction = (await asyncio.gather(predict_task, return_exceptions=True))[0]
+            error = prediction_error(prediction)
+            if error:
+                return error
+            category_id = prediction["category_id"]
+            top_k = prediction.get("top_k") or []
+            await prediction_cache.put(user_id, image_hash, b"", category_id, storage.url_for(key), top_k)
+
+        return await build_classify_result(db, user_id, meal, category_id, top_k, storage.url_for(key))
+
+    except HTTPException as e:
+        return error_result(e.status_code, "Error", e.detail)
+    except Exception as e:
+        logger.error(f"Internal server error: {str(e)}")
+        return error_result(status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal Server Error",
+                            f"Internal server error: {str(e)}")
@@ -0,0 +1,166 @@
+# /app/services/local_transport.py
+# 같은 호스트의 모델 서비스와 통신하는 로컬 전송 클라이언트 (Unix domain socket + 공유 메모리 ring buffer)
+#
+# 모델 서비스(Wellnessmodel/app/local_transport.py)가 연결마다 만든 ring에 이미지 바이트를 직접 쓰고,
+# 소켓으로는 슬롯 번호와 길이만 담은 제어 프레임을 보낸다. 응답이 오면 슬롯을 반납한다.
+# 연결할 수 없거나 도중에 끊기면 LocalTransportError를 발생시켜 호출 측이 HTTP로 전환하도록 한다.
+import asyncio
+import itertools
+import json
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Optional
+
+from core.logging import logger
+
+PROTOCOL_VERSION = 1
+# 요청: request_id(u32), slot(u32), length(u32), top_k(u8, 0이면 기본값)
+REQUEST_FRAME = struct.Struct("!IIIB")
+# 응답: request_id(u32), JSON 길이(u32)
+RESPONSE_FRAME = struct.Struct("!II")
+
+
+class LocalTransportError(Exception):
+    """로컬 전송 경로를 사용할 수 없음 (HTTP로 전환)"""
+
+
+class LocalModelTransport:
+    def __init__(self, socket_path: str, retry_seconds: float = 30.0, connect_timeout: float = 1.0):
+        self.socket_path = socket_path
+        self.retry_seconds = retry_seconds
+        self.connect_timeout = connect_timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._segment: Optional[shared_memory.SharedMemory] = None
+        self._slot_size = 0
+        self._free_slots: Optional[asyncio.Queue] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._request_ids = itertools.count(1)
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._down_until = 0.0
+
+        # 통계
+        self.requests = 0
+        self.fallbacks = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def _connect(self):
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self.connected:
+                return
+            if time.monotonic() < self._down_until:
+                raise LocalTransportError("Local transport is unavailable")
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_unix_connection(self.socket_path), self.connect_timeout,
+                )
+                handshake = json.loads(await asyncio.wait_for(reader.readline(), self.connect_timeout))
+                if handshake.get("version") != PROTOCOL_VERSION:
+                    writer.close()
+                    raise LocalTransportError(f"Unsupported local transport version {handshake.get('version')}")
+                segment = shared_memory.SharedMemory(name=handshake["shm_name"])
+                # 모델 서비스가 segment의 소유자이므로 이 프로세스 종료 시 unlink되지 않도록 tracker에서 제외
+                resource_tracker.unregister(segment._name, "shared_memory")
+            except LocalTransportError:
+                self._down_until = time.monotonic() + self.retry_seconds
+                raise
+            except (OSError, asyncio.TimeoutError, ValueError, KeyError) as e:
+                # 소켓이 없거나 /dev/shm을 공유하지 않는 경우 (같은 호스트가 아님)
+                self._down_until = time.monotonic() + self.retry_seconds
+                raise LocalTransportError(f"Cannot connect to {self.socket_path}: {e!r}")
+
+            self._reader, self._writer, self._segment = reader, writer, segment
+            self._slot_size = handshake["slot_size"]
+            self._free_slots = asyncio.Queue()
+            for slot in range(handshake["slots"]):
+                self._free_slots.put_nowait(slot)
+            self._reader_task = asyncio.create_task(self._read_responses(reader))
+            logger.info(f"Local model transport connected ({self.socket_path}, shm={segment.name}, "
+                        f"slots={handshake['slots']}, slot_size={self._slot_size})")
+
+    async def _read_responses(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                request_id, length = RESPONSE_FRAME.unpack(await reader.readexactly(RESPONSE_FRAME.size))
+                response = json.loads(await reader.readexactly(length))
+                future = self._pending.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            logger.warning(f"Local model transport disconnected: {e!r}")
+        finally:
+            self._disconnect()
+
+    def _disconnect(self):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(LocalTransportError("Local transport connection lost"))
+        self._pending.clear()
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        self._down_until = time.monotonic() + self.retry_seconds
+        # 진행 중인 요청이 memoryview를 쓰고 있지 않으므로 바로 닫는다
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    async def predict(self, image_bytes: bytes, top_k: Optional[int] = None) -> dict:
+        """이미지를 공유 메모리 슬롯에 쓰고 분류 결과 {"status_code", "body"}를 반환"""
+        if not self.connected:
+            await self._connect()
+        if len(image_bytes) > self._slot_size:
+            raise LocalTransportError(f"Image larger than slot size ({len(image_bytes)} > {self._slot_size})")
+
+        segment, free_slots, writer = self._segment, self._free_slots, self._writer
+        slot = await free_slots.get()
+        future: Optional[asyncio.Future] = None
+        try:
+            if segment is not self._segment:
+                raise LocalTransportError("Local transport connection lost")
+            offset = slot * self._slot_size
+            segment.buf[offset:offset + len(image_bytes)] = image_bytes
+
+            request_id = next(self._request_ids) & 0xFFFFFFFF
+            future = asyncio.get_running_loop().create_future()
+            self._pending[request_id] = future
+            writer.write(REQUEST_FRAME.pack(request_id, slot, len(image_bytes), min(max(top_k or 0, 0), 255)))
+            await writer.drain()
+            self.requests += 1
+            # 호출 측이 취소되어도 응답이 올 때까지 슬롯을 잡고 있도록 future는 취소하지 않는다
+            return await asyncio.shield(future)
+        except (ConnectionError, RuntimeError) as e:
+            raise LocalTransportError(f"Local transport write failed: {e!r}")
+        finally:
+            # 서버가 슬롯을 다 읽은 뒤(응답 수신 또는 연결 종료)에만 반납 -> 읽는 동안 덮어쓰지 않는다
+            if future is not None and not future.done():
+                future.add_done_callback(lambda _: free_slots.put_nowait(slot))
+            else:
+                free_slots.put_nowait(slot)
+
+    async def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+            self._reader_task = None
+        self._disconnect()
+        self._down_until = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "socket_path": self.socket_path,
+            "connected": self.connected,
+            "requests": self.requests,
+            "fallbacks": self.fallbacks,
+            "free_slots": self._free_slots.qsize() if self._free_slots else 0,
+        }
@@ -0,0 +1,235 @@
+# /app/services/model_client.py
+import asyncio
+import random
+import time
+from typing import List, Optional, Tuple
+
+import httpx
+
+from core.logging import logger
+from core.config import (
+    MODEL_API_URL, MODEL_API_BASE_URL, MODEL_API_CONNECT_TIMEOUT, MODEL_API_READ_TIMEOUT,
+    MODEL_API_MAX_CONNECTIONS, MODEL_API_MAX_KEEPALIVE, MODEL_API_MAX_RETRIES,
+    MODEL_API_RETRY_BACKOFF, MODEL_API_BREAKER_THRESHOLD, MODEL_API_BREAKER_RESET_SECONDS,
+    MODEL_LOCAL_SOCKET, MODEL_LOCAL_RETRY_SECONDS,
+)
+from services.local_transport import LocalModelTransport, LocalTransportError
+
+# 재시도 대상 상태 코드 (일시적인 장애)
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+
+
+class ModelAPIError(Exception):
+    """Model API 호출 실패"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(ModelAPIError):
+    """서킷 브레이커가 열려 있어 호출하지 않고 즉시 실패"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Model API circuit breaker is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """연속 실패가 임계값을 넘으면 일정 시간 동안 호출을 차단하는 서킷 브레이커
+
+    closed: 정상 호출 / open: 즉시 실패 / half_open: 재시도 대기 시간이 지나 한 건만 시험 호출
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_progress = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def before_call(self):
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError(self.retry_after())
+        if state == "half_open":
+            # half_open 상태에서는 시험 호출 하나만 통과시킨다
+            if self._trial_in_progress:
+                raise CircuitOpenError(self.reset_timeout)
+            self._trial_in_progress = True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_progress = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_in_progress or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(f"Model API circuit breaker opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+        self._trial_in_progress = False
+
+    def release_trial(self):
+        # 시험 호출이 결과 없이 취소된 경우 다음 요청이 시험 호출을 할 수 있도록 한다
+        self._trial_in_progress = False
+
+
+class ModelClient:
+    """Model API 호출용 공유 비동기 HTTP 클라이언트 (keep-alive 연결 풀 사용)"""
+
+    def __init__(self, url: str, base_url: str, local_socket: str = ""):
+        self.url = url
+        self.base_url = base_url.rstrip("/")
+        self.breaker = CircuitBreaker(MODEL_API_BREAKER_THRESHOLD, MODEL_API_BREAKER_RESET_SECONDS)
+        self._client: Optional[httpx.AsyncClient] = None
+        # 모델 서비스와 같은 호스트면 Unix socket + 공유 메모리로 이미지 전달 (실패 시 HTTP)
+        self.local = LocalModelTransport(local_socket, MODEL_LOCAL_RETRY_SECONDS) if local_socket else None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # 첫 호출 시 생성해 프로세스 내에서 재사용
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    connect=MODEL_API_CONNECT_TIMEOUT,
+                    read=MODEL_API_READ_TIMEOUT,
+                    write=MODEL_API_READ_TIMEOUT,
+                    pool=MODEL_API_CONNECT_TIMEOUT,
+                ),
+                limits=httpx.Limits(
+                    max_connections=MODEL_API_MAX_CONNECTIONS,
+                    max_keepalive_connections=MODEL_API_MAX_KEEPALIVE,
+                ),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.local is not None:
+            await self.local.close()
+
+    async def _post(self, url: str, **kwargs) -> httpx.Response:
+        """재시도(지수 백오프 + jitter)와 서킷 브레이커를 적용한 POST 요청"""
+        self.breaker.before_call()
+        client = self._get_client()
+
+        try:
+            return await self._post_with_retries(client, url, **kwargs)
+        except asyncio.CancelledError:
+            self.breaker.release_trial()
+            raise
+
+    async def _post_with_retries(self, client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+        last_error: Optional[Exception] = None
+        for attempt in range(MODEL_API_MAX_RETRIES + 1):
+            if attempt:
+                # full jitter: 0 ~ backoff * 2^(attempt-1) 사이 임의 대기
+                await asyncio.sleep(random.uniform(0, MODEL_API_RETRY_BACKOFF * (2 ** (attempt - 1))))
+            try:
+                response = await client.post(url, **kwargs)
+            except httpx.TransportError as e:
+                last_error = e
+                logger.warning(f"Model API request error (attempt {attempt + 1}): {e!r}")
+                continue
+
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                last_error = ModelAPIError(f"Model API returned {response.status_code}")
+                logger.warning(f"Model API returned {response.status_code} (attempt {attempt + 1})")
+                continue
+
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+                raise ModelAPIError(f"Model API returned {response.status_code}: {response.text}", response.status_code)
+
+            # 4xx는 요청 자체의 문제이므로 서버 장애로 보지 않는다
+            self.breaker.record_success()
+            if response.status_code >= 400:
+                raise ModelAPIError(f"Model API returned {response.status_code}: {response.text}", response.status_code)
+            return response
+
+        self.breaker.record_failure()
+        raise ModelAPIError(f"Model API request failed after {MODEL_API_MAX_RETRIES + 1} attempts: {last_error!r}")
+
+    async def predict_url(self, image_url: str) -> dict:
+        response = await self._post(self.url, params={"image_url": image_url})
+        return response.json()
+
+    async def _predict_local(self, image_bytes: bytes) -> Optional[dict]:
+        """로컬 전송으로 추론 (사용할 수 없으면 None을 반환해 HTTP로 전환)
+
+        HTTP 요청과 같은 서킷 브레이커에 결과를 기록한다 (로컬 전송 실패도 실패로 센다).
+        """
+        try:
+            response = await asyncio.wait_for(self.local.predict(image_bytes), MODEL_API_READ_TIMEOUT)
+        except LocalTransportError as e:
+            self.breaker.record_failure()
+            self.local.fallbacks += 1
+            logger.info(f"Local model transport unavailable, using HTTP: {e}")
+            return None
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            raise ModelAPIError("Model API local transport timed out")
+
+        status_code = response["status_code"]
+        if status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            # 4xx는 요청 자체의 문제이므로 서버 장애로 보지 않는다
+            self.breaker.record_success()
+        if status_code >= 400:
+            detail = response["body"].get("detail")
+            raise ModelAPIError(f"Model API returned {status_code}: {detail}", status_code)
+        return response["body"]
+
+    async def predict_bytes(self, image_bytes: bytes, content_type: Optional[str] = None) -> dict:
+        """S3를 거치지 않고 이미지 바이트로 바로 추론"""
+        url = f"{self.base_url}/predict_bytes/"
+        request = {"content": image_bytes, "headers": {"Content-Type": content_type or "application/octet-stream"}}
+        if self.local is None:
+            response = await self._post(url, **request)
+            return response.json()
+
+        # 로컬 전송과 HTTP 전환을 한 번의 호출로 보고 서킷 브레이커를 한 번만 확인한다
+        # (로컬 실패로 브레이커가 열려도 이미 시작한 호출은 HTTP로 마저 시도하고, 성공하면 다시 닫힌다)
+        self.breaker.before_call()
+        try:
+            prediction = await self._predict_local(image_bytes)
+            if prediction is not None:
+                return prediction
+            response = await self._post_with_retries(self._get_client(), url, **request)
+        except asyncio.CancelledError:
+            self.breaker.release_trial()
+            raise
+        return response.json()
+
+    async def predict_batch(self, images: List[Tuple[bytes, Optional[str]]]) -> List[dict]:
+        """여러 이미지를 한 번의 요청(한 번의 batched forward pass)으로 분류
+
+        결과는 입력 순서대로 반환되며, 실패한 이미지 항목에는 error/status_code가 들어 있다.
+        """
+        files = [
+            ("files", (f"image_{i}", image_bytes, content_type or "application/octet-stream"))
+            for i, (image_bytes, content_type) in enumerate(images)
+        ]
+        response = await self._post(f"{self.base_url}/predict_batch/", files=files)
+        return response.json()["predictions"]
+
+
+# 앱 전체에서 공유하는 Model API 클라이언트
+model_client = ModelClient(MODEL_API_URL, MODEL_API_BASE_URL, MODEL_LOCAL_SOCKET)
@@ -0,0 +1,175 @@
+# /app/services/prediction_cache.py
+import asyncio
+import hashlib
+import heapq
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from core.logging import logger
+from core.config import (
+    PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_SECONDS,
+    PREDICTION_CACHE_PHASH, PREDICTION_CACHE_PHASH_DISTANCE,
+)
+
+
+@dataclass
+class CachedPrediction:
+    category_id: int
+    image_url: str
+    expires_at: float
+    phash: Optional[int] = None
+    top_k: List[dict] = field(default_factory=list)  # 모델이 반환한 상위 후보 (confidence 포함)
+
+
+def content_hash(file_bytes: bytes) -> str:
+    """이미지 바이트의 SHA-256 해시"""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def perceptual_hash(file_bytes: bytes) -> Optional[int]:
+    """재인코딩/리사이즈된 사본도 같은 값이 나오는 64비트 dHash"""
+    try:
+        img = Image.open(BytesIO(file_bytes))
+        # JPEG는 축소 디코딩으로 전체 픽셀을 풀지 않는다
+        img.draft("L", (64, 64))
+        pixels = list(img.convert("L").resize((9, 8), Image.BILINEAR).getdata())
+    except Exception:
+        return None
+
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+class PredictionCache:
+    """이미지 내용 해시 -> (category_id, S3 URL) LRU + TTL 캐시
+
+    같은 사용자가 같은 사진을 다시 올리면(저장 실패 후 재업로드, 타임아웃 재시도 등)
+    S3 업로드와 모델 추론 없이 이전 결과를 돌려준다.
+    만료는 expires_at 순 heap으로, 유사 이미지 검색은 사용자별 항목 목록에서만 한다.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, use_phash: bool = False, phash_distance: int = 0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.use_phash = use_phash
+        self.phash_distance = phash_distance
+        self._entries: "OrderedDict[Tuple[int, str], CachedPrediction]" = OrderedDict()
+        self._expiry: List[Tuple[float, Tuple[int, str]]] = []  # (expires_at, key) heap (교체된 항목은 꺼낼 때 무시)
+        self._by_user: Dict[int, Dict[Tuple[int, str], None]] = {}  # user_id -> perceptual hash가 있는 항목 key
+        self.hits = 0
+        self.phash_hits = 0
+        self.misses = 0
+
+    def _remove(self, key: Tuple[int, str]):
+        entry = self._entries.pop(key, None)
+        if entry is None or entry.phash is None:
+            return
+        keys = self._by_user.get(key[0])
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del self._by_user[key[0]]
+
+    def _evict_expired(self, now: float):
+        # 사용 순서와 관계없이 만료 시각이 가장 이른 항목부터 제거
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+
+    def _find_similar(self, user_id: int, phash: int, now: float) -> Optional[Tuple[Tuple[int, str], CachedPrediction]]:
+        # 최근에 저장한 항목부터 확인
+        for key in reversed(list(self._by_user.get(user_id, ()))):
+            entry = self._entries[key]
+            if entry.expires_at <= now:
+                continue
+            if bin(entry.phash ^ phash).count("1") <= self.phash_distance:
+                return key, entry
+        return None
+
+    async def _perceptual_hash(self, file_bytes: bytes) -> Optional[int]:
+        # 디코딩은 CPU 작업이므로 이벤트 루프 밖에서 실행
+        if not self.use_phash or not file_bytes:
+            return None
+        return await asyncio.to_thread(perceptual_hash, file_bytes)
+
+    async def get(self, user_id: int, image_hash: str, file_bytes: bytes) -> Optional[CachedPrediction]:
+        if self.max_entries <= 0:
+            return None
+
+        now = time.monotonic()
+        self._evict_expired(now)
+
+        key = (user_id, image_hash)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > now:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        if self.use_phash and user_id in self._by_user:
+            phash = await self._perceptual_hash(file_bytes)
+            found = self._find_similar(user_id, phash, time.monotonic()) if phash is not None else None
+            if found:
+                self._entries.move_to_end(found[0])
+                self.phash_hits += 1
+                logger.info(f"Prediction cache perceptual hit for user {user_id}")
+                return found[1]
+
+        self.misses += 1
+        return None
+
+    async def put(self, user_id: int, image_hash: str, file_bytes: bytes, category_id: int, image_url: str,
+                  top_k: Optional[List[dict]] = None):
+        if self.max_entries <= 0:
+            return
+
+        phash = await self._perceptual_hash(file_bytes)
+        key = (user_id, image_hash)
+        self._remove(key)
+        entry = CachedPrediction(
+            category_id=category_id,
+            image_url=image_url,
+            expires_at=time.monotonic() + self.ttl_seconds,
+            phash=phash,
+            top_k=top_k or [],
+        )
+        self._entries[key] = entry
+        heapq.heappush(self._expiry, (entry.expires_at, key))
+        if phash is not None:
+            self._by_user.setdefault(user_id, {})[key] = None
+
+        self._evict_expired(time.monotonic())
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+        # LRU로 밀려난 항목의 heap 기록이 쌓이지 않도록 정리
+        if len(self._expiry) > 2 * self.max_entries:
+            self._expiry = [(entry.expires_at, key) for key, entry in self._entries.items()]
+            heapq.heapify(self._expiry)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "phash_hits": self.phash_hits,
+            "misses": self.misses,
+        }
+
+
+# 워커 프로세스 단위 예측 캐시
+prediction_cache = PredictionCache(
+    PREDICTION_CACHE_SIZE,
+    PREDICTION_CACHE_TTL_SECONDS,
+    use_phash=PREDICTION_CACHE_PHASH,
+    phash_distance=PREDICTION_CACHE_PHASH_DISTANCE,
+)
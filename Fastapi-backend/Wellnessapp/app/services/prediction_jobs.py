@@ -0,0 +1,224 @@
+# /app/services/prediction_jobs.py
+# 비동기 예측 작업 (업로드 요청은 작업 ID만 받고 바로 끝나며, 분류는 백그라운드 워커가 처리)
+#
+#  - 작업은 크기 제한이 있는 큐에 들어가고 workers개의 워커 태스크가 순서대로 처리한다
+#  - 작업 상태는 프로세스 메모리의 JobStore에 보관되며, 끝난 작업은 ttl_seconds 뒤 / max_jobs 초과 시 오래된 것부터 삭제된다
+#  - 클라이언트는 폴링(GET /predict/jobs/{id}) 또는 SSE(GET /predict/jobs/{id}/events)로 결과를 받는다
+# 작업 상태는 워커 프로세스 단위이므로 여러 워커로 실행할 때는 같은 프로세스로 라우팅되어야 한다 (sticky session).
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import BinaryIO, Optional
+
+from core.logging import logger
+from core.config import PREDICT_JOB_WORKERS, PREDICT_JOB_QUEUE, PREDICT_JOB_MAX_JOBS, PREDICT_JOB_TTL_SECONDS
+from db.session import AsyncSessionLocal
+from services.classify_service import classify_food_image, error_result
+
+# 작업 상태: queued -> running -> succeeded | failed
+FINISHED_STATES = ("succeeded", "failed")
+
+
+class JobQueueFull(Exception):
+    """작업 큐가 가득 차 새 작업을 받을 수 없음 (HTTP 503으로 변환)"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Prediction job queue is full")
+        self.retry_after = retry_after
+
+
+class PredictionJob:
+    def __init__(self, user_id: int, image: BinaryIO, mime_type: str):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.mime_type = mime_type
+        self.state = "queued"
+        self.status_code: Optional[int] = None
+        self.result: Optional[dict] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # 처리 전까지 이미지를 담아 두는 임시 파일 (작으면 메모리, 크면 디스크)
+        self._image: Optional[BinaryIO] = image
+        # 상태가 바뀔 때마다 set 후 새 Event로 교체 (SSE 스트림이 다음 변경을 기다린다)
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def _set_state(self, state: str):
+        self.state = state
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_for_change(self, timeout: float) -> bool:
+        """상태가 바뀌면 True, timeout 동안 변화가 없으면 False"""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def info(self) -> dict:
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "status_code": self.status_code,
+            "result": self.result,
+        }
+
+
+class JobStore:
+    """작업 ID -> 작업 (크기 제한 + 끝난 작업 만료)"""
+
+    def __init__(self, max_jobs: int, ttl_seconds: float):
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._jobs: "OrderedDict[str, PredictionJob]" = OrderedDict()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def add(self, job: PredictionJob):
+        self.expire()
+        self._jobs[job.id] = job
+        # 가득 차면 끝난 작업부터 오래된 순으로 제거 (대기/실행 중인 작업은 남긴다)
+        if len(self._jobs) > self.max_jobs:
+            for job_id in [job_id for job_id, old in self._jobs.items() if old.finished]:
+                if len(self._jobs) <= self.max_jobs:
+                    break
+                del self._jobs[job_id]
+                self.evicted += 1
+
+    def get(self, job_id: str, user_id: int) -> Optional[PredictionJob]:
+        """다른 사용자의 작업은 없는 것으로 취급"""
+        self.expire()
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    def expire(self):
+        deadline = time.time() - self.ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.finished_at < deadline]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self.evicted += len(expired)
+
+    def counts(self) -> dict:
+        counts = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+        for job in self._jobs.values():
+            counts[job.state] += 1
+        return counts
+
+
+class PredictionJobRunner:
+    def __init__(self, workers: int, max_queue: int, store: JobStore):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.store = store
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list = []
+        # 작업 처리 시간 지수 이동 평균 (Retry-After 추정용)
+        self._job_seconds = 1.0
+
+        # 통계
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+
+    async def start(self):
+        # 실행 중인 이벤트 루프에서 생성 (Python 3.9 호환)
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Prediction job workers started (workers={self.workers}, max_queue={self.max_queue})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def retry_after(self) -> int:
+        """대기 중인 작업이 빠지는 데 걸릴 예상 시간(초)"""
+        queued = self._queue.qsize() if self._queue else 0
+        return min(30, max(1, int(self._job_seconds * (queued + 1) / self.workers) + 1))
+
+    def is_full(self) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    def submit(self, user_id: int, image: BinaryIO, mime_type: str) -> PredictionJob:
+        """작업 등록 (image는 작업이 끝나면 닫힌다)"""
+        if self._queue is None:
+            raise RuntimeError("Prediction job workers are not started")
+        job = PredictionJob(user_id, image, mime_type)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            image.close()
+            self.rejected += 1
+            raise JobQueueFull(self.retry_after())
+        self.store.add(job)
+        self.submitted += 1
+        return job
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: PredictionJob):
+        job.started_at = time.time()
+        job._set_state("running")
+        image, job._image = job._image, None
+        try:
+            # 디스크로 넘어간 임시 파일도 있으므로 스레드에서 읽는다
+            file_bytes = await asyncio.to_thread(image.read)
+            async with AsyncSessionLocal() as db:
+                result = await classify_food_image(db, job.user_id, file_bytes, job.mime_type)
+        except asyncio.CancelledError:
+            result = error_result(503, "Service Unavailable", "Server is shutting down. Please retry.")
+            raise
+        except Exception as e:
+            logger.error(f"Prediction job {job.id} failed: {str(e)}")
+            result = error_result(500, "Internal Server Error", f"Internal server error: {str(e)}")
+        finally:
+            image.close()
+            job.finished_at = time.time()
+            job.status_code, job.result = result.status_code, result.content
+            job._set_state("succeeded" if result.status_code < 400 else "failed")
+            self._job_seconds = 0.8 * self._job_seconds + 0.2 * (job.finished_at - job.started_at)
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "avg_job_ms": round(self._job_seconds * 1000, 1),
+            "jobs": self.store.counts(),
+            "evicted": self.store.evicted,
+        }
+
+
+# 워커 프로세스 단위 예측 작업 저장소/워커
+prediction_jobs = PredictionJobRunner(
+    PREDICT_JOB_WORKERS,
+    PREDICT_JOB_QUEUE,
+    JobStore(PREDICT_JOB_MAX_JOBS, PREDICT_JOB_TTL_SECONDS),
+)
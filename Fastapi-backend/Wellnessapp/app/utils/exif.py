@@ -0,0 +1,133 @@
+# /app/utils/exif.py
+# 픽셀 디코딩 없이 EXIF 헤더만 읽는 파서
+#
+# JPEG: SOI 이후 마커 세그먼트를 길이만큼 건너뛰며 APP1("Exif\0\0")만 찾는다 (SOS 이전에서 종료)
+# PNG : 청크를 길이만큼 건너뛰며 eXIf 청크만 찾는다
+# 찾은 TIFF 헤더에서 IFD0 -> Exif IFD(0x8769) -> DateTimeOriginal(0x9003) 순서로 바로 이동한다
+import struct
+from typing import Optional
+
+JPEG_SOI = b"\xff\xd8"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+EXIF_HEADER = b"Exif\x00\x00"
+
+TAG_EXIF_IFD_POINTER = 0x8769
+TAG_DATETIME_ORIGINAL = 0x9003
+TYPE_ASCII = 2
+TYPE_LONG = 4
+
+# 길이 필드가 없는 JPEG 마커 (TEM, RST0~7)
+_STANDALONE_MARKERS = {0x01} | set(range(0xD0, 0xD8))
+_MARKER_SOS = 0xDA
+_MARKER_EOI = 0xD9
+_MARKER_APP1 = 0xE1
+
+
+def find_jpeg_exif(data: bytes) -> Optional[memoryview]:
+    """JPEG APP1 세그먼트의 TIFF 영역을 반환 (없으면 None)"""
+    view = memoryview(data)
+    pos, size = 2, len(data)
+    while pos + 4 <= size:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # 채움(fill) 바이트
+            pos += 1
+            continue
+        if marker in _STANDALONE_MARKERS:
+            pos += 2
+            continue
+        if marker in (_MARKER_SOS, _MARKER_EOI):
+            # 이미지 데이터 시작 -> EXIF는 이보다 앞에 있어야 한다
+            return None
+
+        (length,) = struct.unpack_from(">H", data, pos + 2)
+        start, end = pos + 4, pos + 2 + length
+        if marker == _MARKER_APP1 and data[start:start + 6] == EXIF_HEADER:
+            return view[start + 6:min(end, size)]
+        pos = end
+    return None
+
+
+def find_png_exif(data: bytes) -> Optional[memoryview]:
+    """PNG eXIf 청크의 TIFF 영역을 반환 (없으면 None)"""
+    view = memoryview(data)
+    pos, size = len(PNG_SIGNATURE), len(data)
+    while pos + 8 <= size:
+        length, chunk_type = struct.unpack_from(">I4s", data, pos)
+        start = pos + 8
+        if chunk_type == b"eXIf":
+            chunk = view[start:min(start + length, size)]
+            # 일부 인코더는 JPEG처럼 "Exif\0\0" 접두사를 붙인다
+            if bytes(chunk[:6]) == EXIF_HEADER:
+                chunk = chunk[6:]
+            return chunk
+        if chunk_type == b"IEND":
+            return None
+        pos = start + length + 4  # 데이터 + CRC
+    return None
+
+
+def _find_tag(tiff: memoryview, endian: str, ifd_offset: int, tag: int):
+    """IFD에서 tag 항목을 찾아 (type, count, value_offset 위치) 반환"""
+    (count,) = struct.unpack_from(endian + "H", tiff, ifd_offset)
+    entry = ifd_offset + 2
+    for _ in range(count):
+        entry_tag, entry_type, entry_count = struct.unpack_from(endian + "HHI", tiff, entry)
+        if entry_tag == tag:
+            return entry_type, entry_count, entry + 8
+        entry += 12
+    return None
+
+
+def read_datetime_original(tiff: memoryview) -> Optional[str]:
+    """TIFF 헤더에서 DateTimeOriginal 값을 읽는다"""
+    byte_order = bytes(tiff[:2])
+    if byte_order == b"II":
+        endian = "<"
+    elif byte_order == b"MM":
+        endian = ">"
+    else:
+        return None
+
+    magic, ifd0 = struct.unpack_from(endian + "HI", tiff, 2)
+    if magic != 42:
+        return None
+
+    pointer = _find_tag(tiff, endian, ifd0, TAG_EXIF_IFD_POINTER)
+    if pointer is None:
+        return None
+    (exif_ifd,) = struct.unpack_from(endian + "I", tiff, pointer[2])
+
+    found = _find_tag(tiff, endian, exif_ifd, TAG_DATETIME_ORIGINAL)
+    if found is None:
+        return None
+    entry_type, count, value_pos = found
+    if entry_type != TYPE_ASCII:
+        return None
+
+    # 4바이트 이하면 값이 항목 안에, 아니면 offset 위치에 있다
+    if count > 4:
+        (value_pos,) = struct.unpack_from(endian + "I", tiff, value_pos)
+    if value_pos + count > len(tiff):
+        # 잘린 헤더: 일부만 읽힌 값은 날짜로 쓰지 않는다
+        return None
+    raw = bytes(tiff[value_pos:value_pos + count])
+    value = raw.split(b"\x00", 1)[0].decode("ascii", errors="ignore").strip()
+    return value or None
+
+
+def get_datetime_original(data: bytes) -> Optional[str]:
+    """이미지 바이트에서 DateTimeOriginal("YYYY:MM:DD HH:MM:SS")을 반환 (없거나 손상되면 None)"""
+    try:
+        if data.startswith(JPEG_SOI):
+            tiff = find_jpeg_exif(data)
+        elif data.startswith(PNG_SIGNATURE):
+            tiff = find_png_exif(data)
+        else:
+            return None
+        if tiff is None:
+            return None
+        return read_datetime_original(tiff)
+    except (struct.error, IndexError, ValueError):
+        return None
@@ -1,43 +1,15 @@
 # /app/utils/image_processing.py
-from PIL import Image, ExifTags, UnidentifiedImageError
-from io import BytesIO
 import datetime
 from fastapi import HTTPException, status
+from utils.exif import get_datetime_original
 
 def extract_exif_data(file_bytes: bytes):
-    try:
-        img = Image.open(BytesIO(file_bytes))
-        exif_data = img._getexif()
-        
-        if not exif_data:
-            return None
-        
-        for tag, value in exif_data.items():
-            decoded_tag = ExifTags.TAGS.get(tag, tag)
-            if decoded_tag == "DateTimeOriginal":
-                return value  
-        return None 
-    
-    except UnidentifiedImageError:
-        return HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, 
-            detail={
-                "status": "ForBidden",
-                "status_code": "403",
-                "detail": "invalid image format."
-            }
-        )
-    
-    except AttributeError:
-        return HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "status": "ForBidden",
-                "status_code": "403",
-                "detail": f"Error: {str(e)}"
-            }
-        )
-        
+    """촬영 시각(DateTimeOriginal)을 반환 (EXIF가 없거나 지원하지 않는 형식이면 None)
+
+    픽셀을 디코딩하지 않고 JPEG APP1 / PNG eXIf 헤더만 읽는다.
+    """
+    return get_datetime_original(file_bytes)
+
 def format_date(date_str: str) -> str:
     """받은 날짜 문자열을 YYYY-MM-DD HH:MM:SS 형식으로 변환합니다."""
     try:
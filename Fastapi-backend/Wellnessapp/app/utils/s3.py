@@ -1,27 +1,206 @@
 # /app/utils/s3.py
-import boto3
-from botocore.exceptions import NoCredentialsError
-from fastapi import HTTPException
-from io import BytesIO
-from dotenv import load_dotenv
+import asyncio
+import mimetypes
 import os
-from core.config import AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY
+from contextlib import AsyncExitStack
+from io import BytesIO
+from typing import NamedTuple, Optional
+
+import aioboto3
+import aiofiles
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
+from botocore.exceptions import ClientError, NoCredentialsError
+from fastapi import HTTPException
 
-# Initialize S3 client
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY
+from core.logging import logger
+from core.config import (
+    AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, BUCKET_NAME,
+    STORAGE_BACKEND, LOCAL_STORAGE_DIR, S3_MAX_POOL_CONNECTIONS, S3_UPLOAD_CONCURRENCY,
+    S3_MULTIPART_THRESHOLD_MB, S3_MULTIPART_CHUNK_MB, S3_MULTIPART_CONCURRENCY,
 )
 
-def upload_image_to_s3(image_bytes: BytesIO, bucket_name: str, file_name: str) -> str:
-    """S3에 이미지를 업로드하고 URL을 반환하는 함수"""
-    s3 = boto3.client('s3')
-    try:
-        s3.upload_fileobj(image_bytes, bucket_name, file_name)
-        image_url = f"https://{bucket_name}.s3.amazonaws.com/{file_name}"
-        return image_url
-    except NoCredentialsError:
-        raise HTTPException(status_code=500, detail="S3 credentials not available.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to upload file to S3: {str(e)}")
+MB = 1024 * 1024
+
+
+class StoredObject(NamedTuple):
+    """저장소 객체의 앞부분과 메타데이터 (ranged GET 결과)"""
+    head: bytes
+    size: int
+    content_type: Optional[str]
+    etag: str
+
+
+class S3Storage:
+    """하나의 aioboto3 S3 클라이언트를 앱 수명 동안 재사용하는 비동기 저장소
+
+    클라이언트는 처음 사용할 때 한 번 생성되며 (자격 증명 조회, 연결 풀 생성),
+    이후 업로드는 같은 연결 풀을 공유한다. 큰 파일은 multipart로 나누어 병렬 전송한다.
+    """
+
+    def __init__(self, bucket_name: str):
+        self.bucket_name = bucket_name
+        self._session = aioboto3.Session(
+            aws_access_key_id=AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        )
+        self._transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=S3_MULTIPART_CHUNK_MB * MB,
+            max_concurrency=S3_MULTIPART_CONCURRENCY,
+        )
+        # asyncio 동기화 객체는 실행 중인 이벤트 루프에서 생성 (Python 3.9 호환)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._exit_stack: Optional[AsyncExitStack] = None
+        self._client = None
+
+    async def start(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(S3_UPLOAD_CONCURRENCY)
+        async with self._lock:
+            if self._client is not None:
+                return
+            self._exit_stack = AsyncExitStack()
+            self._client = await self._exit_stack.enter_async_context(
+                self._session.client(
+                    "s3",
+                    config=BotoConfig(
+                        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                        retries={"max_attempts": 3, "mode": "adaptive"},
+                    ),
+                )
+            )
+            logger.info(f"S3 client started (bucket={self.bucket_name}, pool={S3_MAX_POOL_CONNECTIONS})")
+
+    async def close(self):
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+        self._exit_stack = None
+        self._client = None
+
+    async def get_client(self):
+        if self._client is None:
+            await self.start()
+        return self._client
+
+    def url_for(self, key: str) -> str:
+        return f"https://{self.bucket_name}.s3.amazonaws.com/{key}"
+
+    async def upload(self, data: bytes, key: str, content_type: Optional[str] = None) -> str:
+        """S3에 이미지를 업로드하고 URL을 반환"""
+        client = await self.get_client()
+        extra_args = {"ContentType": content_type} if content_type else None
+        try:
+            async with self._semaphore:
+                await client.upload_fileobj(
+                    BytesIO(data), self.bucket_name, key,
+                    ExtraArgs=extra_args, Config=self._transfer_config,
+                )
+            return self.url_for(key)
+        except NoCredentialsError:
+            raise HTTPException(status_code=500, detail="S3 credentials not available.")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to upload file to S3: {str(e)}")
+
+    def model_url_for(self, key: str) -> str:
+        """모델 서비스가 직접 내려받을 때 사용하는 주소"""
+        return f"s3://{self.bucket_name}/{key}"
+
+    async def presign_upload(self, key: str, content_type: str, max_bytes: int, expires_in: int) -> dict:
+        """클라이언트가 S3에 직접 올릴 수 있는 presigned POST (url + form fields)
+
+        Content-Type과 크기 범위를 정책 조건으로 넣어 다른 형식/큰 파일은 S3가 거절한다.
+        """
+        client = await self.get_client()
+        try:
+            return await client.generate_presigned_post(
+                self.bucket_name, key,
+                Fields={"Content-Type": content_type},
+                Conditions=[{"Content-Type": content_type}, ["content-length-range", 1, max_bytes]],
+                ExpiresIn=expires_in,
+            )
+        except NoCredentialsError:
+            raise HTTPException(status_code=500, detail="S3 credentials not available.")
+
+    async def read_head(self, key: str, length: int) -> Optional[StoredObject]:
+        """객체 앞부분 length 바이트와 크기/형식을 한 번의 ranged GET으로 가져온다 (없으면 None)"""
+        client = await self.get_client()
+        try:
+            response = await client.get_object(Bucket=self.bucket_name, Key=key, Range=f"bytes=0-{length - 1}")
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404", "InvalidRange"):
+                return None
+            raise HTTPException(status_code=500, detail=f"Failed to read file from S3: {str(e)}")
+        async with response["Body"] as stream:
+            head = await stream.read()
+        # "bytes 0-65535/1234567" -> 전체 크기
+        content_range = response.get("ContentRange")
+        size = int(content_range.rsplit("/", 1)[1]) if content_range else response["ContentLength"]
+        return StoredObject(head, size, response.get("ContentType"), response.get("ETag", "").strip('"'))
+
+
+class LocalStorage:
+    """로컬 파일 시스템 저장소 (오프라인 개발 및 업로드 경로 벤치마크용)"""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def start(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(S3_UPLOAD_CONCURRENCY)
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    async def close(self):
+        pass
+
+    def url_for(self, key: str) -> str:
+        return f"file://{os.path.abspath(os.path.join(self.root_dir, key))}"
+
+    async def upload(self, data: bytes, key: str, content_type: Optional[str] = None) -> str:
+        if self._semaphore is None:
+            await self.start()
+        path = os.path.join(self.root_dir, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            async with self._semaphore:
+                async with aiofiles.open(path, "wb") as f:
+                    await f.write(data)
+            return self.url_for(key)
+        except OSError as e:
+            raise HTTPException(status_code=500, detail=f"Failed to write file to local storage: {str(e)}")
+
+    def model_url_for(self, key: str) -> str:
+        raise HTTPException(status_code=501, detail="Direct uploads require STORAGE_BACKEND=s3.")
+
+    async def presign_upload(self, key: str, content_type: str, max_bytes: int, expires_in: int) -> dict:
+        raise HTTPException(status_code=501, detail="Direct uploads require STORAGE_BACKEND=s3.")
+
+    async def read_head(self, key: str, length: int) -> Optional[StoredObject]:
+        path = os.path.join(self.root_dir, key)
+        try:
+            size = os.path.getsize(path)
+            async with aiofiles.open(path, "rb") as f:
+                head = await f.read(length)
+        except FileNotFoundError:
+            return None
+        return StoredObject(head, size, mimetypes.guess_type(path)[0], f"{size}-{os.path.getmtime(path)}")
+
+
+def create_storage(backend: str = STORAGE_BACKEND):
+    if backend == "local":
+        return LocalStorage(LOCAL_STORAGE_DIR)
+    if backend == "s3":
+        return S3Storage(BUCKET_NAME or "default_bucket_name")
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+# 앱 전체에서 공유하는 이미지 저장소 (STORAGE_BACKEND=s3 | local)
+storage = create_storage()
+
+
+async def upload_image(image_bytes: bytes, file_name: str, content_type: Optional[str] = None) -> str:
+    """설정된 저장소에 이미지를 업로드하고 URL을 반환하는 함수"""
+    return await storage.upload(image_bytes, file_name, content_type)
@@ -0,0 +1,7 @@
+# /app/utils/security.py
+import hashlib
+
+
+def hash_token(token: str) -> str:
+    """토큰을 해시화하는 함수 (auth 테이블 조회 키, 로그 마스킹에 사용하는 고정 길이 SHA-256 hex)"""
+    return hashlib.sha256(token.encode()).hexdigest()
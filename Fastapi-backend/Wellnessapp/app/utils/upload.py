@@ -0,0 +1,102 @@
+# /app/utils/upload.py
+# 업로드 이미지 수신 (청크 단위로 읽으며 크기 제한 + magic byte로 형식 확인)
+#
+# 파일 이름/Content-Type은 클라이언트가 임의로 붙일 수 있으므로 첫 청크의 시그니처로 실제 형식을 판단한다.
+# 이미지가 아니면 첫 청크에서, 너무 크면 제한을 넘는 순간 읽기를 멈추고 UploadRejected를 발생시킨다.
+import asyncio
+import tempfile
+from typing import Awaitable, BinaryIO, Callable, Optional, Tuple
+
+from fastapi import UploadFile, status
+
+from core.config import UPLOAD_MAX_MB, UPLOAD_CHUNK_KB, UPLOAD_SPOOL_MEMORY_MB
+
+MB = 1024 * 1024
+
+# 형식별 파일 시그니처
+JPEG_MAGIC = b"\xff\xd8\xff"
+PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+
+# MIME 타입 -> 저장소 키 확장자
+IMAGE_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png"}
+
+
+class UploadRejected(Exception):
+    """업로드 파일을 받지 않음 (크기 초과 / 이미지가 아님)"""
+
+    def __init__(self, status_code: int, status_text: str, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.status_text = status_text
+        self.detail = detail
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """파일 앞부분 시그니처로 MIME 타입 판단 (JPEG/PNG가 아니면 None)"""
+    if head.startswith(JPEG_MAGIC):
+        return "image/jpeg"
+    if head.startswith(PNG_MAGIC):
+        return "image/png"
+    return None
+
+
+async def _copy_upload(file: UploadFile, write: Callable[[bytes, int], Awaitable[object]],
+                       max_bytes: int) -> Tuple[str, int]:
+    """업로드 파일을 청크 단위로 write(청크, 지금까지 받은 크기)에 넘기고 (MIME 타입, 크기)를 반환"""
+    chunk_size = UPLOAD_CHUNK_KB * 1024
+    mime_type = None
+    size = 0
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        if mime_type is None:
+            # 첫 청크에서 형식 확인 (시그니처는 최대 8바이트)
+            mime_type = sniff_image_type(chunk)
+            if mime_type is None:
+                raise UploadRejected(status.HTTP_403_FORBIDDEN, "Forbidden",
+                                     "Invalid file type. Allowed types: jpg, jpeg, png.")
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadRejected(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "Payload Too Large",
+                                 f"Image exceeds {max_bytes // MB}MB.")
+        await write(chunk, size)
+
+    if mime_type is None:
+        raise UploadRejected(status.HTTP_400_BAD_REQUEST, "Bad Request", "Empty file.")
+    return mime_type, size
+
+
+async def read_image_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_MB * MB) -> Tuple[bytes, str]:
+    """검증을 통과한 이미지 바이트와 MIME 타입을 반환 (바로 처리하는 요청용)"""
+    buffer = bytearray()
+
+    async def write(chunk: bytes, size: int):
+        buffer.extend(chunk)
+
+    mime_type, _ = await _copy_upload(file, write, max_bytes)
+    return bytes(buffer), mime_type
+
+
+async def spool_image_upload(file: UploadFile, max_bytes: int = UPLOAD_MAX_MB * MB) -> Tuple[BinaryIO, str]:
+    """검증을 통과한 이미지를 임시 파일(작으면 메모리)에 옮겨 반환 (대기열에 오래 머무는 작업용)
+
+    요청이 끝나면 UploadFile은 닫히므로 작업이 처리될 때까지 쓸 사본을 만든다. 호출 측이 닫아야 한다.
+    """
+    memory_bytes = UPLOAD_SPOOL_MEMORY_MB * MB
+    spool = tempfile.SpooledTemporaryFile(max_size=memory_bytes)
+
+    async def write(chunk: bytes, size: int):
+        if size <= memory_bytes:
+            spool.write(chunk)
+        else:
+            # 메모리 한도를 넘으면 임시 파일로 옮기고 이후 청크도 디스크에 쓰므로 이벤트 루프 밖에서 실행
+            await asyncio.to_thread(spool.write, chunk)
+
+    try:
+        mime_type, _ = await _copy_upload(file, write, max_bytes)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, mime_type
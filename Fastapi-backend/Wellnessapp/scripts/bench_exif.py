@@ -0,0 +1,112 @@
+# /scripts/bench_exif.py
+# EXIF 촬영 시각 추출 마이크로벤치마크 (헤더 전용 파서 vs PIL _getexif)
+#
+# --data-dir 를 주지 않으면 EXIF가 들어간 JPEG/PNG 샘플을 Pillow로 생성해서 사용한다.
+# 사용 예:
+#   python scripts/bench_exif.py --size 4000x3000 --repeat 200
+#   python scripts/bench_exif.py --data-dir ./photos --output exif_report.json
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from io import BytesIO
+
+from PIL import Image, ExifTags
+
+# app 디렉터리의 모듈(utils)을 import 하기 위해 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from utils.exif import get_datetime_original  # noqa: E402
+
+SAMPLE_DATETIME = "2024:05:01 12:34:56"
+
+
+def legacy_extract(file_bytes: bytes):
+    """기존 구현: 이미지를 열고 모든 EXIF 태그를 파이썬에서 순회"""
+    img = Image.open(BytesIO(file_bytes))
+    exif_data = img._getexif() if hasattr(img, "_getexif") else None
+    if not exif_data:
+        return None
+    for tag, value in exif_data.items():
+        if ExifTags.TAGS.get(tag, tag) == "DateTimeOriginal":
+            return value
+    return None
+
+
+def generate_samples(width: int, height: int) -> dict:
+    exif = Image.Exif()
+    exif[0x0110] = "bench-camera"  # Model
+    exif.get_ifd(0x8769)[0x9003] = SAMPLE_DATETIME  # DateTimeOriginal
+    image = Image.effect_noise((width, height), 64).convert("RGB")
+
+    samples = {}
+    for fmt in ("JPEG", "PNG"):
+        buffer = BytesIO()
+        image.save(buffer, format=fmt, exif=exif.tobytes())
+        samples[f"generated.{fmt.lower()}"] = buffer.getvalue()
+    return samples
+
+
+def load_samples(data_dir: str) -> dict:
+    samples = {}
+    for name in sorted(os.listdir(data_dir)):
+        if name.lower().endswith((".jpg", ".jpeg", ".png")):
+            with open(os.path.join(data_dir, name), "rb") as f:
+                samples[name] = f.read()
+    return samples
+
+
+def measure(func, data: bytes, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(data)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark header-only EXIF extraction against PIL")
+    parser.add_argument("--data-dir", help="측정할 jpg/png 폴더 (없으면 샘플 생성)")
+    parser.add_argument("--size", default="4000x3000", help="생성 샘플 크기 (WxH)")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.data_dir:
+        samples = load_samples(args.data_dir)
+    else:
+        width, height = (int(v) for v in args.size.lower().split("x"))
+        samples = generate_samples(width, height)
+    if not samples:
+        raise SystemExit("No images to benchmark")
+
+    results, mismatches = {}, []
+    for name, data in samples.items():
+        legacy_value, header_value = legacy_extract(data), get_datetime_original(data)
+        if legacy_value != header_value:
+            mismatches.append({"file": name, "legacy": legacy_value, "header_only": header_value})
+
+        legacy_us = measure(legacy_extract, data, args.repeat)
+        header_us = measure(get_datetime_original, data, args.repeat)
+        results[name] = {
+            "bytes": len(data),
+            "datetime_original": header_value,
+            "legacy_us_p50": round(statistics.median(legacy_us), 1),
+            "header_only_us_p50": round(statistics.median(header_us), 1),
+            "speedup_p50": round(statistics.median(legacy_us) / statistics.median(header_us), 1),
+        }
+        print(f"{name:<32}{len(data):>12} B  legacy {results[name]['legacy_us_p50']:>10} us  "
+              f"header-only {results[name]['header_only_us_p50']:>8} us  x{results[name]['speedup_p50']}")
+
+    report = {"repeat": args.repeat, "files": results, "mismatches": mismatches}
+    print(json.dumps({"mismatches": len(mismatches)}))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
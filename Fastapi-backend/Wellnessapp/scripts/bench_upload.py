@@ -0,0 +1,79 @@
+# /scripts/bench_upload.py
+# 이미지 업로드 경로 벤치마크 (utils/s3.py 저장소 계층)
+#
+# 기본값은 local 저장소라 네트워크/자격 증명 없이 오프라인으로 실행할 수 있다.
+# 사용 예:
+#   python scripts/bench_upload.py --count 200 --size-kb 3000 --concurrency 16
+#   STORAGE_BACKEND=s3 BUCKET_NAME=... python scripts/bench_upload.py --backend s3 --prefix bench/
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+# app 디렉터리의 모듈(core, utils)을 import 하기 위해 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from utils import s3  # noqa: E402
+
+
+async def run(args) -> dict:
+    if args.backend == "local":
+        storage = s3.LocalStorage(args.local_dir or tempfile.mkdtemp(prefix="bench_upload_"))
+    else:
+        storage = s3.create_storage(args.backend)
+
+    payload = os.urandom(args.size_kb * 1024)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def upload_one():
+        async with semaphore:
+            started = time.perf_counter()
+            await storage.upload(payload, f"{args.prefix}{uuid.uuid4()}.jpg", "image/jpeg")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    # 클라이언트 생성 비용(cold start)은 별도로 측정
+    started = time.perf_counter()
+    await storage.start()
+    start_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    await asyncio.gather(*(upload_one() for _ in range(args.count)))
+    elapsed = time.perf_counter() - started
+    await storage.close()
+
+    ordered = sorted(latencies)
+    return {
+        "backend": args.backend,
+        "count": args.count,
+        "size_kb": args.size_kb,
+        "concurrency": args.concurrency,
+        "client_start_ms": round(start_ms, 2),
+        "uploads_per_s": round(args.count / elapsed, 1),
+        "mb_per_s": round(args.count * args.size_kb / 1024 / elapsed, 1),
+        "latency_ms_p50": round(statistics.median(ordered), 2),
+        "latency_ms_p95": round(ordered[int(0.95 * (len(ordered) - 1))], 2),
+        "latency_ms_max": round(ordered[-1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the image upload path")
+    parser.add_argument("--backend", choices=["local", "s3"], default="local")
+    parser.add_argument("--local-dir", help="local 저장소 경로 (기본: 임시 디렉터리)")
+    parser.add_argument("--prefix", default="", help="업로드 키 접두사")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--size-kb", type=int, default=3000, help="업로드 파일 크기 (휴대폰 사진 평균 약 3MB)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
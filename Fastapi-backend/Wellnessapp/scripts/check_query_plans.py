@@ -0,0 +1,209 @@
+# /scripts/check_query_plans.py
+# 자주 쓰는 조회의 실행 계획 확인 (인덱스가 빠져 Seq Scan으로 돌아가면 실패)
+#
+# 마이그레이션이 적용된 DB에 대량의 데이터를 넣고 ANALYZE 한 뒤, 앱과 같은 형태의 조회를 EXPLAIN 한다.
+# 데이터 생성부터 확인까지 한 트랜잭션에서 하고 마지막에 rollback 하므로 남는 데이터는 없다.
+# 다만 실행 중에는 대상 테이블에 쓰기 잠금이 걸리므로 운영 DB가 아닌 검증용 DB에서 실행한다.
+# 사용 예:
+#   python scripts/check_query_plans.py --database-url postgresql+asyncpg://user:pw@localhost/wellness_check
+#   python scripts/check_query_plans.py --users 50000 --output plan_report.json
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# app 디렉터리의 모듈(core)을 import 하기 위해 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from core.config import DATABASE_URL  # noqa: E402
+
+SEED_PREFIX = "plancheck"
+
+# 검증용 데이터 (사용자 수에 비례, :users / :history_per_user / :days / :foods / :logs 파라미터)
+SEED_SQL = [
+    """
+    INSERT INTO meal_type (id, type_name)
+    SELECT coalesce(max(id), 0) + 1, 'check' FROM meal_type
+    HAVING count(*) = 0
+    """,
+    """
+    INSERT INTO food_list (id, category_id, food_name, category_name, food_kcal, food_car, food_prot, food_fat)
+    SELECT base.max_id + g, base.max_id + g, 'check', 'check', 100, 10, 10, 10
+    FROM generate_series(1, CAST(:foods AS integer)) AS g,
+         (SELECT coalesce(max(id), 0) AS max_id FROM food_list) AS base
+    """,
+    """
+    INSERT INTO user_info (age, gender, height, weight, birthday, email, nickname, created_at, updated_at)
+    SELECT 30, g % 2, 170.0, 65.0, DATE '1994-01-01',
+           CAST(:prefix AS text) || '-' || g || '@example.com', CAST(:prefix AS text), now(), now()
+    FROM generate_series(1, CAST(:users AS integer)) AS g
+    """,
+    """
+    CREATE TEMP TABLE seed_users ON COMMIT DROP AS
+    SELECT id FROM user_info WHERE nickname = CAST(:prefix AS text) AND email LIKE CAST(:prefix AS text) || '-%'
+    """,
+    """
+    INSERT INTO auth (user_id, access_token, access_token_digest, access_created_at, access_expired_at,
+                      refresh_token, refresh_token_digest, refresh_created_at, refresh_expired_at)
+    SELECT id, access_token, encode(sha256(convert_to(access_token, 'UTF8')), 'hex'), now(), now() + interval '30 minutes',
+           refresh_token, encode(sha256(convert_to(refresh_token, 'UTF8')), 'hex'), now(), now() + interval '7 days'
+    FROM (
+        SELECT id, CAST(:prefix AS text) || '-access-' || id AS access_token,
+               CAST(:prefix AS text) || '-refresh-' || id AS refresh_token
+        FROM seed_users
+    ) AS tokens
+    """,
+    """
+    INSERT INTO recommend (user_id, rec_kcal, rec_car, rec_prot, rec_fat, updated_at)
+    SELECT id, 2000, 250, 60, 50, now() FROM seed_users
+    """,
+    """
+    INSERT INTO total_today (user_id, total_kcal, total_car, total_prot, total_fat, condition,
+                             created_at, updated_at, today, history_ids)
+    SELECT u.id, 0, 0, 0, 0, false, now(), now(), current_date - g, '{}'
+    FROM seed_users AS u, generate_series(0, CAST(:days AS integer) - 1) AS g
+    """,
+    """
+    INSERT INTO history (user_id, category_id, meal_type_id, image_url, date, created_at, updated_at)
+    SELECT u.id, food.min_id + (g % CAST(:foods AS integer)), meal.id, CAST(:prefix AS text),
+           now() - g * interval '7 hours', now(), now()
+    FROM seed_users AS u, generate_series(1, CAST(:history_per_user AS integer)) AS g,
+         (SELECT max(id) - CAST(:foods AS integer) + 1 AS min_id FROM food_list) AS food,
+         (SELECT min(id) AS id FROM meal_type) AS meal
+    """,
+    """
+    INSERT INTO logs (req_url, method, code, time_stamp)
+    SELECT '/' || CAST(:prefix AS text), 'GET', 200, now() - g * interval '1 second'
+    FROM generate_series(1, CAST(:logs AS integer)) AS g
+    """,
+]
+
+ANALYZE_TABLES = ("user_info", "auth", "recommend", "food_list", "meal_type", "history", "total_today", "logs")
+
+# (이름, Seq Scan이 나오면 안 되는 테이블, 앱과 같은 형태의 조회)
+HOT_QUERIES = [
+    ("meal_records", "history", """
+        SELECT h.id, h.date, h.meal_type_id, h.category_id, m.type_name, f.category_name,
+               first_value(f.food_kcal) OVER (PARTITION BY h.category_id)
+        FROM history AS h
+        JOIN food_list AS f ON h.category_id = f.category_id
+        JOIN meal_type AS m ON h.meal_type_id = m.id
+        WHERE h.date >= current_date AND h.date < current_date + 1 AND h.user_id = :user_id
+        ORDER BY h.id
+    """),
+    ("history_by_user_date", "history",
+     "SELECT * FROM history WHERE user_id = :user_id AND date >= current_date - 7 AND date < current_date + 1"),
+    ("total_today_by_user_today", "total_today",
+     "SELECT * FROM total_today WHERE user_id = :user_id AND today = current_date"),
+    ("recommend_by_user", "recommend", "SELECT * FROM recommend WHERE user_id = :user_id"),
+    ("food_by_category", "food_list", "SELECT * FROM food_list WHERE category_id = :category_id"),
+    ("auth_by_user", "auth", "SELECT * FROM auth WHERE user_id = :user_id"),
+    ("auth_by_access_digest", "auth", "SELECT user_id, access_expired_at FROM auth WHERE access_token_digest = :digest"),
+    ("daily_logs", "logs", "SELECT * FROM logs WHERE time_stamp >= now() - interval '1 day'"),
+]
+
+
+def seq_scans(plan: dict) -> list:
+    """실행 계획 트리에서 Seq Scan 대상 테이블 목록"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+def scan_nodes(plan: dict) -> list:
+    """보고서용 스캔 노드 요약 (노드 종류, 테이블, 인덱스)"""
+    nodes = []
+    if "Relation Name" in plan:
+        nodes.append({k: plan[k] for k in ("Node Type", "Relation Name", "Index Name") if k in plan})
+    for child in plan.get("Plans", []):
+        nodes.extend(scan_nodes(child))
+    return nodes
+
+
+async def run(args) -> dict:
+    engine = create_async_engine(args.database_url)
+    seed_params = {
+        "prefix": SEED_PREFIX,
+        "users": args.users,
+        "history_per_user": args.history_per_user,
+        "days": args.days,
+        "foods": args.foods,
+        "logs": args.logs,
+    }
+    results = []
+    try:
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            try:
+                for statement in SEED_SQL:
+                    await conn.execute(text(statement), seed_params)
+                for table in ANALYZE_TABLES:
+                    await conn.exec_driver_sql(f"ANALYZE {table}")
+
+                # 생성한 사용자/음식 중 가운데 값으로 조회
+                user_id = (await conn.execute(text(
+                    "SELECT id FROM seed_users ORDER BY id OFFSET :offset LIMIT 1"), {"offset": args.users // 2}
+                )).scalar()
+                category_id = (await conn.execute(text("SELECT max(category_id) FROM food_list"))).scalar()
+                digest = (await conn.execute(text(
+                    "SELECT access_token_digest FROM auth WHERE user_id = :user_id"), {"user_id": user_id}
+                )).scalar()
+                params = {"user_id": user_id, "category_id": category_id, "digest": digest}
+
+                for name, table, sql in HOT_QUERIES:
+                    plan = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params)).scalar()
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    root = plan[0]["Plan"]
+                    results.append({
+                        "query": name,
+                        "table": table,
+                        "ok": table not in seq_scans(root),
+                        "total_cost": root.get("Total Cost"),
+                        "scans": scan_nodes(root),
+                    })
+            finally:
+                await transaction.rollback()
+    finally:
+        await engine.dispose()
+
+    return {
+        "seed": {k: v for k, v in seed_params.items() if k != "prefix"},
+        "ok": all(result["ok"] for result in results),
+        "queries": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a hot query falls back to a sequential scan")
+    parser.add_argument("--database-url", default=DATABASE_URL, help="검증용 DB 주소 (기본: .env의 DATABASE_URL)")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--history-per-user", type=int, default=20)
+    parser.add_argument("--days", type=int, default=30, help="사용자별 total_today 일 수")
+    parser.add_argument("--foods", type=int, default=2000)
+    parser.add_argument("--logs", type=int, default=500000)
+    parser.add_argument("--output", help="보고서 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+    for result in report["queries"]:
+        if not result["ok"]:
+            print(f"Sequential scan on {result['table']} in {result['query']}", file=sys.stderr)
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
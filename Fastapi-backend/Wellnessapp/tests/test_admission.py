@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from core import middlewares
+from services.admission import AdmissionController, AdmissionRejected
+
+
+async def hold_slot(controller: AdmissionController, release: asyncio.Event, entered: list, name: str):
+    async with controller.slot():
+        entered.append(name)
+        await release.wait()
+
+
+async def test_limits_concurrency_and_hands_slots_over_in_order():
+    controller = AdmissionController(max_concurrent=2, max_queue=4, queue_timeout=1)
+    release = asyncio.Event()
+    entered = []
+
+    tasks = [asyncio.create_task(hold_slot(controller, release, entered, name)) for name in "abcd"]
+    await asyncio.sleep(0.01)
+
+    assert entered == ["a", "b"]
+    assert (controller.in_flight, controller.queued) == (2, 2)
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    # 대기한 요청은 도착 순서대로 슬롯을 넘겨받는다
+    assert entered == ["a", "b", "c", "d"]
+    assert (controller.in_flight, controller.queued) == (0, 0)
+    assert controller.admitted == 4
+    assert controller.queued_total == 2
+
+
+async def test_rejects_when_queue_is_full():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=1)
+    release = asyncio.Event()
+    entered = []
+    tasks = [asyncio.create_task(hold_slot(controller, release, entered, name)) for name in "ab"]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        async with controller.slot():
+            pass
+    assert exc_info.value.reason == "queue_full"
+    assert exc_info.value.retry_after >= 1
+    assert controller.rejected_queue_full == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+async def test_rejects_after_queue_timeout():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.02)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold_slot(controller, release, [], "a"))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        async with controller.slot():
+            pass
+    assert exc_info.value.reason == "queue_timeout"
+    assert controller.queued == 0
+
+    release.set()
+    await holder
+    assert controller.in_flight == 0
+
+
+async def test_cancelled_waiter_does_not_leak_slot():
+    controller = AdmissionController(max_concurrent=1, max_queue=2, queue_timeout=1)
+    release = asyncio.Event()
+    entered = []
+    holder = asyncio.create_task(hold_slot(controller, release, entered, "a"))
+    waiter = asyncio.create_task(hold_slot(controller, release, entered, "b"))
+    await asyncio.sleep(0.01)
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    release.set()
+    await holder
+
+    assert entered == ["a"]
+    assert (controller.in_flight, controller.queued) == (0, 0)
+
+
+def test_retry_after_scales_with_queue_and_is_capped():
+    controller = AdmissionController(max_concurrent=2, max_queue=100, queue_timeout=1, max_retry_after=10)
+    controller._service_seconds = 1.5
+
+    assert controller.retry_after() == 1  # ceil(1.5 * 1 / 2)
+    controller._waiters.extend(object() for _ in range(3))
+    assert controller.retry_after() == 3  # ceil(1.5 * 4 / 2)
+    controller._waiters.extend(object() for _ in range(50))
+    assert controller.retry_after() == 10
+
+
+async def test_middleware_sheds_load_with_retry_after(monkeypatch):
+    controller = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=1)
+    monkeypatch.setitem(middlewares.ADMISSION_CONTROLLED_PATHS, ("POST", "/busy"), controller)
+
+    app = FastAPI()
+    app.middleware("http")(middlewares.admission_control)
+    release = asyncio.Event()
+
+    @app.post("/busy")
+    async def busy():
+        await release.wait()
+        return {"ok": True}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        first = asyncio.create_task(client.post("/busy"))
+        await asyncio.sleep(0.05)
+        rejected = await client.post("/busy")
+        release.set()
+        accepted = await first
+
+    assert accepted.status_code == 200
+    assert rejected.status_code == 503
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert rejected.json()["status_code"] == 503
+
+
+def test_predict_routes_share_admission_control():
+    for path in ("/api/v1/model/predict", "/api/v1/model/predict/meal", "/api/v1/model/predict/by-key"):
+        assert middlewares.ADMISSION_CONTROLLED_PATHS[("POST", path)] is middlewares.predict_admission
@@ -0,0 +1,22 @@
+from db.models import Auth
+from utils.security import hash_token
+
+
+def test_digests_set_from_constructor():
+    auth = Auth(user_id=1, access_token="access-1", refresh_token="refresh-1")
+
+    assert auth.access_token_digest == hash_token("access-1")
+    assert auth.refresh_token_digest == hash_token("refresh-1")
+    assert len(auth.access_token_digest) == 64
+
+
+def test_digests_follow_token_reassignment():
+    auth = Auth(user_id=1, access_token="access-1", refresh_token="refresh-1")
+
+    # 토큰 갱신 시 digest도 같이 바뀌어야 조회 키가 어긋나지 않는다
+    auth.access_token = "access-2"
+    assert auth.access_token_digest == hash_token("access-2")
+    assert auth.refresh_token_digest == hash_token("refresh-1")
+
+    auth.refresh_token = "refresh-2"
+    assert auth.refresh_token_digest == hash_token("refresh-2")
@@ -0,0 +1,59 @@
+import pytest
+
+from services import classify_service
+from services.classify_service import classify_meal_images
+
+
+class FakeCache:
+    def __init__(self):
+        self.puts = []
+
+    async def get(self, user_id, image_hash, file_bytes):
+        return None
+
+    async def put(self, *args):
+        self.puts.append(args)
+
+
+class FakeModelClient:
+    def __init__(self, predictions):
+        self.predictions = predictions
+        self.calls = []
+
+    async def predict_batch(self, images):
+        self.calls.append(images)
+        return self.predictions
+
+
+class FakeDB:
+    async def execute(self, statement):
+        raise AssertionError("DB should not be queried when the batch cannot be paired")
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    fake = FakeCache()
+    monkeypatch.setattr(classify_service, "prediction_cache", fake)
+
+    async def fake_upload(file_bytes, file_name, mime_type):
+        return f"https://images.test/{file_name}"
+
+    monkeypatch.setattr(classify_service, "upload_image", fake_upload)
+    return fake
+
+
+@pytest.mark.parametrize("returned", [1, 3])
+async def test_mismatched_prediction_count_returns_502(cache, monkeypatch, returned):
+    predictions = [{"category_id": 1, "top_k": []}] * returned
+    client = FakeModelClient(predictions)
+    monkeypatch.setattr(classify_service, "model_client", client)
+    images = [(b"first", "image/jpeg"), (b"second", "image/png")]
+
+    result = await classify_meal_images(FakeDB(), 1, images)
+
+    assert result.status_code == 502
+    assert result.content["status"] == "Bad Gateway"
+    assert f"{returned} predictions for 2 images" in result.content["detail"]
+    assert len(client.calls) == 1
+    # 짝을 못 지은 결과는 캐시에 남기지 않는다
+    assert cache.puts == []
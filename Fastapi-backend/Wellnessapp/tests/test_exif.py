@@ -0,0 +1,114 @@
+import struct
+import zlib
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from utils.exif import get_datetime_original
+
+TAKEN_AT = "2024:10:18 12:34:56"
+
+
+def exif_block(taken_at: str = TAKEN_AT) -> Image.Exif:
+    exif = Image.Exif()
+    exif[0x0110] = "TestCam"  # IFD0 Model
+    exif[0x8769] = {0x9003: taken_at}  # Exif IFD -> DateTimeOriginal
+    return exif
+
+
+def encode(fmt: str, exif=None) -> bytes:
+    buffer = BytesIO()
+    img = Image.new("RGB", (32, 24), (200, 120, 40))
+    if exif is None:
+        img.save(buffer, fmt)
+    else:
+        img.save(buffer, fmt, exif=exif)
+    return buffer.getvalue()
+
+
+def big_endian_tiff(taken_at: str = TAKEN_AT) -> bytes:
+    """Motorola(MM) 바이트 순서 TIFF: IFD0(Exif 포인터 1개) -> Exif IFD(DateTimeOriginal 1개)"""
+    value = taken_at.encode("ascii") + b"\x00"
+    ifd0 = 8
+    exif_ifd = ifd0 + 2 + 12 + 4
+    value_offset = exif_ifd + 2 + 12 + 4
+    return (
+        b"MM" + struct.pack(">HI", 42, ifd0)
+        + struct.pack(">H", 1) + struct.pack(">HHII", 0x8769, 4, 1, exif_ifd) + struct.pack(">I", 0)
+        + struct.pack(">H", 1) + struct.pack(">HHII", 0x9003, 2, len(value), value_offset) + struct.pack(">I", 0)
+        + value
+    )
+
+
+def png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG"])
+def test_reads_datetime_original(fmt):
+    assert get_datetime_original(encode(fmt, exif_block())) == TAKEN_AT
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG"])
+def test_image_without_exif(fmt):
+    assert get_datetime_original(encode(fmt)) is None
+
+
+def test_exif_without_datetime_original():
+    exif = Image.Exif()
+    exif[0x0110] = "TestCam"
+    assert get_datetime_original(encode("JPEG", exif)) is None
+
+
+def test_big_endian_jpeg_app1():
+    tiff = big_endian_tiff()
+    app1 = b"\xff\xe1" + struct.pack(">H", len(tiff) + 8) + b"Exif\x00\x00" + tiff
+    data = b"\xff\xd8" + app1 + encode("JPEG")[2:]
+    assert get_datetime_original(data) == TAKEN_AT
+
+
+def test_png_exif_chunk_with_exif_prefix():
+    png = encode("PNG")
+    ihdr_end = 8 + 25  # 시그니처 + IHDR 청크
+    data = png[:ihdr_end] + png_chunk(b"eXIf", b"Exif\x00\x00" + big_endian_tiff()) + png[ihdr_end:]
+    assert get_datetime_original(data) == TAKEN_AT
+
+
+def test_stops_at_image_data_before_exif():
+    # SOS 뒤에 있는 APP1은 EXIF로 보지 않는다
+    tiff = big_endian_tiff()
+    app1 = b"\xff\xe1" + struct.pack(">H", len(tiff) + 8) + b"Exif\x00\x00" + tiff
+    data = b"\xff\xd8" + b"\xff\xda\x00\x02" + app1
+    assert get_datetime_original(data) is None
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "PNG"])
+def test_truncated_headers_never_raise(fmt):
+    data = encode(fmt, exif_block())
+    for cut in range(len(data)):
+        result = get_datetime_original(data[:cut])
+        assert result in (None, TAKEN_AT)
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"GIF89a....",
+    b"\xff\xd8",
+    b"\xff\xd8\x00\x00\x00\x00",  # 마커가 아닌 바이트
+    b"\xff\xd8\xff\xe1\xff\xff" + b"Exif\x00\x00",  # 길이가 데이터보다 긴 APP1
+    b"\xff\xd8\xff\xe1\x00\x10Exif\x00\x00XX\x00\x2a\x00\x00\x00\x08",  # 알 수 없는 바이트 순서
+    b"\xff\xd8\xff\xe1\x00\x10Exif\x00\x00II\x2b\x00\x08\x00\x00\x00",  # TIFF magic 불일치
+    b"\xff\xd8\xff\xe1\x00\x10Exif\x00\x00II\x2a\x00\xff\xff\xff\x7f",  # IFD offset이 범위 밖
+    b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 2 ** 31) + b"eXIf",  # 길이가 데이터보다 긴 eXIf
+])
+def test_corrupt_headers_return_none(data):
+    assert get_datetime_original(data) is None
+
+
+def test_corrupt_exif_ifd_pointer_returns_none():
+    tiff = bytearray(big_endian_tiff())
+    # Exif IFD 포인터를 범위 밖으로
+    struct.pack_into(">I", tiff, 8 + 2 + 8, 0x7FFFFFFF)
+    app1 = b"\xff\xe1" + struct.pack(">H", len(tiff) + 8) + b"Exif\x00\x00" + bytes(tiff)
+    assert get_datetime_original(b"\xff\xd8" + app1) is None
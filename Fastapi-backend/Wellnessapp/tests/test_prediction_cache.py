@@ -0,0 +1,145 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from services import prediction_cache as prediction_cache_module
+from services.prediction_cache import PredictionCache, content_hash, perceptual_hash
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(prediction_cache_module.time, "monotonic", fake)
+    return fake
+
+
+def encode(img: Image.Image, fmt: str = "JPEG", **kwargs) -> bytes:
+    buffer = BytesIO()
+    img.save(buffer, fmt, **kwargs)
+    return buffer.getvalue()
+
+
+def gradient(size=(256, 192), flip: bool = False) -> Image.Image:
+    img = Image.new("RGB", size)
+    img.putdata([
+        ((x * 255 // size[0]), (y * 255 // size[1]), ((x + y) * 127 // sum(size)))
+        for y in range(size[1]) for x in range(size[0])
+    ])
+    return img.transpose(Image.FLIP_LEFT_RIGHT) if flip else img
+
+
+async def test_exact_hit_is_scoped_to_user(clock):
+    cache = PredictionCache(max_entries=10, ttl_seconds=60)
+    await cache.put(1, "hash", b"", category_id=3, image_url="s3://a", top_k=[{"category_id": 3}])
+
+    entry = await cache.get(1, "hash", b"")
+    assert (entry.category_id, entry.image_url, entry.top_k) == (3, "s3://a", [{"category_id": 3}])
+    assert await cache.get(2, "hash", b"") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_entries_expire_after_ttl(clock):
+    cache = PredictionCache(max_entries=10, ttl_seconds=60)
+    await cache.put(1, "hash", b"", 3, "s3://a")
+
+    clock.now += 59
+    assert await cache.get(1, "hash", b"") is not None
+    clock.now += 1
+    assert await cache.get(1, "hash", b"") is None
+    assert cache.stats()["entries"] == 0
+
+
+async def test_recently_used_expired_entry_is_evicted(clock):
+    cache = PredictionCache(max_entries=10, ttl_seconds=60)
+    await cache.put(1, "old", b"", 1, "s3://old")
+    clock.now += 30
+    await cache.put(1, "new", b"", 2, "s3://new")
+    clock.now += 20
+    # old를 최근 사용으로 올려 LRU 순서상 new 뒤에 둔다
+    assert await cache.get(1, "old", b"") is not None
+
+    clock.now += 15
+    await cache.get(1, "missing", b"")
+
+    # LRU 순서와 관계없이 만료된 old만 제거
+    assert [key for key, _ in cache._entries.items()] == [(1, "new")]
+
+
+async def test_lru_eviction_when_full(clock):
+    cache = PredictionCache(max_entries=2, ttl_seconds=60)
+    await cache.put(1, "a", b"", 1, "s3://a")
+    await cache.put(1, "b", b"", 2, "s3://b")
+    await cache.get(1, "a", b"")
+    await cache.put(1, "c", b"", 3, "s3://c")
+
+    assert await cache.get(1, "b", b"") is None
+    assert await cache.get(1, "a", b"") is not None
+    assert await cache.get(1, "c", b"") is not None
+
+
+async def test_replacing_entry_refreshes_ttl(clock):
+    cache = PredictionCache(max_entries=10, ttl_seconds=60)
+    await cache.put(1, "hash", b"", 1, "s3://a")
+    clock.now += 50
+    await cache.put(1, "hash", b"", 2, "s3://b")
+    clock.now += 20
+
+    entry = await cache.get(1, "hash", b"")
+    assert entry.category_id == 2
+
+
+async def test_disabled_cache_stores_nothing(clock):
+    cache = PredictionCache(max_entries=0, ttl_seconds=60)
+    await cache.put(1, "hash", b"", 1, "s3://a")
+    assert await cache.get(1, "hash", b"") is None
+
+
+def test_perceptual_hash_survives_reencoding_and_resizing():
+    original = gradient()
+    reencoded = encode(original.resize((128, 96)), quality=60)
+
+    distance = bin(perceptual_hash(encode(original)) ^ perceptual_hash(reencoded)).count("1")
+    assert distance <= 4
+    assert perceptual_hash(b"not an image") is None
+
+
+async def test_perceptual_hit_for_near_duplicate(clock):
+    cache = PredictionCache(max_entries=10, ttl_seconds=60, use_phash=True, phash_distance=6)
+    original = encode(gradient())
+    await cache.put(1, content_hash(original), original, 4, "s3://a")
+
+    copy = encode(gradient().resize((200, 150)), quality=70)
+    entry = await cache.get(1, content_hash(copy), copy)
+
+    assert entry is not None and entry.category_id == 4
+    assert cache.phash_hits == 1
+    # 다른 사용자의 사진과는 비교하지 않는다
+    assert await cache.get(2, content_hash(copy), copy) is None
+
+
+async def test_different_image_is_not_a_perceptual_hit(clock):
+    cache = PredictionCache(max_entries=10, ttl_seconds=60, use_phash=True, phash_distance=6)
+    original = encode(gradient())
+    await cache.put(1, content_hash(original), original, 4, "s3://a")
+
+    other = encode(gradient(flip=True))
+    assert await cache.get(1, content_hash(other), other) is None
+
+
+async def test_evicted_entries_leave_user_index(clock):
+    cache = PredictionCache(max_entries=1, ttl_seconds=60, use_phash=True, phash_distance=6)
+    first = encode(gradient())
+    await cache.put(1, content_hash(first), first, 4, "s3://a")
+    await cache.put(2, "etag:x", b"", 5, "s3://b")
+
+    assert 1 not in cache._by_user
+    assert await cache.get(1, "other", first) is None
@@ -0,0 +1,171 @@
+import asyncio
+from contextlib import asynccontextmanager
+from io import BytesIO
+
+import pytest
+
+from services import prediction_jobs as prediction_jobs_module
+from services.classify_service import ClassifyResult, error_result
+from services.prediction_jobs import JobQueueFull, JobStore, PredictionJob, PredictionJobRunner
+
+
+class FakeClassifier:
+    """classify_food_image 대신 호출되어 받은 이미지를 기록하고, release가 set될 때까지 기다린다"""
+
+    def __init__(self, result: ClassifyResult = None, error: Exception = None):
+        self.result = result or ClassifyResult(200, {"status": "OK", "category_id": 3})
+        self.error = error
+        self.release = asyncio.Event()
+        self.calls = []
+
+    async def __call__(self, db, user_id, file_bytes, mime_type):
+        self.calls.append((user_id, file_bytes, mime_type))
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return self.result
+
+
+@asynccontextmanager
+async def fake_session():
+    yield object()
+
+
+@pytest.fixture
+async def runner(monkeypatch):
+    monkeypatch.setattr(prediction_jobs_module, "AsyncSessionLocal", fake_session)
+    job_runner = PredictionJobRunner(workers=1, max_queue=2, store=JobStore(max_jobs=10, ttl_seconds=60))
+    await job_runner.start()
+    yield job_runner
+    await job_runner.stop()
+
+
+def finished_job(user_id: int = 1, finished_at: float = 0.0) -> PredictionJob:
+    job = PredictionJob(user_id, BytesIO(), "image/jpeg")
+    job.state = "succeeded"
+    job.finished_at = finished_at
+    return job
+
+
+async def wait_until(job: PredictionJob, state: str):
+    while job.state != state:
+        assert await job.wait_for_change(1)
+
+
+async def test_job_lifecycle_succeeds(runner, monkeypatch):
+    classifier = FakeClassifier()
+    monkeypatch.setattr(prediction_jobs_module, "classify_food_image", classifier)
+    image = BytesIO(b"jpeg bytes")
+
+    job = runner.submit(7, image, "image/jpeg")
+    assert job.state == "queued"
+    assert runner.store.get(job.id, 7) is job
+
+    await wait_until(job, "running")
+    assert job.started_at is not None
+    classifier.release.set()
+    await wait_until(job, "succeeded")
+
+    assert classifier.calls == [(7, b"jpeg bytes", "image/jpeg")]
+    assert (job.status_code, job.result) == (200, {"status": "OK", "category_id": 3})
+    assert job.info()["state"] == "succeeded"
+    assert image.closed
+    assert runner.completed == 1
+
+
+async def test_error_result_marks_job_failed(runner, monkeypatch):
+    classifier = FakeClassifier(result=error_result(400, "Bad Request", "Category ID is required"))
+    classifier.release.set()
+    monkeypatch.setattr(prediction_jobs_module, "classify_food_image", classifier)
+
+    job = runner.submit(1, BytesIO(b"x"), "image/png")
+    await wait_until(job, "failed")
+
+    assert job.status_code == 400
+    assert job.result["detail"] == "Category ID is required"
+
+
+async def test_exception_marks_job_failed_with_500(runner, monkeypatch):
+    classifier = FakeClassifier(error=RuntimeError("boom"))
+    classifier.release.set()
+    monkeypatch.setattr(prediction_jobs_module, "classify_food_image", classifier)
+
+    job = runner.submit(1, BytesIO(b"x"), "image/png")
+    await wait_until(job, "failed")
+
+    assert job.status_code == 500
+    assert "boom" in job.result["detail"]
+
+
+async def test_rejects_when_queue_is_full(runner, monkeypatch):
+    classifier = FakeClassifier()
+    monkeypatch.setattr(prediction_jobs_module, "classify_food_image", classifier)
+
+    running = runner.submit(1, BytesIO(b"1"), "image/jpeg")
+    await wait_until(running, "running")
+    runner.submit(1, BytesIO(b"2"), "image/jpeg")
+    runner.submit(1, BytesIO(b"3"), "image/jpeg")
+
+    image = BytesIO(b"4")
+    with pytest.raises(JobQueueFull) as exc_info:
+        runner.submit(1, image, "image/jpeg")
+    assert exc_info.value.retry_after >= 1
+    assert image.closed
+    assert runner.rejected == 1
+
+    classifier.release.set()
+
+
+async def test_stop_fails_running_job(monkeypatch):
+    monkeypatch.setattr(prediction_jobs_module, "AsyncSessionLocal", fake_session)
+    classifier = FakeClassifier()
+    monkeypatch.setattr(prediction_jobs_module, "classify_food_image", classifier)
+    job_runner = PredictionJobRunner(workers=1, max_queue=2, store=JobStore(max_jobs=10, ttl_seconds=60))
+    await job_runner.start()
+
+    job = job_runner.submit(1, BytesIO(b"x"), "image/jpeg")
+    await wait_until(job, "running")
+    await job_runner.stop()
+
+    assert job.state == "failed"
+    assert job.status_code == 503
+
+
+def test_store_hides_other_users_jobs():
+    store = JobStore(max_jobs=10, ttl_seconds=60)
+    job = PredictionJob(1, BytesIO(), "image/jpeg")
+    store.add(job)
+
+    assert store.get(job.id, 1) is job
+    assert store.get(job.id, 2) is None
+    assert store.get("missing", 1) is None
+
+
+def test_store_expires_finished_jobs_after_ttl(monkeypatch):
+    store = JobStore(max_jobs=10, ttl_seconds=60)
+    monkeypatch.setattr(prediction_jobs_module.time, "time", lambda: 1000.0)
+    old = finished_job(finished_at=900.0)
+    recent = finished_job(finished_at=990.0)
+    pending = PredictionJob(1, BytesIO(), "image/jpeg")
+    for job in (old, recent, pending):
+        store.add(job)
+
+    assert store.get(old.id, 1) is None
+    assert store.get(recent.id, 1) is recent
+    assert store.get(pending.id, 1) is pending
+    assert store.evicted == 1
+
+
+def test_store_evicts_oldest_finished_jobs_when_full(monkeypatch):
+    monkeypatch.setattr(prediction_jobs_module.time, "time", lambda: 1000.0)
+    store = JobStore(max_jobs=2, ttl_seconds=60)
+    queued = PredictionJob(1, BytesIO(), "image/jpeg")
+    done_first, done_second = finished_job(finished_at=999.0), finished_job(finished_at=999.0)
+    for job in (queued, done_first, done_second):
+        store.add(job)
+
+    # 대기 중인 작업은 남기고 끝난 작업 중 오래된 것부터 제거
+    assert store.get(queued.id, 1) is queued
+    assert store.get(done_first.id, 1) is None
+    assert store.get(done_second.id, 1) is done_second
+    assert store.counts() == {"queued": 1, "running": 0, "succeeded": 1, "failed": 0}
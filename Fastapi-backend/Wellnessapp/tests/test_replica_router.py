@@ -0,0 +1,187 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from db import replica
+from db.replica import ReplicaRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResult:
+    def __init__(self, row=None, scalar=None):
+        self.row = row
+        self.value = scalar
+
+    def fetchone(self):
+        return self.row
+
+    def scalar(self):
+        return self.value
+
+
+class FakeSession:
+    def __init__(self, name: str, row=None, scalar=None, error: Exception = None):
+        self.name = name
+        self.row = row
+        self.value = scalar
+        self.error = error
+        self.executed = 0
+
+    async def execute(self, statement, params=None):
+        self.executed += 1
+        if self.error:
+            raise self.error
+        return FakeResult(self.row, self.value)
+
+
+def session_factory(session: FakeSession):
+    @asynccontextmanager
+    async def factory():
+        yield session
+
+    return factory
+
+
+class FakeEngine:
+    def __init__(self, connection: FakeSession):
+        self.connection = connection
+
+    def connect(self):
+        return session_factory(self.connection)()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(replica.time, "monotonic", fake)
+    return fake
+
+
+def healthy_router(clock, replica_session: FakeSession) -> ReplicaRouter:
+    router = ReplicaRouter(session_factory(replica_session), max_lag=5, check_seconds=5, read_your_writes=10)
+    router.healthy = True
+    router.checked_at = clock.now
+    return router
+
+
+def test_disabled_without_replica(clock):
+    router = ReplicaRouter(None, max_lag=5, check_seconds=5, read_your_writes=10)
+    assert not router.enabled
+    assert not router.use_replica(1)
+
+
+def test_read_your_writes_window(clock):
+    router = healthy_router(clock, FakeSession("replica"))
+    assert router.use_replica(1)
+
+    router.mark_write(1)
+    assert not router.use_replica(1)
+    # 다른 사용자는 계속 복제본
+    assert router.use_replica(2)
+
+    clock.now += 11
+    router.checked_at = clock.now
+    assert router.use_replica(1)
+    assert router.stats()["recent_writers"] == 0
+
+
+def test_stale_lag_check_falls_back_to_primary(clock):
+    router = healthy_router(clock, FakeSession("replica"))
+    clock.now += 5 * 3 + 1
+    assert not router.use_replica(1)
+
+
+async def test_check_lag_marks_replica_healthy_or_lagging(clock, monkeypatch):
+    router = ReplicaRouter(session_factory(FakeSession("replica")), max_lag=5, check_seconds=5, read_your_writes=10)
+
+    monkeypatch.setattr(replica, "read_engine", FakeEngine(FakeSession("conn", scalar=1.5)))
+    await router.check_lag()
+    assert router.healthy and router.lag_seconds == 1.5
+    assert router.use_replica(1)
+
+    monkeypatch.setattr(replica, "read_engine", FakeEngine(FakeSession("conn", scalar=30.0)))
+    await router.check_lag()
+    assert not router.healthy
+    assert not router.use_replica(1)
+
+    monkeypatch.setattr(replica, "read_engine", FakeEngine(FakeSession("conn", error=OSError("down"))))
+    await router.check_lag()
+    assert not router.healthy and router.lag_seconds is None
+
+
+async def test_session_uses_replica_when_healthy(clock):
+    replica_session = FakeSession("replica")
+    router = healthy_router(clock, replica_session)
+    primary = FakeSession("primary")
+
+    async with router.session(1, primary) as session:
+        assert session is replica_session
+    assert router.replica_reads == 1
+
+
+async def test_session_reuses_request_primary_session(clock):
+    router = healthy_router(clock, FakeSession("replica"))
+    router.mark_write(1)
+    primary = FakeSession("primary")
+
+    async with router.session(1, primary) as session:
+        assert session is primary
+    assert router.primary_reads == 1
+
+    # 복제본이 없는 배포도 같은 세션을 재사용
+    single_db = ReplicaRouter(None, max_lag=5, check_seconds=5, read_your_writes=10)
+    async with single_db.session(1, primary) as session:
+        assert session is primary
+
+
+async def test_fetch_one_falls_back_to_primary_for_missing_row(clock):
+    replica_session = FakeSession("replica", row=None)
+    router = healthy_router(clock, replica_session)
+    primary = FakeSession("primary", row=("row",))
+
+    assert await router.fetch_one(primary, "SELECT 1", {}) == ("row",)
+    assert (replica_session.executed, primary.executed) == (1, 1)
+    assert router.fallback_reads == 1
+
+
+async def test_fetch_one_returns_replica_row(clock):
+    router = healthy_router(clock, FakeSession("replica", row=("replica row",)))
+    primary = FakeSession("primary", row=("primary row",))
+
+    assert await router.fetch_one(primary, "SELECT 1", {}) == ("replica row",)
+    assert primary.executed == 0
+
+
+def test_commit_marks_written_users(clock, monkeypatch):
+    router = healthy_router(clock, FakeSession("replica"))
+    monkeypatch.setattr(replica, "replica_router", router)
+    user = SimpleNamespace(__tablename__="user_info", id=1)
+    history = SimpleNamespace(__tablename__="history", user_id=2)
+    session = SimpleNamespace(info={}, new=[user], dirty=[history], deleted=[])
+
+    replica._collect_written_users(session, None)
+    replica._mark_written_users(session)
+
+    assert not router.use_replica(1)
+    assert not router.use_replica(2)
+    assert router.use_replica(3)
+
+
+def test_rollback_discards_written_users(clock, monkeypatch):
+    router = healthy_router(clock, FakeSession("replica"))
+    monkeypatch.setattr(replica, "replica_router", router)
+    session = SimpleNamespace(info={}, new=[SimpleNamespace(user_id=1)], dirty=[], deleted=[])
+
+    replica._collect_written_users(session, None)
+    replica._discard_written_users(session)
+    replica._mark_written_users(session)
+
+    assert router.use_replica(1)
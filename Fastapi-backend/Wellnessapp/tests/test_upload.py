@@ -0,0 +1,110 @@
+import asyncio
+from io import BytesIO
+
+import pytest
+from fastapi import UploadFile
+
+from utils import upload
+from utils.upload import UploadRejected, read_image_upload, sniff_image_type, spool_image_upload
+
+MB = upload.MB
+JPEG = upload.JPEG_MAGIC + b"\xe0" + b"\x00" * 61
+PNG = upload.PNG_MAGIC + b"\x00" * 56
+
+
+def upload_file(data: bytes, filename: str = "photo.jpg") -> UploadFile:
+    return UploadFile(file=BytesIO(data), filename=filename)
+
+
+@pytest.mark.parametrize("head, expected", [
+    (JPEG, "image/jpeg"),
+    (PNG, "image/png"),
+    (b"GIF89a", None),
+    (b"\xff\xd8", None),  # 시그니처보다 짧음
+    (b"%PDF-1.7", None),
+    (b"", None),
+])
+def test_sniff_image_type(head, expected):
+    assert sniff_image_type(head) == expected
+
+
+async def test_read_image_upload_returns_bytes_and_sniffed_type():
+    data = PNG + b"\x01" * 200_000
+    # 파일 이름/확장자와 관계없이 시그니처로 판단
+    file_bytes, mime_type = await read_image_upload(upload_file(data, "photo.jpg"))
+    assert file_bytes == data
+    assert mime_type == "image/png"
+
+
+async def test_rejects_non_image_on_first_chunk():
+    with pytest.raises(UploadRejected) as exc_info:
+        await read_image_upload(upload_file(b"<?php echo 1; ?>" + b"\x00" * 1024, "photo.jpg"))
+    assert exc_info.value.status_code == 403
+
+
+async def test_rejects_empty_file():
+    with pytest.raises(UploadRejected) as exc_info:
+        await read_image_upload(upload_file(b""))
+    assert exc_info.value.status_code == 400
+
+
+async def test_rejects_upload_over_size_cap_without_reading_the_rest():
+    data = JPEG + b"\x00" * (2 * MB)
+    file = upload_file(data)
+    with pytest.raises(UploadRejected) as exc_info:
+        await read_image_upload(file, max_bytes=MB)
+    assert exc_info.value.status_code == 413
+    # 제한을 넘는 청크에서 멈춘다
+    assert file.file.tell() <= MB + upload.UPLOAD_CHUNK_KB * 1024
+
+
+async def test_upload_exactly_at_cap_is_accepted():
+    data = JPEG + b"\x00" * (MB - len(JPEG))
+    file_bytes, _ = await read_image_upload(upload_file(data), max_bytes=MB)
+    assert len(file_bytes) == MB
+
+
+async def test_small_spool_stays_in_memory():
+    data = JPEG + b"\x02" * 1000
+    spool, mime_type = await spool_image_upload(upload_file(data))
+    try:
+        assert mime_type == "image/jpeg"
+        assert not spool._rolled
+        assert spool.read() == data
+    finally:
+        spool.close()
+
+
+async def test_large_spool_writes_to_disk_off_the_event_loop(monkeypatch):
+    offloaded = []
+    to_thread = asyncio.to_thread
+
+    async def recording_to_thread(func, *args):
+        offloaded.append(len(args[0]))
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(upload.asyncio, "to_thread", recording_to_thread)
+    data = JPEG + bytes(range(256)) * (3 * MB // 256)
+    spool, _ = await spool_image_upload(upload_file(data))
+    try:
+        assert spool._rolled
+        assert spool.read() == data
+    finally:
+        spool.close()
+    # 메모리 한도(기본 1MB)를 넘은 뒤의 청크만 스레드에서 기록
+    assert sum(offloaded) == len(data) - upload.UPLOAD_SPOOL_MEMORY_MB * MB
+
+
+async def test_spool_is_closed_when_rejected(monkeypatch):
+    spools = []
+    spooled = upload.tempfile.SpooledTemporaryFile
+
+    def tracking_spool(*args, **kwargs):
+        spool = spooled(*args, **kwargs)
+        spools.append(spool)
+        return spool
+
+    monkeypatch.setattr(upload.tempfile, "SpooledTemporaryFile", tracking_spool)
+    with pytest.raises(UploadRejected):
+        await spool_image_upload(upload_file(JPEG + b"\x00" * (2 * MB)), max_bytes=MB)
+    assert spools[0].closed
@@ -0,0 +1,124 @@
+# backend_report.py
+# 추론 백엔드별 정확도 vs 지연 시간 비교 리포트
+#
+# held-out 이미지 폴더 구조: <data-dir>/<category_id>/*.jpg
+# 사용 예:
+#   python backend_report.py --data-dir ./heldout --output backend_report.json
+import argparse
+import json
+import statistics
+import time
+import logging
+
+import torch
+
+import backends
+from config import MODEL_WEIGHTS_PATH, MODEL_ARTIFACT_DIR
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def evaluate_backend(model, tensors, labels, batch_size: int, warmup: int):
+    """batch 1 지연 시간, batch_size 처리량, 예측 결과를 측정"""
+    with torch.no_grad():
+        for _ in range(warmup):
+            model(tensors[0].unsqueeze(0))
+
+        # batch 1 지연 시간 (요청 하나가 혼자 처리되는 경우)
+        latencies, predictions = [], []
+        for tensor in tensors:
+            started = time.perf_counter()
+            outputs = model(tensor.unsqueeze(0))
+            latencies.append((time.perf_counter() - started) * 1000)
+            predictions.append(int(torch.argmax(outputs, 1).item()))
+
+        # batch_size 처리량 (마이크로 배칭이 잘 채워진 경우)
+        started = time.perf_counter()
+        for i in range(0, len(tensors), batch_size):
+            model(torch.stack(tensors[i:i + batch_size]))
+        throughput = len(tensors) / (time.perf_counter() - started)
+
+    labeled = [(p, l) for p, l in zip(predictions, labels) if l is not None]
+    accuracy = sum(p == l for p, l in labeled) / len(labeled) if labeled else None
+
+    return predictions, {
+        "accuracy": round(accuracy, 4) if accuracy is not None else None,
+        "latency_ms_p50": round(statistics.median(latencies), 2),
+        "latency_ms_p95": round(percentile(latencies, 95), 2),
+        "throughput_img_s": round(throughput, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare inference backends on a held-out image folder")
+    parser.add_argument("--data-dir", required=True, help="held-out 이미지 폴더 (<category_id>/*.jpg)")
+    parser.add_argument("--weights", default=MODEL_WEIGHTS_PATH)
+    parser.add_argument("--artifact-dir", default=MODEL_ARTIFACT_DIR)
+    parser.add_argument("--backends", nargs="+", default=list(backends.BACKENDS), choices=list(backends.BACKENDS))
+    parser.add_argument("--batch-size", type=int, default=16, help="처리량 측정 배치 크기")
+    parser.add_argument("--threads", type=int, default=1, help="torch / onnxruntime intra-op 스레드 수")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=0, help="사용할 최대 이미지 수 (0이면 전체)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+
+    items = backends.list_image_files(args.data_dir)
+    if args.limit:
+        items = items[:args.limit]
+    if not items:
+        raise SystemExit(f"No images found in {args.data_dir}")
+    tensors = [backends.load_tensor(path) for path, _ in items]
+    labels = [label for _, label in items]
+    logger.info(f"Loaded {len(tensors)} held-out images")
+
+    report = {"images": len(tensors), "batch_size": args.batch_size, "threads": args.threads, "backends": {}}
+    reference = None
+
+    # eager 결과를 기준으로 다른 백엔드와 예측 일치율을 계산
+    ordered = sorted(args.backends, key=lambda b: b != "eager")
+    for backend in ordered:
+        started = time.perf_counter()
+        try:
+            model = backends.load_backend(backend, args.weights, args.artifact_dir, args.threads)
+        except (FileNotFoundError, ImportError) as e:
+            logger.warning(f"Skipping {backend}: {e}")
+            report["backends"][backend] = {"skipped": str(e)}
+            continue
+        load_ms = (time.perf_counter() - started) * 1000
+
+        predictions, result = evaluate_backend(model, tensors, labels, args.batch_size, args.warmup)
+        result["load_ms"] = round(load_ms, 1)
+        if reference is None and backend == "eager":
+            reference = predictions
+        if reference is not None:
+            result["agreement_with_eager"] = round(sum(p == r for p, r in zip(predictions, reference)) / len(reference), 4)
+        report["backends"][backend] = result
+
+    # 표 형태로 출력
+    print(f"{'backend':<14}{'accuracy':>10}{'agree':>8}{'p50 ms':>9}{'p95 ms':>9}{'img/s':>9}{'load ms':>10}")
+    for backend, result in report["backends"].items():
+        if "skipped" in result:
+            print(f"{backend:<14}  skipped: {result['skipped']}")
+            continue
+        accuracy = "-" if result["accuracy"] is None else f"{result['accuracy']:.4f}"
+        agreement = f"{result.get('agreement_with_eager', 0):.4f}" if "agreement_with_eager" in result else "-"
+        print(f"{backend:<14}{accuracy:>10}{agreement:>8}{result['latency_ms_p50']:>9}"
+              f"{result['latency_ms_p95']:>9}{result['throughput_img_s']:>9}{result['load_ms']:>10}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# backends.py
+# CPU 추론 백엔드 선택 (eager / TorchScript / ONNX Runtime / int8 양자화)
+#
+#  - eager:        torchvision 모델을 그대로 float32로 실행
+#  - torchscript:  trace + freeze 한 그래프 (artifact가 없으면 로드 시 생성)
+#  - onnx:         ONNX Runtime CPU 실행 (export_model.py로 생성한 model.onnx 필요)
+#                  onnxruntime은 선택 의존성: poetry install -E onnx (requirements.txt는 -E onnx로 export되어 이미지에 포함)
+#  - dynamic_int8: Linear 레이어 동적 int8 양자화 (로드 시 생성)
+#  - static_int8:  FX 그래프 모드 정적 int8 양자화 (export_model.py 로 calibration 후 생성)
+#
+# artifact는 원본 가중치 파일 해시별 하위 폴더(artifact_dir/<해시>/)에 저장한다.
+# 레지스트리 후보 버전처럼 다른 가중치로 로드하면 그 가중치로 만든 artifact만 사용한다.
+import hashlib
+import os
+from typing import Callable, List, Optional, Tuple
+import logging
+
+import torch
+
+import inference
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("eager", "torchscript", "onnx", "dynamic_int8", "static_int8")
+
+# export_model.py가 생성하는 artifact 파일 이름
+ARTIFACT_FILES = {
+    "torchscript": "model_torchscript.pt",
+    "onnx": "model.onnx",
+    "static_int8": "model_static_int8.pt",
+}
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+INPUT_SHAPE = (1, 3, 224, 224)
+
+
+class OnnxRuntimeModel:
+    """ONNX Runtime 세션을 torch 모델처럼 호출할 수 있도록 감싼 클래스"""
+
+    def __init__(self, onnx_path: str, num_threads: int = 0):
+        # pyproject의 onnx extra (onnxruntime)가 설치되어 있어야 함
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, batch: torch.Tensor) -> torch.Tensor:
+        outputs = self.session.run(None, {self.input_name: batch.contiguous().numpy()})
+        return torch.from_numpy(outputs[0])
+
+
+def weights_digest(weights_path: str) -> str:
+    """가중치 파일 내용 해시 (sha256 앞 12자리, 버전 이름/artifact 폴더 이름으로 사용)"""
+    digest = hashlib.sha256()
+    with open(weights_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def artifact_path(artifact_dir: str, backend: str, digest: str) -> str:
+    return os.path.join(artifact_dir, digest, ARTIFACT_FILES[backend])
+
+
+def to_torchscript(model: torch.nn.Module) -> torch.jit.ScriptModule:
+    """trace 후 freeze 하여 추론 전용 그래프로 변환"""
+    example = torch.randn(*INPUT_SHAPE)
+    with torch.no_grad():
+        traced = torch.jit.trace(model, example)
+        return torch.jit.optimize_for_inference(torch.jit.freeze(traced.eval()))
+
+
+def quantize_dynamic_int8(model: torch.nn.Module) -> torch.nn.Module:
+    # MobileNetV3에서는 classifier의 Linear 레이어만 대상이 된다
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantize_static_int8(model: torch.nn.Module, calibration_batches: List[torch.Tensor]) -> torch.jit.ScriptModule:
+    """FX 그래프 모드 정적 양자화 (calibration 이미지로 activation 범위를 측정)"""
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+    torch.backends.quantized.engine = "x86" if "x86" in torch.backends.quantized.supported_engines else "fbgemm"
+    qconfig_mapping = get_default_qconfig_mapping(torch.backends.quantized.engine)
+    example = (torch.randn(*INPUT_SHAPE),)
+
+    prepared = prepare_fx(model.cpu().eval(), qconfig_mapping, example)
+    with torch.no_grad():
+        for batch in calibration_batches:
+            prepared(batch)
+    quantized = convert_fx(prepared)
+
+    with torch.no_grad():
+        return torch.jit.freeze(torch.jit.trace(quantized, example[0]).eval())
+
+
+def load_backend(backend: str, weights_path: str, artifact_dir: str, num_threads: int = 0,
+                 digest: Optional[str] = None) -> Callable:
+    """설정된 백엔드의 추론 함수(배치 텐서 -> logits)를 반환
+
+    artifact는 weights_path 내용 해시(digest)로 찾으므로 다른 가중치로 만든 artifact는 사용하지 않는다.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}'. Choose one of {BACKENDS}")
+
+    if backend in ARTIFACT_FILES:
+        path = artifact_path(artifact_dir, backend, digest or weights_digest(weights_path))
+
+    if backend == "onnx":
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found. Run export_model.py --weights {weights_path} --backends onnx first.")
+        return OnnxRuntimeModel(path, num_threads)
+
+    if backend in ("torchscript", "static_int8"):
+        if os.path.exists(path):
+            module = torch.jit.load(path, map_location="cpu")
+            module.eval()
+            return module
+        if backend == "static_int8":
+            raise FileNotFoundError(
+                f"{path} not found. Run export_model.py --weights {weights_path} --backends static_int8 "
+                "--calib-dir <images> first."
+            )
+
+    model = inference.load_model(weights_path)
+    if backend == "eager":
+        return model
+    if backend == "torchscript":
+        logger.info(f"{path} not found, tracing TorchScript model at load time")
+        return to_torchscript(model.cpu())
+    return quantize_dynamic_int8(model.cpu())
+
+
+def list_image_files(root: str) -> List[Tuple[str, Optional[int]]]:
+    """이미지 폴더를 읽어 (경로, 정답 category_id) 목록을 반환
+
+    root/<category_id>/*.jpg 구조면 하위 폴더 이름을 정답으로 사용하고,
+    root/*.jpg 처럼 평평한 구조면 정답은 None 이다.
+    """
+    items = []
+    for dirpath, _, filenames in sorted(os.walk(root)):
+        label_name = os.path.relpath(dirpath, root).split(os.sep)[0]
+        label = int(label_name) if label_name.isdigit() else None
+        for filename in sorted(filenames):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                items.append((os.path.join(dirpath, filename), label))
+    return items
+
+
+def load_tensor(path: str) -> torch.Tensor:
+    with open(path, "rb") as f:
+        return inference.preprocess(inference.decode_image(f.read()))
@@ -0,0 +1,210 @@
+# batching.py
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """대기 큐가 가득 차 요청을 받을 수 없을 때 발생"""
+
+
+class MicroBatcher:
+    """동시에 들어온 요청을 모아 한 번의 배치 추론으로 처리하는 큐
+
+    첫 요청이 들어온 뒤 max_wait_ms 동안 또는 max_batch_size 개가 모일 때까지 기다렸다가
+    handler를 한 번 호출하고, 결과를 각 요청자에게 순서대로 돌려준다.
+    handler는 입력 리스트와 같은 길이의 결과 리스트를 반환해야 하며,
+    개별 항목이 Exception이면 해당 요청자에게만 예외로 전달된다.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        max_queue_size: int = 256,
+        max_concurrent_batches: int = 1,
+    ):
+        self._handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_queue_size = max_queue_size
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._inflight = set()
+
+        # 통계
+        self.total_requests = 0
+        self.total_batches = 0
+        self.rejected_requests = 0
+        self.batch_size_counts = Counter()
+        self.max_queue_depth = 0
+        self._total_wait = 0.0
+        self._total_infer = 0.0
+
+    async def start(self):
+        # 큐는 실행 중인 이벤트 루프에서 생성해야 한다
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"MicroBatcher started (max_batch_size={self.max_batch_size}, max_wait={self.max_wait * 1000:.1f}ms)")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        # 실행 중인 배치는 끝까지 처리
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        # 처리되지 못한 요청은 실패로 돌려준다
+        while self._queue and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("MicroBatcher stopped"))
+
+    async def submit(self, item: Any) -> Any:
+        """항목을 큐에 넣고 배치 처리 결과를 기다린다"""
+        if self._queue is None:
+            raise RuntimeError("MicroBatcher is not started")
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected_requests += 1
+            raise QueueFullError("Inference queue is full")
+
+        self.total_requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def submit_many(self, items: List[Any]) -> List[Any]:
+        """여러 항목을 한꺼번에 큐에 넣고 결과 목록을 기다린다
+
+        큐에 자리가 모자라면 하나도 넣지 않고 QueueFullError를 발생시킨다.
+        개별 항목 실패는 결과 목록의 해당 위치에 예외 객체로 들어간다.
+        """
+        if self._queue is None:
+            raise RuntimeError("MicroBatcher is not started")
+        if self.max_queue_size > 0 and self._queue.qsize() + len(items) > self.max_queue_size:
+            self.rejected_requests += len(items)
+            raise QueueFullError("Inference queue is full")
+
+        loop = asyncio.get_running_loop()
+        enqueued = time.perf_counter()
+        futures = []
+        for item in items:
+            future = loop.create_future()
+            self._queue.put_nowait((item, future, enqueued))
+            futures.append(future)
+
+        self.total_requests += len(items)
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    async def _collect(self) -> list:
+        # 첫 항목이 올 때까지 대기한 뒤 마감 시간까지 배치를 채운다
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+
+        try:
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            # 종료 중 이미 꺼낸 요청이 응답 없이 남지 않도록 실패 처리
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("MicroBatcher stopped"))
+            raise
+
+        # 마감 직후 이미 도착해 있는 항목은 기다리지 않고 함께 처리
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        return batch
+
+    async def _run(self):
+        # 동시에 실행할 수 있는 배치 수만큼 슬롯을 확보한 뒤에 다음 배치를 모은다
+        # (슬롯이 없는 동안 큐에 요청이 쌓여 다음 배치가 더 커진다)
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._on_batch_done)
+
+    def _on_batch_done(self, task: asyncio.Task):
+        self._inflight.discard(task)
+        self._slots.release()
+
+    async def _dispatch(self, batch: list):
+        # 이미 취소된 요청(클라이언트 연결 종료 등)은 추론에서 제외
+        live = [(item, future, enqueued) for item, future, enqueued in batch if not future.done()]
+        if not live:
+            return
+
+        started = time.perf_counter()
+        self._total_wait += sum(started - enqueued for _, _, enqueued in live)
+
+        try:
+            results = await self._handler([item for item, _, _ in live])
+            if len(results) != len(live):
+                raise RuntimeError(f"Batch handler returned {len(results)} results for {len(live)} inputs")
+        except Exception as e:
+            logger.error(f"Batch inference failed: {e}")
+            for _, future, _ in live:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.total_batches += 1
+            self.batch_size_counts[len(live)] += 1
+            self._total_infer += time.perf_counter() - started
+
+        for (_, future, _), result in zip(live, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        processed = sum(size * count for size, count in self.batch_size_counts.items())
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "inflight_batches": len(self._inflight),
+            "max_queue_depth": self.max_queue_depth,
+            "total_requests": self.total_requests,
+            "rejected_requests": self.rejected_requests,
+            "total_batches": self.total_batches,
+            "avg_batch_size": round(processed / self.total_batches, 2) if self.total_batches else 0,
+            "batch_size_histogram": dict(sorted(self.batch_size_counts.items())),
+            "avg_queue_wait_ms": round(self._total_wait / processed * 1000, 2) if processed else 0,
+            "avg_batch_inference_ms": round(self._total_infer / self.total_batches * 1000, 2) if self.total_batches else 0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_concurrent_batches": self.max_concurrent_batches,
+        }
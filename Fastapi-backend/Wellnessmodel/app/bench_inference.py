@@ -0,0 +1,252 @@
+# bench_inference.py
+# 모델 서비스(model_api.py) 성능 벤치마크
+#  - cold start: 프로세스 시작 -> import -> startup 완료 -> 첫 응답까지 걸린 시간
+#  - 단일 이미지 지연 시간: 요청을 하나씩 순차로 보냈을 때 p50 / p95 / p99
+#  - 처리량: 배치 크기 x torch 스레드 수 x 워커 수 조합별 초당 이미지 수
+#
+# 워커 수/스레드 수/배치 크기는 config.py에서 import 시점에 읽으므로 조합마다 자식 프로세스를 띄워 측정한다.
+# S3는 로컬 이미지 폴더로 대체하고 (s3://bench/<파일 경로>), HTTP 서버 없이 ASGI 앱을 직접 호출한다.
+# 사용 예:
+#   python bench_inference.py --data-dir ./samples --workers 1 2 4 --threads 1 2 --batch-sizes 1 8 16 \
+#       --output bench_results.json
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_BUCKET = "bench"
+CHILD_RESULT_PREFIX = "BENCH_RESULT "
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def list_images(data_dir: str):
+    paths = []
+    for root, _, files in os.walk(data_dir):
+        for name in sorted(files):
+            if name.lower().endswith((".jpg", ".jpeg", ".png")):
+                paths.append(os.path.abspath(os.path.join(root, name)))
+    return sorted(paths)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# 자식 프로세스: 설정 하나를 측정
+# ---------------------------------------------------------------------------
+
+async def measure_config(args, launched_at: float, import_ms: float) -> dict:
+    import httpx
+
+    import model_api
+
+    image_cache = {}
+
+    def local_image_bytes(s3_url: str) -> bytes:
+        # S3 대신 로컬 파일을 읽는다 (디스크 캐시 효과를 없애기 위해 메모리에 한 번만 로드)
+        path = s3_url[len(f"s3://{BENCH_BUCKET}"):]
+        if path not in image_cache:
+            with open(path, "rb") as f:
+                image_cache[path] = f.read()
+        return image_cache[path]
+
+    model_api.get_image_bytes_from_s3 = local_image_bytes
+
+    paths = list_images(args.data_dir)
+    urls = [f"s3://{BENCH_BUCKET}{path}" for path in paths]
+    for url in urls:
+        local_image_bytes(url)
+
+    # 모델 로드/워커 warmup은 startup 이후 백그라운드에서 진행되므로 준비 완료까지 기다린다
+    started = time.perf_counter()
+    await model_api.app.router.startup()
+    await model_api.startup_task
+    startup_ms = (time.perf_counter() - started) * 1000
+    if not model_api.startup_state["ready"]:
+        raise RuntimeError(f"Model service failed to start: {model_api.startup_state['error']}")
+
+    transport = httpx.ASGITransport(app=model_api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def predict(url: str) -> float:
+            request_started = time.perf_counter()
+            response = await client.post("/predict_url/", params={"image_url": url})
+            response.raise_for_status()
+            return (time.perf_counter() - request_started) * 1000
+
+        # cold start: 준비 완료 후 첫 요청 (warmup이 부족하면 여기서 지연 시간이 튄다)
+        first_request_ms = await predict(urls[0])
+        cold_start_ms = (time.time() - launched_at) * 1000
+
+        for i in range(args.warmup):
+            await predict(urls[i % len(urls)])
+
+        # 단일 이미지 지연 시간 (동시 요청 없음 -> 배치 크기 1)
+        latencies = [await predict(urls[i % len(urls)]) for i in range(args.latency_requests)]
+
+        # 처리량: 배치를 채울 수 있도록 워커 수 x 배치 크기 만큼 동시에 요청
+        stats_before = (await client.get("/stats")).json()["batcher"]
+        concurrency = max(1, args.batch_size * max(1, args.workers))
+        queue = asyncio.Queue()
+        for i in range(args.throughput_requests):
+            queue.put_nowait(urls[i % len(urls)])
+
+        async def worker():
+            while not queue.empty():
+                await predict(queue.get_nowait())
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stats_after = (await client.get("/stats")).json()["batcher"]
+
+    await model_api.app.router.shutdown()
+
+    batches = stats_after["total_batches"] - stats_before["total_batches"]
+    return {
+        "workers": args.workers,
+        "torch_threads": args.threads,
+        "batch_size": args.batch_size,
+        "cold_start": {
+            "import_ms": round(import_ms, 1),
+            "startup_ms": round(startup_ms, 1),
+            "stages": model_api.startup_state["timings"],
+            "first_request_ms": round(first_request_ms, 1),
+            "total_ms": round(cold_start_ms, 1),
+        },
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "mean": round(statistics.mean(latencies), 2),
+        },
+        "throughput": {
+            "requests": args.throughput_requests,
+            "concurrency": concurrency,
+            "img_per_s": round(args.throughput_requests / elapsed, 1),
+            "avg_batch_size": round(args.throughput_requests / batches, 2) if batches else None,
+        },
+    }
+
+
+def run_child(args):
+    launched_at = float(os.environ.get("BENCH_LAUNCHED_AT", time.time()))
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    started = time.perf_counter()
+    import model_api  # noqa: F401  (import 시간 측정)
+    import_ms = (time.perf_counter() - started) * 1000
+
+    result = asyncio.run(measure_config(args, launched_at, import_ms))
+    print(CHILD_RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+# ---------------------------------------------------------------------------
+# 부모 프로세스: 조합별로 자식 프로세스 실행 후 결과 취합
+# ---------------------------------------------------------------------------
+
+def run_sweep(args):
+    from config import MODEL_WEIGHTS_PATH, INFERENCE_BACKEND, PREPROCESS_FAST
+
+    images = list_images(args.data_dir)
+    if not images:
+        raise SystemExit(f"No images found in {args.data_dir}")
+
+    weights_path = os.environ.get("MODEL_WEIGHTS_PATH", MODEL_WEIGHTS_PATH)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "images": len(images),
+            "weights_path": weights_path,
+            "weights_sha256": file_sha256(weights_path) if os.path.exists(weights_path) else None,
+            "backend": os.environ.get("INFERENCE_BACKEND", INFERENCE_BACKEND),
+            "preprocess_fast": PREPROCESS_FAST,
+        },
+        "results": [],
+    }
+
+    for workers, threads, batch_size in itertools.product(args.workers, args.threads, args.batch_sizes):
+        env = dict(
+            os.environ,
+            INFERENCE_WORKERS=str(workers),
+            TORCH_THREADS_PER_WORKER=str(threads),
+            BATCH_MAX_SIZE=str(batch_size),
+            BENCH_LAUNCHED_AT=repr(time.time()),
+        )
+        command = [
+            sys.executable, os.path.abspath(__file__), "--child",
+            "--data-dir", args.data_dir,
+            "--workers", str(workers), "--threads", str(threads), "--batch-sizes", str(batch_size),
+            "--warmup", str(args.warmup),
+            "--latency-requests", str(args.latency_requests),
+            "--throughput-requests", str(args.throughput_requests),
+        ]
+        print(f"running workers={workers} threads={threads} batch_size={batch_size}", file=sys.stderr)
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+
+        lines = [line for line in completed.stdout.splitlines() if line.startswith(CHILD_RESULT_PREFIX)]
+        if completed.returncode != 0 or not lines:
+            report["results"].append({
+                "workers": workers, "torch_threads": threads, "batch_size": batch_size,
+                "error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "no result",
+            })
+            continue
+        report["results"].append(json.loads(lines[-1][len(CHILD_RESULT_PREFIX):]))
+
+    print(f"{'workers':>8}{'threads':>8}{'batch':>7}{'cold ms':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'img/s':>9}{'avg bs':>8}")
+    for result in report["results"]:
+        if "error" in result:
+            print(f"{result['workers']:>8}{result['torch_threads']:>8}{result['batch_size']:>7}  error: {result['error']}")
+            continue
+        latency, throughput = result["latency_ms"], result["throughput"]
+        print(f"{result['workers']:>8}{result['torch_threads']:>8}{result['batch_size']:>7}"
+              f"{result['cold_start']['total_ms']:>10}{latency['p50']:>9}{latency['p95']:>9}{latency['p99']:>9}"
+              f"{throughput['img_per_s']:>9}{str(throughput['avg_batch_size']):>8}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the model service (cold start, latency, throughput)")
+    parser.add_argument("--data-dir", required=True, help="샘플 이미지 폴더 (S3 대신 사용)")
+    parser.add_argument("--workers", nargs="+", type=int, default=[2], help="INFERENCE_WORKERS 후보")
+    parser.add_argument("--threads", nargs="+", type=int, default=[1], help="TORCH_THREADS_PER_WORKER 후보")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 16], help="BATCH_MAX_SIZE 후보")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--latency-requests", type=int, default=100, help="순차 지연 시간 측정 요청 수")
+    parser.add_argument("--throughput-requests", type=int, default=400, help="처리량 측정 요청 수")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.workers, args.threads, args.batch_size = args.workers[0], args.threads[0], args.batch_sizes[0]
+        run_child(args)
+    else:
+        run_sweep(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# bench_preprocess.py
+# 전처리 fast path(축소 디코딩 + 단일 resize + 버퍼 재사용) vs torchvision 파이프라인 비교
+#
+# 이미지 폴더 구조: <data-dir>/<category_id>/*.jpg (라벨 폴더가 없어도 동작)
+# 사용 예:
+#   python bench_preprocess.py --data-dir ./heldout --output preprocess_report.json
+import argparse
+import json
+import statistics
+import time
+import logging
+
+import numpy as np
+import torch
+
+import backends
+import inference
+import preprocessing
+from config import MODEL_WEIGHTS_PATH, MODEL_ARTIFACT_DIR
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def time_per_image(func, images, repeat: int):
+    """이미지 한 장당 전처리 시간(ms) 목록"""
+    timings = []
+    for _ in range(repeat):
+        for image_data in images:
+            started = time.perf_counter()
+            func(image_data)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the fast preprocessing path with the torchvision pipeline")
+    parser.add_argument("--data-dir", required=True, help="이미지 폴더 (<category_id>/*.jpg)")
+    parser.add_argument("--weights", default=MODEL_WEIGHTS_PATH)
+    parser.add_argument("--artifact-dir", default=MODEL_ARTIFACT_DIR)
+    parser.add_argument("--backend", default="eager", choices=list(backends.BACKENDS), help="라벨 비교에 사용할 백엔드")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="시간 측정 반복 횟수")
+    parser.add_argument("--limit", type=int, default=0, help="사용할 최대 이미지 수 (0이면 전체)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+
+    items = backends.list_image_files(args.data_dir)
+    if args.limit:
+        items = items[:args.limit]
+    if not items:
+        raise SystemExit(f"No images found in {args.data_dir}")
+    images = []
+    for path, _ in items:
+        with open(path, "rb") as f:
+            images.append(f.read())
+    logger.info(f"Loaded {len(images)} images")
+
+    # 1) 전처리 시간 비교
+    baseline_ms = time_per_image(lambda data: inference.preprocess(inference.decode_image(data)), images, args.repeat)
+    buffer = preprocessing.BatchBuffer(1)
+    fast_ms = time_per_image(lambda data: preprocessing.preprocess_into(data, buffer.array[0]), images, args.repeat)
+
+    # 2) 같은 모델로 두 전처리 결과의 예측 라벨 비교
+    model = backends.load_backend(args.backend, args.weights, args.artifact_dir, args.threads)
+    mismatches, max_abs_diff = [], 0.0
+    with torch.no_grad():
+        for (path, _), image_data in zip(items, images):
+            baseline = inference.preprocess(inference.decode_image(image_data)).unsqueeze(0)
+            fast = preprocessing.preprocess_fast(image_data).unsqueeze(0)
+            max_abs_diff = max(max_abs_diff, float((baseline - fast).abs().max()))
+            baseline_label = int(torch.argmax(model(baseline), 1).item())
+            fast_label = int(torch.argmax(model(fast), 1).item())
+            if baseline_label != fast_label:
+                mismatches.append({"path": path, "baseline": baseline_label, "fast": fast_label})
+
+    report = {
+        "images": len(images),
+        "backend": args.backend,
+        "baseline_ms_p50": round(statistics.median(baseline_ms), 3),
+        "baseline_ms_mean": round(float(np.mean(baseline_ms)), 3),
+        "fast_ms_p50": round(statistics.median(fast_ms), 3),
+        "fast_ms_mean": round(float(np.mean(fast_ms)), 3),
+        "speedup_p50": round(statistics.median(baseline_ms) / statistics.median(fast_ms), 2),
+        "max_abs_pixel_diff": round(max_abs_diff, 4),
+        "label_agreement": round(1 - len(mismatches) / len(images), 4),
+        "mismatches": mismatches,
+    }
+
+    print(f"baseline p50 {report['baseline_ms_p50']} ms | fast p50 {report['fast_ms_p50']} ms "
+          f"| speedup x{report['speedup_p50']} | label agreement {report['label_agreement']:.4f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Report written to {args.output}")
+
+    # 라벨이 하나라도 달라지면 실패로 처리 (CI 등에서 회귀 확인용)
+    if mismatches:
+        raise SystemExit(f"{len(mismatches)} label mismatches between fast and baseline preprocessing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# cascade.py
+# cascade 단계별 통계 (부모 프로세스에서 워커가 돌려준 배치 통계를 누적)
+from config import CASCADE_ENABLED, CASCADE_THRESHOLD
+
+
+class CascadeStats:
+    """escalation 비율과 단계별 지연 시간을 누적해 threshold 튜닝에 사용"""
+
+    def __init__(self, enabled: bool = CASCADE_ENABLED, threshold: float = CASCADE_THRESHOLD):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.batches = 0
+        self.images = 0
+        self.escalated = 0
+        self.large_images = 0
+        self.small_batches = 0
+        self.large_batches = 0
+        self._small_ms = 0.0
+        self._large_ms = 0.0
+
+    def record(self, batch_stats: dict):
+        self.batches += 1
+        self.images += batch_stats["images"]
+        self.escalated += batch_stats["escalated"]
+        self.large_images += batch_stats["large_images"]
+        if batch_stats["small_ms"]:
+            self.small_batches += 1
+            self._small_ms += batch_stats["small_ms"]
+        if batch_stats["large_ms"]:
+            self.large_batches += 1
+            self._large_ms += batch_stats["large_ms"]
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "images": self.images,
+            "escalated": self.escalated,
+            "escalation_rate": round(self.escalated / self.images, 4) if self.images and self.enabled else None,
+            "small": {
+                "batches": self.small_batches,
+                "avg_batch_ms": round(self._small_ms / self.small_batches, 2) if self.small_batches else 0,
+                "avg_image_ms": round(self._small_ms / self.images, 3) if self.images and self.small_batches else 0,
+            },
+            "large": {
+                "batches": self.large_batches,
+                "images": self.large_images,
+                "avg_batch_ms": round(self._large_ms / self.large_batches, 2) if self.large_batches else 0,
+                "avg_image_ms": round(self._large_ms / self.large_images, 3) if self.large_images else 0,
+            },
+        }
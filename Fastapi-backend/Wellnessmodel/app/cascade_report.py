@@ -0,0 +1,110 @@
+# cascade_report.py
+# cascade threshold 튜닝 리포트 (threshold별 escalation 비율, 정확도, 이미지당 예상 지연 시간)
+#
+# held-out 이미지 폴더 구조: <data-dir>/<category_id>/*.jpg
+# 사용 예:
+#   python cascade_report.py --data-dir ./heldout --small-weights KJSmodelSmall.pth \
+#       --thresholds 0.5 0.6 0.7 0.8 0.9 --output cascade_report.json
+import argparse
+import json
+import time
+import logging
+
+import torch
+
+import backends
+import inference
+from config import MODEL_WEIGHTS_PATH, CASCADE_WEIGHTS_PATH
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def predict_all(model, tensors, batch_size: int):
+    """전체 이미지의 logits와 이미지당 평균 추론 시간(ms)을 반환"""
+    outputs, elapsed = [], 0.0
+    with torch.no_grad():
+        model(tensors[0].unsqueeze(0))  # warmup
+        for i in range(0, len(tensors), batch_size):
+            batch = torch.stack(tensors[i:i + batch_size])
+            started = time.perf_counter()
+            outputs.append(model(batch).float())
+            elapsed += time.perf_counter() - started
+    return torch.cat(outputs), elapsed * 1000 / len(tensors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the cascade confidence threshold on a held-out image folder")
+    parser.add_argument("--data-dir", required=True, help="held-out 이미지 폴더 (<category_id>/*.jpg)")
+    parser.add_argument("--weights", default=MODEL_WEIGHTS_PATH, help="큰 모델(mobilenet_v3_large) 가중치")
+    parser.add_argument("--small-weights", default=CASCADE_WEIGHTS_PATH, help="작은 모델(mobilenet_v3_small) 가중치")
+    parser.add_argument("--thresholds", nargs="+", type=float, default=[0.5, 0.6, 0.7, 0.8, 0.9, 0.95])
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=0, help="사용할 최대 이미지 수 (0이면 전체)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+
+    items = backends.list_image_files(args.data_dir)
+    if args.limit:
+        items = items[:args.limit]
+    if not items:
+        raise SystemExit(f"No images found in {args.data_dir}")
+    tensors = [backends.load_tensor(path) for path, _ in items]
+    labels = torch.tensor([-1 if label is None else label for _, label in items])
+    labeled = labels >= 0
+    logger.info(f"Loaded {len(tensors)} held-out images")
+
+    large = inference.load_model(args.weights).cpu()
+    small = inference.load_model(args.small_weights, inference.build_small_model).cpu()
+    large_logits, large_ms = predict_all(large, tensors, args.batch_size)
+    small_logits, small_ms = predict_all(small, tensors, args.batch_size)
+
+    large_pred = large_logits.argmax(dim=1)
+    small_confidence, small_pred = torch.softmax(small_logits, dim=1).max(dim=1)
+
+    def accuracy(predictions):
+        if not labeled.any():
+            return None
+        return round(float((predictions[labeled] == labels[labeled]).float().mean()), 4)
+
+    report = {
+        "images": len(tensors),
+        "batch_size": args.batch_size,
+        "threads": args.threads,
+        "large": {"accuracy": accuracy(large_pred), "image_ms": round(large_ms, 3)},
+        "small": {"accuracy": accuracy(small_pred), "image_ms": round(small_ms, 3)},
+        "thresholds": [],
+    }
+
+    for threshold in sorted(args.thresholds):
+        escalate = small_confidence < threshold
+        cascade_pred = torch.where(escalate, large_pred, small_pred)
+        escalation_rate = float(escalate.float().mean())
+        report["thresholds"].append({
+            "threshold": threshold,
+            "escalation_rate": round(escalation_rate, 4),
+            "accuracy": accuracy(cascade_pred),
+            "agreement_with_large": round(float((cascade_pred == large_pred).float().mean()), 4),
+            # 작은 모델은 항상 실행, 큰 모델은 escalation된 비율만큼 실행
+            "estimated_image_ms": round(small_ms + escalation_rate * large_ms, 3),
+        })
+
+    print(f"large only: accuracy={report['large']['accuracy']} {report['large']['image_ms']} ms/img | "
+          f"small only: accuracy={report['small']['accuracy']} {report['small']['image_ms']} ms/img")
+    print(f"{'threshold':>10}{'escalate':>10}{'accuracy':>10}{'agree':>8}{'ms/img':>9}")
+    for row in report["thresholds"]:
+        accuracy_text = "-" if row["accuracy"] is None else f"{row['accuracy']:.4f}"
+        print(f"{row['threshold']:>10}{row['escalation_rate']:>10.4f}{accuracy_text:>10}"
+              f"{row['agreement_with_large']:>8.4f}{row['estimated_image_ms']:>9}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
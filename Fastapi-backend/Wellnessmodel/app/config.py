@@ -0,0 +1,52 @@
+# config.py
+import os
+
+# 로그 레벨 (기동 시 root 로거에 적용, 이미 handler가 설정되어 있으면 그대로 사용)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# 마이크로 배칭 설정
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", 16))  # 한 번의 forward pass에 묶을 최대 이미지 수
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", 10))  # 첫 요청 이후 배치를 채우기 위해 기다리는 최대 시간
+BATCH_MAX_QUEUE = int(os.getenv("BATCH_MAX_QUEUE", 256))  # 대기 큐 최대 길이 (초과 시 503)
+
+# 모델 가중치 경로
+MODEL_WEIGHTS_PATH = os.getenv("MODEL_WEIGHTS_PATH", "KJSmodelTest_0921.pth")
+
+# 모델 레지스트리 설정 (무중단 가중치 교체)
+MODEL_VERSION = os.getenv("MODEL_VERSION", "")  # 기동 시 모델 버전 이름 (비어 있으면 가중치 파일 해시 사용)
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", os.path.dirname(os.path.abspath(MODEL_WEIGHTS_PATH)))  # 교체용 가중치 파일 위치
+MODEL_ADMIN_TOKEN = os.getenv("MODEL_ADMIN_TOKEN", "")  # /models 관리 API의 X-Admin-Token 값 (비어 있으면 관리 API 사용 불가)
+MODEL_SHADOW_PERCENT = float(os.getenv("MODEL_SHADOW_PERCENT", 0))  # 후보 모델로 복제할 트래픽 비율(%)
+
+# 모델 기동 설정
+MODEL_LOAD_MMAP = os.getenv("MODEL_LOAD_MMAP", "true").lower() == "true"  # 가중치 파일을 mmap으로 로드
+MODEL_WARMUP_ITERATIONS = int(os.getenv("MODEL_WARMUP_ITERATIONS", 3))  # 워커별 warmup forward pass 횟수 (배치 크기별)
+MODEL_STARTUP_TIMEOUT = float(os.getenv("MODEL_STARTUP_TIMEOUT", 300))  # 워커 기동(로드 + warmup) 최대 대기 시간(초)
+
+# 추론 백엔드 설정 (eager | torchscript | onnx | dynamic_int8 | static_int8)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "eager")
+MODEL_ARTIFACT_DIR = os.getenv("MODEL_ARTIFACT_DIR", "artifacts")  # export_model.py 결과물 경로 (가중치 해시별 하위 폴더)
+
+# 2단계 cascade 설정 (작은 모델이 확신하면 바로 응답, 아니면 큰 모델로 재분류)
+CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "false").lower() == "true"
+CASCADE_WEIGHTS_PATH = os.getenv("CASCADE_WEIGHTS_PATH", "KJSmodelSmall.pth")  # mobilenet_v3_small state_dict
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", 0.8))  # 작은 모델 softmax 최댓값이 이 이상이면 escalation 없음
+
+# 예측 결과 설정
+PREDICTION_TOP_K = int(os.getenv("PREDICTION_TOP_K", 3))  # 응답에 포함할 상위 후보 수 (softmax 확률 순)
+PREDICT_BATCH_MAX_IMAGES = int(os.getenv("PREDICT_BATCH_MAX_IMAGES", 16))  # /predict_batch 한 번에 받을 최대 이미지 수
+
+# 전처리 설정 (true: 축소 디코딩 fast path, false: torchvision 기본 파이프라인)
+PREPROCESS_FAST = os.getenv("PREPROCESS_FAST", "true").lower() == "true"
+
+# 로컬 전송 설정 (앱 서버와 같은 호스트일 때 Unix socket + 공유 메모리 사용, 비어 있으면 비활성)
+LOCAL_TRANSPORT_SOCKET = os.getenv("LOCAL_TRANSPORT_SOCKET", "")
+LOCAL_TRANSPORT_SLOTS = int(os.getenv("LOCAL_TRANSPORT_SLOTS", 32))  # 연결별 ring buffer 슬롯 수
+LOCAL_TRANSPORT_SLOT_MB = int(os.getenv("LOCAL_TRANSPORT_SLOT_MB", 8))  # 슬롯 크기 (이보다 큰 이미지는 HTTP 사용)
+
+# 실행기 설정
+S3_IO_THREADS = int(os.getenv("S3_IO_THREADS", 8))  # S3 다운로드용 스레드 수
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 2))  # 추론 워커 프로세스 수 (0이면 현재 프로세스에서 실행)
+TORCH_THREADS_PER_WORKER = int(os.getenv("TORCH_THREADS_PER_WORKER", 1))  # 워커별 torch intra-op 스레드 수
+TORCH_INTEROP_THREADS_PER_WORKER = int(os.getenv("TORCH_INTEROP_THREADS_PER_WORKER", 1))  # 워커별 torch inter-op 스레드 수
+INFERENCE_START_METHOD = os.getenv("INFERENCE_START_METHOD", "fork")  # fork | spawn | forkserver
@@ -0,0 +1,119 @@
+# executors.py
+# 이벤트 루프를 막지 않도록 블로킹 작업을 전용 실행기로 보낸다
+#  - io_executor: S3 다운로드 등 I/O 작업용 스레드 풀
+#  - inference_executor: 디코딩/전처리/추론용 프로세스 풀 (INFERENCE_WORKERS=0 이면 in-process 스레드)
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+import logging
+
+import backends
+import inference
+from config import (
+    S3_IO_THREADS, INFERENCE_WORKERS, TORCH_THREADS_PER_WORKER,
+    TORCH_INTEROP_THREADS_PER_WORKER, INFERENCE_START_METHOD, MODEL_WEIGHTS_PATH,
+    INFERENCE_BACKEND, MODEL_ARTIFACT_DIR, MODEL_WARMUP_ITERATIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+io_executor: Optional[ThreadPoolExecutor] = None
+inference_executor: Optional[Executor] = None
+
+
+def create_inference_executor(weights_path: str, digest: str, backend: str = INFERENCE_BACKEND) -> Executor:
+    """가중치를 한 번 로드한 뒤 추론 워커 풀을 생성 (digest: 가중치 파일 해시, 모델 캐시/artifact 키)"""
+    worker_args = (
+        weights_path, digest, TORCH_THREADS_PER_WORKER, TORCH_INTEROP_THREADS_PER_WORKER,
+        backend, MODEL_ARTIFACT_DIR, MODEL_WARMUP_ITERATIONS,
+    )
+
+    if INFERENCE_WORKERS <= 0:
+        # 개발 환경 등: 현재 프로세스에서 모델을 로드하고 전용 스레드 하나로 추론
+        inference.init_worker(*worker_args)
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+
+    # fork 방식이면 부모에서 미리 로드한 가중치를 워커가 copy-on-write로 공유
+    # (CUDA는 fork 이후 사용할 수 없고, ONNX Runtime 세션은 fork에 안전하지 않으므로 제외)
+    if INFERENCE_START_METHOD == "fork" and inference.device.type == "cpu" and backend != "onnx":
+        inference.preload(weights_path, digest, backend, MODEL_ARTIFACT_DIR)
+
+    return ProcessPoolExecutor(
+        max_workers=INFERENCE_WORKERS,
+        mp_context=multiprocessing.get_context(INFERENCE_START_METHOD),
+        initializer=inference.init_worker,
+        initargs=worker_args,
+    )
+
+
+def start_executors() -> str:
+    """실행기를 만들고 로드한 가중치 파일 해시를 반환 (레지스트리 활성 버전 등록에 사용)"""
+    global io_executor, inference_executor
+    digest = backends.weights_digest(MODEL_WEIGHTS_PATH)
+    # 프로세스 풀을 스레드 풀보다 먼저 만들어 fork 시점에 불필요한 스레드가 없도록 한다
+    inference_executor = create_inference_executor(MODEL_WEIGHTS_PATH, digest)
+    io_executor = ThreadPoolExecutor(max_workers=S3_IO_THREADS, thread_name_prefix="s3-io")
+    logger.info(
+        f"Executors started (io_threads={S3_IO_THREADS}, inference_workers={INFERENCE_WORKERS}, "
+        f"torch_threads_per_worker={TORCH_THREADS_PER_WORKER}, backend={INFERENCE_BACKEND})"
+    )
+    return digest
+
+
+def shutdown_executors():
+    global io_executor, inference_executor
+    if inference_executor:
+        inference_executor.shutdown(wait=True, cancel_futures=True)
+        inference_executor = None
+    if io_executor:
+        io_executor.shutdown(wait=True, cancel_futures=True)
+        io_executor = None
+
+
+def retire_executor(executor: Executor):
+    """교체된 추론 풀 종료 (이미 제출된 작업은 끝까지 처리)"""
+    executor.shutdown(wait=True, cancel_futures=False)
+
+
+async def run_io(func, *args, **kwargs):
+    """I/O 스레드 풀에서 블로킹 함수를 실행"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, functools.partial(func, *args, **kwargs))
+
+
+async def run_inference(func, *args):
+    """추론 워커 풀에서 함수를 실행 (프로세스 풀이면 인자/결과는 pickle 가능해야 함)"""
+    return await run_on(inference_executor, func, *args)
+
+
+async def run_on(executor: Executor, func, *args):
+    """지정한 추론 풀에서 함수를 실행 (레지스트리의 후보 버전 등)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
+
+
+async def wait_for_workers(timeout: float, executor: Optional[Executor] = None) -> list:
+    """추론 워커를 모두 기동시키고 (initializer: 모델 로드 + warmup) 워커별 상태를 반환
+
+    ProcessPoolExecutor는 첫 작업이 제출될 때 워커를 만들기 때문에,
+    상태 조회 작업을 워커 수만큼 보내 모든 워커의 initializer가 끝날 때까지 기다린다.
+    """
+    expected = max(1, INFERENCE_WORKERS)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    statuses = {}
+
+    while len(statuses) < expected:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise TimeoutError(f"Only {len(statuses)}/{expected} inference workers became ready in {timeout}s")
+        results = await asyncio.wait_for(
+            asyncio.gather(*(run_on(executor or inference_executor, inference.worker_status, 0.05) for _ in range(expected))),
+            remaining,
+        )
+        for status in results:
+            statuses[status["pid"]] = status
+
+    return list(statuses.values())
@@ -0,0 +1,99 @@
+# export_model.py
+# 추론 백엔드용 artifact 생성 (TorchScript, ONNX, 정적 int8 양자화)
+# 결과물은 <out-dir>/<가중치 해시>/ 에 저장된다 (교체용 가중치도 버전마다 따로 export)
+#
+# 사용 예:
+#   python export_model.py --backends torchscript onnx
+#   python export_model.py --backends static_int8 --calib-dir ./calib_images --calib-size 200
+#   python export_model.py --weights models/candidate.pth --backends onnx
+import argparse
+import os
+import random
+import time
+import logging
+
+import torch
+
+import backends
+import inference
+from config import MODEL_WEIGHTS_PATH, MODEL_ARTIFACT_DIR
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def export_torchscript(model: torch.nn.Module, out_path: str):
+    scripted = backends.to_torchscript(model)
+    torch.jit.save(scripted, out_path)
+
+
+def export_onnx(model: torch.nn.Module, out_path: str, opset: int):
+    example = torch.randn(*backends.INPUT_SHAPE)
+    torch.onnx.export(
+        model,
+        example,
+        out_path,
+        input_names=["input"],
+        output_names=["logits"],
+        dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},  # 배치 크기 가변
+        opset_version=opset,
+        do_constant_folding=True,
+    )
+
+
+def load_calibration_batches(calib_dir: str, calib_size: int, batch_size: int, seed: int):
+    """calibration 이미지 폴더에서 최대 calib_size 장을 골라 배치 텐서 목록으로 반환"""
+    paths = [path for path, _ in backends.list_image_files(calib_dir)]
+    if not paths:
+        raise SystemExit(f"No images found in {calib_dir}")
+    random.Random(seed).shuffle(paths)
+    paths = paths[:calib_size]
+
+    tensors = [backends.load_tensor(path) for path in paths]
+    return [torch.stack(tensors[i:i + batch_size]) for i in range(0, len(tensors), batch_size)]
+
+
+def export_static_int8(model: torch.nn.Module, out_path: str, calib_dir: str, calib_size: int, batch_size: int, seed: int):
+    batches = load_calibration_batches(calib_dir, calib_size, batch_size, seed)
+    logger.info(f"Calibrating static int8 model with {sum(len(b) for b in batches)} images")
+    quantized = backends.quantize_static_int8(model, batches)
+    torch.jit.save(quantized, out_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export optimized CPU inference artifacts for the model service")
+    parser.add_argument("--weights", default=MODEL_WEIGHTS_PATH, help="state_dict 가중치 경로")
+    parser.add_argument("--out-dir", default=MODEL_ARTIFACT_DIR, help="artifact 저장 경로")
+    parser.add_argument("--backends", nargs="+", default=["torchscript", "onnx"],
+                        choices=list(backends.ARTIFACT_FILES), help="생성할 artifact 종류")
+    parser.add_argument("--calib-dir", help="정적 양자화 calibration 이미지 폴더")
+    parser.add_argument("--calib-size", type=int, default=200, help="calibration에 사용할 최대 이미지 수")
+    parser.add_argument("--calib-batch-size", type=int, default=16)
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if "static_int8" in args.backends and not args.calib_dir:
+        parser.error("--calib-dir is required for static_int8")
+
+    digest = backends.weights_digest(args.weights)
+    os.makedirs(os.path.join(args.out_dir, digest), exist_ok=True)
+
+    for backend in args.backends:
+        # 변환 과정에서 모델이 수정될 수 있으므로 백엔드마다 새로 로드
+        model = inference.load_model(args.weights).cpu()
+        out_path = backends.artifact_path(args.out_dir, backend, digest)
+        started = time.perf_counter()
+
+        if backend == "torchscript":
+            export_torchscript(model, out_path)
+        elif backend == "onnx":
+            export_onnx(model, out_path, args.opset)
+        elif backend == "static_int8":
+            export_static_int8(model, out_path, args.calib_dir, args.calib_size, args.calib_batch_size, args.seed)
+
+        logger.info(f"Exported {backend} -> {out_path} ({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# inference.py
+# 추론 워커 프로세스에서 실행되는 코드 (모델 로드, 이미지 디코딩, 배치 추론)
+from io import BytesIO
+from typing import List, Union
+import logging
+import os
+import time
+
+import torch
+import torchvision.models as models
+from torchvision import transforms
+from PIL import Image, UnidentifiedImageError
+
+import backends
+import preprocessing
+import shm
+from preprocessing import InvalidImageError
+from config import (
+    PREPROCESS_FAST, BATCH_MAX_SIZE, PREDICTION_TOP_K, MODEL_LOAD_MMAP,
+    CASCADE_ENABLED, CASCADE_WEIGHTS_PATH, CASCADE_THRESHOLD,
+)
+
+logger = logging.getLogger(__name__)
+
+# device 설정 (CUDA 사용 가능 여부 확인)
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# 이미지 전처리 정의
+preprocess = transforms.Compose([
+    transforms.Resize(256),
+    transforms.CenterCrop(224),
+    transforms.ToTensor(),
+    transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+])
+
+# 워커 프로세스(또는 in-process 모드)에서 사용하는 모델 (backends.load_backend 결과)
+_model = None
+_backend = "eager"
+
+# cascade 1단계 모델 (CASCADE_ENABLED일 때만 로드, 항상 eager로 실행)
+_small_model = None
+
+# fork 이전 부모 프로세스에서 미리 로드한 모델 ((가중치 파일 해시, 백엔드) -> 모델)
+# fork된 워커는 이 메모리를 copy-on-write로 공유하므로 가중치를 다시 읽지 않는다
+# (같은 경로에 새 가중치를 덮어써도 해시가 달라 이전 모델을 재사용하지 않는다)
+_preloaded = {}
+
+# 이 프로세스의 기동 단계별 소요 시간 (ms)
+startup_timings = {}
+
+# 워커별로 재사용하는 배치 입력 버퍼 (fast path 전처리 결과를 바로 기록)
+_buffer = None
+
+
+def build_model() -> torch.nn.Module:
+    # 모델 정의 및 클래스 수 맞추기 (10개의 클래스로 설정)
+    model = models.mobilenet_v3_large(weights=None)  # Pretrained 가중치를 사용하지 않음
+    model.classifier[3] = torch.nn.Linear(in_features=1280, out_features=10)  # 분류기의 출력 크기 조정
+    return model
+
+
+def build_small_model() -> torch.nn.Module:
+    # cascade 1단계용 작은 모델 (같은 10개 클래스)
+    model = models.mobilenet_v3_small(weights=None)
+    model.classifier[3] = torch.nn.Linear(in_features=1024, out_features=10)
+    return model
+
+
+def load_state_dict(weights_path: str) -> dict:
+    """가중치 파일을 읽는다 (MODEL_LOAD_MMAP이면 파일을 메모리에 복사하지 않고 mmap으로 매핑)"""
+    if MODEL_LOAD_MMAP:
+        try:
+            return torch.load(weights_path, map_location="cpu", mmap=True, weights_only=True)
+        except RuntimeError as e:
+            # zip 이전의 구형 직렬화 포맷은 mmap을 지원하지 않는다
+            logger.warning(f"mmap load failed for {weights_path}, falling back to a regular load: {e}")
+    return torch.load(weights_path, map_location="cpu", weights_only=True)
+
+
+def load_model(weights_path: str, builder=build_model, timing_key: str = "load_weights_ms") -> torch.nn.Module:
+    """가중치를 로드하고 평가 모드로 전환한 모델을 반환"""
+    started = time.perf_counter()
+    model = builder()
+    state_dict = load_state_dict(weights_path)
+    if device.type == "cpu":
+        # mmap된 텐서를 그대로 파라미터로 사용 (복사 없음, 워커 프로세스 간 page cache 공유)
+        model.load_state_dict(state_dict, assign=True)
+    else:
+        model.load_state_dict(state_dict)
+        model = model.to(device)
+    model.eval()
+    startup_timings[timing_key] = round((time.perf_counter() - started) * 1000, 1)
+    return model
+
+
+def preload(weights_path: str, digest: str, backend: str = "eager", artifact_dir: str = "artifacts"):
+    """부모 프로세스에서 모델을 한 번 로드해 둔다 (fork 시 워커와 공유)"""
+    global _model, _backend
+    key = (digest, backend)
+    if key not in _preloaded:
+        _preloaded[key] = backends.load_backend(backend, weights_path, artifact_dir, digest=digest)
+    _model, _backend = _preloaded[key], backend
+    load_cascade_model()
+    return _model
+
+
+def release(digest: str, backend: str):
+    """교체된 버전의 미리 로드한 모델을 부모 프로세스에서 해제"""
+    global _model
+    model = _preloaded.pop((digest, backend), None)
+    if model is not None and _model is model:
+        _model = None
+
+
+def load_cascade_model():
+    """CASCADE_ENABLED이면 1단계 작은 모델을 로드 (fork 이전에 로드된 경우 재사용)"""
+    global _small_model
+    if not CASCADE_ENABLED:
+        return None
+    key = (CASCADE_WEIGHTS_PATH, "cascade")
+    if key not in _preloaded:
+        _preloaded[key] = load_model(CASCADE_WEIGHTS_PATH, build_small_model, "load_cascade_weights_ms")
+    _small_model = _preloaded[key]
+    return _small_model
+
+
+def warmup(iterations: int, batch_sizes=(1, BATCH_MAX_SIZE)):
+    """더미 입력으로 forward pass를 실행해 커널 초기화/메모리 할당을 첫 요청 전에 끝낸다"""
+    if _model is None or iterations <= 0:
+        return
+    started = time.perf_counter()
+    with torch.no_grad():
+        for batch_size in sorted(set(batch_sizes)):
+            batch = torch.zeros((batch_size, 3, preprocessing.CROP_SIZE, preprocessing.CROP_SIZE))
+            if _backend == "eager":
+                batch = batch.to(device)
+            for _ in range(iterations):
+                _model(batch)
+                if _small_model is not None:
+                    _small_model(batch.to(device))
+    startup_timings["warmup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def worker_status(hold_seconds: float = 0.0) -> dict:
+    """워커 상태 조회 (hold_seconds 동안 잡고 있어 여러 워커에 고르게 분배되도록 한다)"""
+    if hold_seconds > 0:
+        time.sleep(hold_seconds)
+    return {
+        "pid": os.getpid(), "backend": _backend, "model_loaded": _model is not None,
+        "cascade_loaded": _small_model is not None, **startup_timings,
+    }
+
+
+def init_worker(weights_path: str, digest: str, torch_threads: int, interop_threads: int = 0,
+                backend: str = "eager", artifact_dir: str = "artifacts", warmup_iterations: int = 0):
+    """ProcessPoolExecutor initializer: 워커별 torch 스레드 수 설정, 모델 준비 및 warmup"""
+    global _model, _backend
+    started = time.perf_counter()
+
+    if torch_threads > 0:
+        torch.set_num_threads(torch_threads)
+    if interop_threads > 0:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            # 이미 병렬 작업이 시작된 경우 변경 불가
+            pass
+
+    # fork로 생성된 경우 부모가 로드한 모델을 그대로 사용, spawn인 경우 새로 로드
+    _model = _preloaded.get((digest, backend))
+    if _model is None:
+        _model = backends.load_backend(backend, weights_path, artifact_dir, torch_threads, digest)
+    _backend = backend
+    load_cascade_model()
+
+    warmup(warmup_iterations)
+    startup_timings["worker_init_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(
+        f"Inference worker ready (pid={os.getpid()}, backend={backend}, threads={torch.get_num_threads()}, "
+        f"timings={startup_timings})"
+    )
+
+
+def decode_image(image_data: bytes) -> Image.Image:
+    try:
+        img = Image.open(BytesIO(image_data))
+        # 이미지를 RGB 형식으로 변환
+        return img.convert('RGB')
+    except (UnidentifiedImageError, OSError):
+        raise InvalidImageError("Invalid image format.")
+
+
+def _prepare_batch(images: list, results: list):
+    """이미지를 디코딩/전처리해 배치 텐서를 만들고, 성공한 이미지의 위치 목록을 함께 반환
+
+    images 항목은 이미지 바이트 또는 공유 메모리 슬롯 참조(shm.ShmRef)이다.
+    """
+    global _buffer
+    positions = []
+
+    if PREPROCESS_FAST:
+        # 축소 디코딩 후 미리 할당된 버퍼에 바로 기록 (중간 PIL 복사본, torch.stack 복사 없음)
+        if _buffer is None:
+            _buffer = preprocessing.BatchBuffer(max(BATCH_MAX_SIZE, len(images)))
+        _buffer.ensure(len(images))
+        for i, item in enumerate(images):
+            try:
+                preprocessing.preprocess_into(shm.read(item), _buffer.array[len(positions)])
+                positions.append(i)
+            except (InvalidImageError, FileNotFoundError) as e:
+                # FileNotFoundError: 연결 종료로 공유 메모리 segment가 이미 해제된 경우
+                results[i] = e
+        return _buffer.tensor[:len(positions)], positions
+
+    tensors = []
+    for i, item in enumerate(images):
+        try:
+            tensors.append(preprocess(decode_image(shm.read(item))))
+            positions.append(i)
+        except (InvalidImageError, FileNotFoundError) as e:
+            results[i] = e
+    return (torch.stack(tensors) if tensors else None), positions
+
+
+def _top_k_results(outputs: torch.Tensor, top_k: int) -> List[dict]:
+    """logits -> 이미지별 {category_id, confidence, top_k: [{category_id, confidence}, ...]}"""
+    probabilities = torch.softmax(outputs.float(), dim=1)
+    confidences, categories = torch.topk(probabilities, min(top_k, probabilities.shape[1]), dim=1)
+
+    results = []
+    for row_confidences, row_categories in zip(confidences.tolist(), categories.tolist()):
+        candidates = [
+            {"category_id": category_id, "confidence": round(confidence, 4)}
+            for category_id, confidence in zip(row_categories, row_confidences)
+        ]
+        results.append({**candidates[0], "top_k": candidates})
+    return results
+
+
+def _run_large(batch: torch.Tensor) -> torch.Tensor:
+    if _backend == "eager":
+        batch = batch.to(device)
+    return _model(batch).float().cpu()
+
+
+def run_batch_with_stats(images: List[bytes], top_k: int = PREDICTION_TOP_K):
+    """run_batch와 같지만 단계별 통계 {images, escalated, large_images, small_ms, large_ms}를 함께 반환
+
+    cascade가 켜져 있으면 작은 모델로 배치 전체를 먼저 분류하고,
+    softmax 최댓값이 CASCADE_THRESHOLD 미만인 이미지만 모아 큰 모델로 다시 분류한다.
+    각 결과의 stage 필드는 최종 결과를 낸 모델("small" | "large")이다.
+    """
+    if _model is None:
+        raise RuntimeError("Model is not loaded in this worker")
+
+    results: List[Union[dict, Exception]] = [None] * len(images)
+    batch, positions = _prepare_batch(images, results)
+    stats = {"images": len(positions), "escalated": 0, "large_images": 0, "small_ms": 0.0, "large_ms": 0.0}
+    if not positions:
+        return results, stats
+
+    with torch.no_grad():
+        if _small_model is not None:
+            started = time.perf_counter()
+            outputs = _small_model(batch.to(device)).float().cpu()
+            stats["small_ms"] = (time.perf_counter() - started) * 1000
+
+            confidence = torch.softmax(outputs, dim=1).max(dim=1).values
+            escalate = (confidence < CASCADE_THRESHOLD).nonzero().flatten()
+            stages = ["small"] * len(positions)
+            if len(escalate):
+                started = time.perf_counter()
+                outputs[escalate] = _run_large(batch.index_select(0, escalate))
+                stats["large_ms"] = (time.perf_counter() - started) * 1000
+                stats["escalated"] = stats["large_images"] = len(escalate)
+                for j in escalate.tolist():
+                    stages[j] = "large"
+        else:
+            started = time.perf_counter()
+            outputs = _run_large(batch)
+            stats["large_ms"] = (time.perf_counter() - started) * 1000
+            stats["large_images"] = len(positions)
+            stages = ["large"] * len(positions)
+
+    for i, prediction, stage in zip(positions, _top_k_results(outputs, max(1, top_k)), stages):
+        prediction["stage"] = stage
+        results[i] = prediction
+
+    return results, stats
+
+
+def run_batch(images: List[bytes], top_k: int = PREDICTION_TOP_K) -> List[Union[dict, Exception]]:
+    """이미지 바이트 리스트를 디코딩/전처리 후 한 번의 forward pass로 분류
+
+    이미지마다 softmax 확률 상위 top_k 개 클래스를 반환한다.
+    디코딩에 실패한 이미지는 결과 자리에 예외 객체를 넣어 해당 요청만 실패시킨다.
+    """
+    return run_batch_with_stats(images, top_k)[0]
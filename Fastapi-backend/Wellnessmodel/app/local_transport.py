@@ -0,0 +1,119 @@
+# local_transport.py
+# 같은 호스트의 앱 서버용 로컬 전송 경로 (Unix domain socket + 공유 메모리 ring buffer)
+#
+# 연결마다 서버가 공유 메모리 ring(slots x slot_size)을 만들고 handshake로 이름을 알려준다.
+#  1) 클라이언트는 빈 슬롯에 이미지 바이트를 쓰고 제어 프레임(request_id, slot, length, top_k)만 소켓으로 보낸다
+#  2) 서버는 슬롯 참조(shm.ShmRef)를 그대로 배치 큐에 넣고, 추론 워커가 공유 메모리에서 직접 읽는다
+#  3) 응답 프레임(request_id, JSON 길이) + JSON({"status_code", "body"})을 돌려주면 클라이언트가 슬롯을 반납한다
+# 이미지 바이트는 HTTP 본문 파싱, multipart 인코딩, 워커 pickle 어디에서도 복사되지 않는다.
+import asyncio
+import json
+import os
+import struct
+import uuid
+from multiprocessing import shared_memory
+from typing import Awaitable, Callable, Optional, Tuple
+import logging
+
+from shm import ShmRef
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+# 요청: request_id(u32), slot(u32), length(u32), top_k(u8, 0이면 기본값)
+REQUEST_FRAME = struct.Struct("!IIIB")
+# 응답: request_id(u32), JSON 길이(u32)
+RESPONSE_FRAME = struct.Struct("!II")
+
+Handler = Callable[[ShmRef, Optional[int]], Awaitable[Tuple[int, dict]]]
+
+
+class LocalTransportServer:
+    def __init__(self, socket_path: str, handler: Handler, slots: int, slot_size: int):
+        self.socket_path = socket_path
+        self.handler = handler
+        self.slots = slots
+        self.slot_size = slot_size
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.connections = 0
+        self.requests = 0
+
+    async def start(self):
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        if os.path.exists(self.socket_path):
+            # 이전 프로세스가 남긴 소켓 파일
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path)
+        logger.info(f"Local transport listening on {self.socket_path} "
+                    f"(slots={self.slots}, slot_size={self.slot_size})")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        segment = shared_memory.SharedMemory(
+            name=f"wellness-{uuid.uuid4().hex[:16]}", create=True, size=self.slots * self.slot_size,
+        )
+        self.connections += 1
+        pending = set()
+        write_lock = asyncio.Lock()
+
+        async def respond(request_id: int, status_code: int, body: dict):
+            payload = json.dumps({"status_code": status_code, "body": body}).encode()
+            async with write_lock:
+                writer.write(RESPONSE_FRAME.pack(request_id, len(payload)) + payload)
+                await writer.drain()
+
+        async def process(request_id: int, slot: int, length: int, top_k: int):
+            if slot >= self.slots or length > self.slot_size:
+                await respond(request_id, 400, {"detail": "Invalid slot or length."})
+                return
+            ref = ShmRef(segment.name, slot * self.slot_size, length)
+            try:
+                status_code, body = await self.handler(ref, top_k or None)
+            except Exception as e:
+                status_code, body = 500, {"detail": f"Server Error: {str(e)}"}
+            try:
+                await respond(request_id, status_code, body)
+            except ConnectionError:
+                # 클라이언트가 먼저 연결을 끊은 경우
+                pass
+
+        try:
+            handshake = {
+                "version": PROTOCOL_VERSION, "shm_name": segment.name,
+                "slots": self.slots, "slot_size": self.slot_size,
+            }
+            writer.write(json.dumps(handshake).encode() + b"\n")
+            await writer.drain()
+
+            while True:
+                frame = await reader.readexactly(REQUEST_FRAME.size)
+                self.requests += 1
+                task = asyncio.create_task(process(*REQUEST_FRAME.unpack(frame)))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            # 처리 중인 요청이 슬롯을 다 읽을 때까지 기다린 뒤 segment 해제
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            writer.close()
+            segment.close()
+            segment.unlink()
+            self.connections -= 1
+
+    def stats(self) -> dict:
+        return {
+            "socket_path": self.socket_path,
+            "connections": self.connections,
+            "requests": self.requests,
+            "slots": self.slots,
+            "slot_size": self.slot_size,
+        }
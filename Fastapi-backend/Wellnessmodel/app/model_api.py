@@ -1,15 +1,30 @@
 # model_api.py
-from fastapi import FastAPI, HTTPException
-from torchvision import transforms
-from PIL import Image, UnidentifiedImageError
-import torch
+import time
+IMPORT_STARTED = time.perf_counter()  # import 소요 시간 측정 (torch 등 무거운 모듈 포함)
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
 import boto3
-from io import BytesIO
 import os
+import hmac
 import botocore
 from urllib.parse import urlparse
 import logging  
-import torchvision.models as models
+import asyncio
+from typing import List, Optional
+from batching import MicroBatcher, QueueFullError
+from cascade import CascadeStats
+from registry import ModelRegistry, RegistryError
+from local_transport import LocalTransportServer
+import shm
+from config import (
+    BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, BATCH_MAX_QUEUE, INFERENCE_WORKERS, PREDICT_BATCH_MAX_IMAGES,
+    MODEL_STARTUP_TIMEOUT, MODEL_WEIGHTS_PATH, MODEL_VERSION, MODEL_ADMIN_TOKEN, LOG_LEVEL,
+    LOCAL_TRANSPORT_SOCKET, LOCAL_TRANSPORT_SLOTS, LOCAL_TRANSPORT_SLOT_MB,
+)
+import executors
+import inference
+from inference import InvalidImageError
 
 
 os.environ['KMP_DUPLICATE_LIB_OK']='True'
@@ -19,33 +34,13 @@ app = FastAPI()
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
-# s3 클라이언트 설정
-s3_client = boto3.client('s3')
-
-# 모델 정의 및 클래스 수 맞추기 (8개의 클래스로 설정)
-model = models.mobilenet_v3_large(weights=None)  # Pretrained 가중치를 사용하지 않음
-model.classifier[3] = torch.nn.Linear(in_features=1280, out_features=10)  # 분류기의 출력 크기 조정
-
-# device 설정 (CUDA 사용 가능 여부 확인)
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-
-# 모델을 장치에 할당
-model = model.to(device)
-
-# 저장된 가중치 로드
-best_model_path = 'KJSmodelTest_0921.pth'
-model.load_state_dict(torch.load(best_model_path, map_location=device))
+# import 소요 시간 (로깅 설정 전이므로 기록만 하고 startup에서 출력)
+import_ms = round((time.perf_counter() - IMPORT_STARTED) * 1000, 1)
 
-# 평가 모드로 전환
-model.eval()
+# s3 클라이언트 설정 (boto3 클라이언트는 스레드 간 공유 가능)
+s3_client = boto3.client('s3')
 
-# 이미지 전처리 정의
-preprocess = transforms.Compose([
-    transforms.Resize(256),
-    transforms.CenterCrop(224),
-    transforms.ToTensor(),
-    transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
-])
+# 모델 로드, 전처리, 추론은 inference.py에서 추론 워커가 수행
 
 # S3 URI를 읽고 모델 분류
 
@@ -69,7 +64,8 @@ preprocess = transforms.Compose([
 #     except Exception as e:
 #         raise HTTPException(status_code=500, detail=f"Error fetching image from S3: {str(e)}")
 
-def get_image_from_s3(s3_url: str):
+def get_image_bytes_from_s3(s3_url: str) -> bytes:
+    """S3에서 이미지 바이트를 내려받는다 (디코딩은 추론 워커에서 수행)"""
     try:
         # URL 파싱 (s3:// 또는 https:// 모두 처리)
         parsed_url = urlparse(s3_url)
@@ -90,15 +86,7 @@ def get_image_from_s3(s3_url: str):
         
         # S3에서 객체 다운로드
         response = s3_client.get_object(Bucket=bucket_name, Key=key)
-        image_data = response['Body'].read()
-        
-        # 이미지 로드
-        try:
-            img = Image.open(BytesIO(image_data))
-        except UnidentifiedImageError:
-            raise HTTPException(status_code=400, detail="Invalid image format.")
-        
-        return img
+        return response['Body'].read()
     
     except botocore.exceptions.ClientError as e:
         error_code = e.response['Error']['Code']
@@ -108,30 +96,324 @@ def get_image_from_s3(s3_url: str):
             raise HTTPException(status_code=500, detail=f"Error fetching image from S3: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
-    
-@app.post("/predict_url/")
-async def predict_url(image_url: str):
+
+
+# cascade(작은 모델 -> 큰 모델) 단계별 통계
+cascade_stats = CascadeStats()
+
+
+# 버전별 모델 레지스트리 (후보 로드 -> shadow 비교 -> promote)
+model_registry = ModelRegistry()
+
+
+# 이미지 바이트 묶음을 추론 워커에서 디코딩/전처리 후 한 번의 forward pass로 분류
+async def predict_images(images: List[bytes]) -> list:
+    started = time.perf_counter()
+    results, batch_stats = await executors.run_inference(inference.run_batch_with_stats, images)
+    cascade_stats.record(batch_stats)
+    # 후보 버전이 준비되어 있으면 일부 배치를 shadow로 실행 (응답은 기다리지 않음)
+    # 로컬 전송 슬롯은 응답 후 재사용되므로 shadow용으로 바이트를 복사해 둔다
+    if model_registry.wants_shadow():
+        model_registry.start_shadow(
+            inference.run_batch_with_stats, [shm.materialize(item) for item in images],
+            results, (time.perf_counter() - started) * 1000,
+        )
+    return results
+
+
+# 동시 요청을 모아 배치 추론하는 큐
+# 워커 수만큼 배치를 동시에 실행할 수 있다
+batcher = MicroBatcher(
+    predict_images,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    max_queue_size=BATCH_MAX_QUEUE,
+    max_concurrent_batches=max(1, INFERENCE_WORKERS),
+)
+
+
+# 기동 단계 상태 (/readyz 응답에 사용)
+startup_state = {"ready": False, "stage": "starting", "error": None, "timings": {"import_ms": import_ms}, "workers": []}
+startup_task: Optional[asyncio.Task] = None
+
+
+async def run_startup_stages():
+    """모델 로드 -> 워커 기동 및 warmup 순서로 준비하고 단계별 소요 시간을 기록"""
+    timings = startup_state["timings"]
     try:
-        # S3에서 이미지 가져오기
-        img = get_image_from_s3(image_url)
+        # 1) 실행기 생성 (fork 방식이면 부모 프로세스에서 가중치 mmap 로드)
+        startup_state["stage"] = "load_model"
+        started = time.perf_counter()
+        weights_digest = await asyncio.to_thread(executors.start_executors)
+        timings["load_model_ms"] = round((time.perf_counter() - started) * 1000, 1)
 
-        # 이미지를 RGB 형식으로 변환
-        img = img.convert('RGB')
+        # 2) 워커 프로세스 기동 + warmup forward pass
+        startup_state["stage"] = "start_workers"
+        started = time.perf_counter()
+        startup_state["workers"] = await executors.wait_for_workers(MODEL_STARTUP_TIMEOUT)
+        timings["start_workers_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        await asyncio.to_thread(
+            model_registry.register_active, MODEL_VERSION, MODEL_WEIGHTS_PATH, weights_digest,
+            workers=startup_state["workers"],
+        )
 
-        # 전처리 적용
-        img_tensor = preprocess(img).unsqueeze(0)
+        timings["total_ms"] = round((time.perf_counter() - IMPORT_STARTED) * 1000, 1)
+        startup_state["stage"] = "ready"
+        startup_state["ready"] = True
+        logger.info(f"Model service ready: {timings}")
+    except Exception as e:
+        startup_state["stage"] = "failed"
+        startup_state["error"] = str(e)
+        logger.error(f"Model service startup failed at {timings}: {e}")
 
-        # 모델 예측
-        with torch.no_grad():
-            outputs = model(img_tensor)
-            _, predicted = torch.max(outputs, 1)
-        
-        return {"category_id": predicted.item()}
-    
+
+async def handle_local_request(ref: shm.ShmRef, top_k: Optional[int]):
+    """로컬 전송(Unix socket + 공유 메모리) 요청 처리: /predict_bytes/ 와 같은 결과와 상태 코드"""
+    try:
+        return 200, await classify_bytes(ref, top_k)
+    except HTTPException as e:
+        return e.status_code, {"detail": e.detail}
+
+
+# 같은 호스트의 앱 서버용 로컬 전송 서버 (LOCAL_TRANSPORT_SOCKET 설정 시)
+local_transport = LocalTransportServer(
+    LOCAL_TRANSPORT_SOCKET, handle_local_request, LOCAL_TRANSPORT_SLOTS, LOCAL_TRANSPORT_SLOT_MB * 1024 * 1024,
+) if LOCAL_TRANSPORT_SOCKET else None
+
+
+@app.on_event("startup")
+async def startup():
+    global startup_task
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logger.info(f"model_api imported in {startup_state['timings']['import_ms']}ms")
+    await batcher.start()
+    if local_transport:
+        await local_transport.start()
+    # 모델 준비는 백그라운드에서 진행 (그동안 /healthz는 응답하고 /readyz는 503)
+    startup_task = asyncio.create_task(run_startup_stages())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    if startup_task and not startup_task.done():
+        startup_task.cancel()
+    if local_transport:
+        await local_transport.stop()
+    await batcher.stop()
+    await model_registry.close()
+    executors.shutdown_executors()
+
+
+def ensure_ready():
+    if not startup_state["ready"]:
+        raise HTTPException(status_code=503, detail=f"Model is not ready (stage: {startup_state['stage']}).")
+
+
+def select_top_k(prediction: dict, top_k: Optional[int]) -> dict:
+    """요청한 후보 수만큼 top_k 목록을 자른다 (워커는 PREDICTION_TOP_K 개까지 계산)"""
+    if top_k is None:
+        return prediction
+    return {**prediction, "top_k": prediction["top_k"][:max(1, top_k)]}
+
+
+# 이미지 바이트(또는 공유 메모리 슬롯 참조)를 배치 큐에 넣고 분류 결과를 반환 (예외는 HTTP 응답으로 변환)
+async def classify_bytes(image_data, top_k: Optional[int] = None) -> dict:
+    ensure_ready()
+    try:
+        # 배치 큐를 통해 추론 워커에서 디코딩, 전처리, 모델 예측
+        prediction = await batcher.submit(image_data)
+        return select_top_k(prediction, top_k)
+
+    except InvalidImageError:
+        raise HTTPException(status_code=400, detail="Invalid image format.")
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail="Inference queue is full. Please retry later.")
     except Exception as e:
         # 다른 모든 예외 처리
         raise HTTPException(status_code=500, detail=f"Server Error: {str(e)}")
 
+
+@app.post("/predict_url/")
+async def predict_url(image_url: str, top_k: Optional[int] = None):
+    ensure_ready()
+    try:
+        # S3에서 이미지 가져오기 (I/O 스레드 풀)
+        image_data = await executors.run_io(get_image_bytes_from_s3, image_url)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Server Error: {str(e)}")
+
+    return await classify_bytes(image_data, top_k)
+
+
+# 이미지 바이트를 직접 받아 분류 (S3 왕복 없음)
+# multipart/form-data의 file 필드 또는 raw body(application/octet-stream, image/*) 모두 지원
+@app.post("/predict_bytes/")
+async def predict_bytes(request: Request, top_k: Optional[int] = None):
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Multipart field 'file' is required.")
+        image_data = await upload.read()
+    else:
+        image_data = await request.body()
+
+    if not image_data:
+        raise HTTPException(status_code=400, detail="Empty image body.")
+
+    return await classify_bytes(image_data, top_k)
+
+
+def item_error(error: Exception) -> dict:
+    """배치 요청의 개별 이미지 실패를 응답 항목으로 변환"""
+    if isinstance(error, HTTPException):
+        return {"error": error.detail, "status_code": error.status_code}
+    if isinstance(error, InvalidImageError):
+        return {"error": "Invalid image format.", "status_code": 400}
+    return {"error": f"Server Error: {str(error)}", "status_code": 500}
+
+
+# 여러 이미지를 한 번에 분류 (배치 큐에 함께 넣어 가능한 한 같은 forward pass로 처리)
+# - application/json: {"image_urls": ["s3://...", "https://..."]}
+# - multipart/form-data: files 필드 여러 개
+# 실패한 이미지는 해당 항목에만 error/status_code를 넣고 나머지 결과는 정상 반환
+@app.post("/predict_batch/")
+async def predict_batch(request: Request, top_k: Optional[int] = None):
+    ensure_ready()
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        uploads = [upload for upload in form.getlist("files") if not isinstance(upload, str)]
+        count = len(uploads)
+    elif content_type.startswith("application/json"):
+        body = await request.json()
+        image_urls = body.get("image_urls") if isinstance(body, dict) else None
+        if not isinstance(image_urls, list) or not all(isinstance(url, str) for url in image_urls):
+            raise HTTPException(status_code=400, detail="'image_urls' must be a list of strings.")
+        count = len(image_urls)
+    else:
+        raise HTTPException(status_code=415, detail="Use multipart/form-data (files) or application/json (image_urls).")
+
+    if count == 0:
+        raise HTTPException(status_code=400, detail="No images provided.")
+    if count > PREDICT_BATCH_MAX_IMAGES:
+        raise HTTPException(status_code=400, detail=f"Too many images (max {PREDICT_BATCH_MAX_IMAGES}).")
+
+    # 이미지 바이트 준비 (URL은 I/O 스레드 풀에서 동시에 다운로드)
+    if content_type.startswith("multipart/form-data"):
+        sources = await asyncio.gather(*(upload.read() for upload in uploads))
+    else:
+        sources = await asyncio.gather(
+            *(executors.run_io(get_image_bytes_from_s3, url) for url in image_urls),
+            return_exceptions=True,
+        )
+
+    predictions: list = [None] * count
+    images, positions = [], []
+    for i, source in enumerate(sources):
+        if isinstance(source, Exception):
+            predictions[i] = item_error(source)
+        elif not source:
+            predictions[i] = {"error": "Empty image body.", "status_code": 400}
+        else:
+            images.append(source)
+            positions.append(i)
+
+    if images:
+        # 배치 큐를 통해 처리 (큐 길이 제한과 동시 배치 수 제한을 다른 요청과 함께 적용)
+        # 이미지 전체가 들어갈 자리가 없으면 하나도 넣지 않고 503
+        try:
+            results = await batcher.submit_many(images)
+        except QueueFullError:
+            raise HTTPException(status_code=503, detail="Inference queue is full. Please retry later.")
+        for i, result in zip(positions, results):
+            predictions[i] = item_error(result) if isinstance(result, BaseException) else select_top_k(result, top_k)
+
+    return {"predictions": predictions}
+
+# liveness: 프로세스가 살아 있으면 200 (모델 준비 여부와 무관)
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+# readiness: 모델 로드와 워커 warmup이 끝난 뒤에만 200 (그 전에는 트래픽을 받지 않도록 503)
+@app.get("/readyz")
+async def readyz():
+    body = {
+        "status": "ready" if startup_state["ready"] else "not_ready",
+        "stage": startup_state["stage"],
+        "timings": startup_state["timings"],
+        "workers": startup_state["workers"],
+        "model_version": model_registry.active.version if model_registry.active else None,
+    }
+    if startup_state["error"]:
+        body["error"] = startup_state["error"]
+    return JSONResponse(body, status_code=200 if startup_state["ready"] else 503)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    # 토큰이 설정되지 않았으면 관리 API를 열지 않는다 (가중치 로드/교체가 가능하므로 fail closed)
+    if not MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Model admin API is disabled (MODEL_ADMIN_TOKEN is not set).")
+    # 비교 시간으로 토큰을 추측할 수 없도록 상수 시간 비교
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), MODEL_ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+
+
+# 모델 버전 상태 조회 (활성/후보 버전, shadow 비교 결과, 교체 이력)
+@app.get("/models", dependencies=[Depends(require_admin)])
+async def list_models():
+    return model_registry.stats()
+
+
+# 후보 버전 로드 시작 (가중치 파일은 MODEL_REGISTRY_DIR 기준 상대 경로)
+# body: {"weights": "KJSmodel_1001.pth", "version": "2024-10-01", "backend": "eager", "shadow_percent": 5}
+@app.post("/models/candidate", status_code=202, dependencies=[Depends(require_admin)])
+async def load_candidate(request: Request):
+    body = await request.json()
+    if not isinstance(body, dict) or not isinstance(body.get("weights"), str):
+        raise HTTPException(status_code=400, detail="'weights' is required.")
+    try:
+        candidate = await model_registry.load_candidate(
+            body["weights"], body.get("version"), body.get("backend"), body.get("shadow_percent"),
+        )
+    except RegistryError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return candidate.info()
+
+
+# 준비된 후보 버전을 활성 버전으로 교체 (진행 중인 요청은 이전 버전 풀에서 끝까지 처리)
+@app.post("/models/promote", dependencies=[Depends(require_admin)])
+async def promote_candidate():
+    try:
+        active = await model_registry.promote()
+    except RegistryError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return active.info()
+
+
+@app.delete("/models/candidate", dependencies=[Depends(require_admin)])
+async def discard_candidate():
+    try:
+        await model_registry.discard_candidate()
+    except RegistryError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "discarded"}
+
+
+# 배치 큐 상태 조회 (큐 길이, 배치 크기 분포 등)
+@app.get("/stats")
+async def stats():
+    return {
+        "batcher": batcher.stats(),
+        "cascade": cascade_stats.stats(),
+        "local_transport": local_transport.stats() if local_transport else None,
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
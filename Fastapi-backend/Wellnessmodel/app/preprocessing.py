@@ -0,0 +1,107 @@
+# preprocessing.py
+# 축소 디코딩(reduce-on-decode) 기반 전처리 fast path
+#
+# 기존 파이프라인(Resize(256) -> CenterCrop(224) -> ToTensor -> Normalize)과 같은 결과를 내면서
+#  1) JPEG는 draft 모드로 DCT 단계에서 1/2, 1/4, 1/8로 줄여 디코딩하고 (PNG 등은 reduce 사용)
+#  2) Resize + CenterCrop을 원본 좌표계의 crop box를 사용한 한 번의 resize로 합치고
+#  3) 정규화 결과를 미리 할당된 배치 텐서 버퍼에 바로 기록한다
+from io import BytesIO
+import math
+
+import numpy as np
+import torch
+from PIL import Image, UnidentifiedImageError
+
+RESIZE_SIZE = 256
+CROP_SIZE = 224
+
+# uint8 픽셀 기준 평균/표준편차 (ToTensor의 /255 를 함께 처리)
+_MEAN = (np.array([0.485, 0.456, 0.406], dtype=np.float32) * 255).reshape(3, 1, 1)
+_INV_STD = (1.0 / (np.array([0.229, 0.224, 0.225], dtype=np.float32) * 255)).reshape(3, 1, 1)
+
+
+class InvalidImageError(Exception):
+    """이미지 디코딩에 실패했을 때 발생 (워커 -> 부모로 pickle 되어 전달됨)"""
+
+
+def open_reduced(image_data: bytes) -> Image.Image:
+    """짧은 변이 RESIZE_SIZE 이상으로 유지되는 범위에서 최대한 줄여서 디코딩"""
+    try:
+        img = Image.open(BytesIO(image_data))
+        width, height = img.size
+        scale = RESIZE_SIZE / min(width, height)
+
+        if scale < 1:
+            requested = (math.ceil(width * scale), math.ceil(height * scale))
+            if img.format == "JPEG":
+                # 요청 크기 이상을 유지하는 가장 큰 DCT 축소 비율로 디코딩
+                img.draft("RGB", requested)
+            else:
+                factor = min(width // requested[0], height // requested[1])
+                if factor > 1:
+                    img = img.reduce(factor)
+
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        return img
+    except (UnidentifiedImageError, OSError, ValueError, ZeroDivisionError):
+        raise InvalidImageError("Invalid image format.")
+
+
+def crop_box(width: int, height: int):
+    """Resize(256) + CenterCrop(224)에 해당하는 영역을 현재 이미지 좌표로 계산"""
+    # torchvision Resize: 짧은 변을 256으로, 긴 변은 int(256 * long / short)
+    if width <= height:
+        resized_w, resized_h = RESIZE_SIZE, int(RESIZE_SIZE * height / width)
+    else:
+        resized_w, resized_h = int(RESIZE_SIZE * width / height), RESIZE_SIZE
+
+    # torchvision CenterCrop 오프셋
+    top = int(round((resized_h - CROP_SIZE) / 2.0))
+    left = int(round((resized_w - CROP_SIZE) / 2.0))
+
+    sx, sy = width / resized_w, height / resized_h
+    return (left * sx, top * sy, (left + CROP_SIZE) * sx, (top + CROP_SIZE) * sy)
+
+
+def preprocess_into(image_data: bytes, out: np.ndarray):
+    """이미지를 디코딩/전처리하여 (3, 224, 224) float32 버퍼에 정규화된 값을 기록"""
+    img = open_reduced(image_data)
+    try:
+        cropped = img.resize((CROP_SIZE, CROP_SIZE), Image.BILINEAR, box=crop_box(*img.size))
+    except OSError:
+        # 잘린(truncated) 파일은 실제 디코딩 시점에 실패한다
+        raise InvalidImageError("Invalid image format.")
+
+    pixels = np.asarray(cropped, dtype=np.uint8)  # (224, 224, 3)
+    # HWC -> CHW 로 바로 버퍼에 쓰고 제자리(in-place) 정규화
+    np.copyto(out, pixels.transpose(2, 0, 1), casting="unsafe")
+    out -= _MEAN
+    out *= _INV_STD
+
+
+def preprocess_fast(image_data: bytes) -> torch.Tensor:
+    """단일 이미지용 (3, 224, 224) 텐서 반환"""
+    tensor = torch.empty((3, CROP_SIZE, CROP_SIZE), dtype=torch.float32)
+    preprocess_into(image_data, tensor.numpy())
+    return tensor
+
+
+class BatchBuffer:
+    """배치 간에 재사용하는 (N, 3, 224, 224) 입력 텐서 버퍼
+
+    torch 텐서와 numpy 배열이 같은 메모리를 공유하므로 전처리 결과가 복사 없이 모델 입력이 된다.
+    워커 하나가 배치를 순차적으로 처리하므로 워커당 버퍼 하나면 충분하다.
+    """
+
+    def __init__(self, capacity: int):
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        self.capacity = capacity
+        self.tensor = torch.empty((capacity, 3, CROP_SIZE, CROP_SIZE), dtype=torch.float32)
+        self.array = self.tensor.numpy()
+
+    def ensure(self, size: int):
+        if size > self.capacity:
+            self._allocate(size)
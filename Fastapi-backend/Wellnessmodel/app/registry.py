@@ -0,0 +1,260 @@
+# registry.py
+# 버전별 모델 레지스트리 (무중단 가중치 교체 + shadow 트래픽 비교)
+#
+#  - 버전마다 전용 추론 워커 풀을 가진다 (워커 initializer에서 가중치 로드 + warmup)
+#  - 후보 버전은 백그라운드에서 로드/warmup 후 준비되면 promote로 활성 버전과 교체한다
+#    (executors.inference_executor 참조를 한 번에 바꾸므로 이후 요청은 새 풀로 간다)
+#  - 교체된 풀은 이미 제출된 작업을 끝까지 처리한 뒤 종료된다 (진행 중인 요청 유실 없음)
+#  - shadow_percent > 0 이면 활성 버전 요청 일부를 후보 버전에도 보내 지연 시간/예측 일치율을 비교한다
+import asyncio
+import os
+import random
+import statistics
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import List, Optional
+import logging
+
+import executors
+import inference
+from backends import weights_digest
+from config import (
+    INFERENCE_WORKERS, INFERENCE_BACKEND, MODEL_REGISTRY_DIR, MODEL_SHADOW_PERCENT, MODEL_STARTUP_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RegistryError(Exception):
+    """레지스트리 상태상 요청을 처리할 수 없을 때 발생 (HTTP 409로 변환)"""
+
+
+class ModelVersion:
+    def __init__(self, version: str, weights_path: str, digest: str, backend: str):
+        self.version = version
+        self.weights_path = weights_path
+        self.digest = digest  # 로드한 가중치 파일 해시 (모델 캐시/artifact 키)
+        self.backend = backend
+        self.state = "loading"  # loading | ready | failed | retired
+        self.error: Optional[str] = None
+        self.executor: Optional[Executor] = None
+        self.workers: list = []
+        self.load_ms: Optional[float] = None
+        self.created_at = time.time()
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "weights_path": self.weights_path,
+            "digest": self.digest,
+            "backend": self.backend,
+            "state": self.state,
+            "error": self.error,
+            "load_ms": self.load_ms,
+            "workers": self.workers,
+        }
+
+
+class ShadowStats:
+    """활성 버전 대비 후보 버전의 예측 일치율/지연 시간 (최근 window개 배치 기준)"""
+
+    def __init__(self, window: int = 1000):
+        self.images = 0
+        self.agreed = 0
+        self.errors = 0
+        self.skipped = 0
+        self.active_ms = deque(maxlen=window)
+        self.candidate_ms = deque(maxlen=window)
+
+    def record(self, active_results: list, candidate_results: list, active_ms: float, candidate_ms: float):
+        self.active_ms.append(active_ms)
+        self.candidate_ms.append(candidate_ms)
+        for active, candidate in zip(active_results, candidate_results):
+            if isinstance(active, Exception) or isinstance(candidate, Exception):
+                continue
+            self.images += 1
+            self.agreed += active["category_id"] == candidate["category_id"]
+
+    def stats(self) -> dict:
+        def p50(values):
+            return round(statistics.median(values), 2) if values else None
+
+        return {
+            "images": self.images,
+            "agreement": round(self.agreed / self.images, 4) if self.images else None,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "active_batch_ms_p50": p50(self.active_ms),
+            "candidate_batch_ms_p50": p50(self.candidate_ms),
+        }
+
+
+class ModelRegistry:
+    def __init__(self, registry_dir: str = MODEL_REGISTRY_DIR, shadow_percent: float = MODEL_SHADOW_PERCENT):
+        self.registry_dir = os.path.abspath(registry_dir)
+        self.shadow_percent = shadow_percent
+        self.active: Optional[ModelVersion] = None
+        self.candidate: Optional[ModelVersion] = None
+        self.history: List[dict] = []
+        self.shadow = ShadowStats()
+        self._shadow_tasks = set()
+        self._load_task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # 실행 중인 이벤트 루프에서 생성 (Python 3.9 호환)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def resolve_weights(self, weights: str) -> str:
+        """레지스트리 디렉터리 밖의 파일은 허용하지 않는다"""
+        path = os.path.abspath(os.path.join(self.registry_dir, weights))
+        if os.path.commonpath([path, self.registry_dir]) != self.registry_dir:
+            raise RegistryError("Weights file must be inside the model registry directory.")
+        if not os.path.isfile(path):
+            raise RegistryError(f"Weights file not found: {weights}")
+        return path
+
+    def register_active(self, version: str, weights_path: str, digest: str,
+                        backend: str = INFERENCE_BACKEND, workers=None):
+        """기동 시 만들어진 추론 풀을 첫 활성 버전으로 등록"""
+        active = ModelVersion(version or digest, weights_path, digest, backend)
+        active.executor = executors.inference_executor
+        active.workers = workers or []
+        active.state = "ready"
+        self.active = active
+        logger.info(f"Active model version: {active.version} ({weights_path})")
+
+    async def _load(self, candidate: ModelVersion):
+        started = time.perf_counter()
+        try:
+            candidate.executor = await asyncio.to_thread(
+                executors.create_inference_executor, candidate.weights_path, candidate.digest, candidate.backend,
+            )
+            candidate.workers = await executors.wait_for_workers(MODEL_STARTUP_TIMEOUT, candidate.executor)
+            candidate.load_ms = round((time.perf_counter() - started) * 1000, 1)
+            if self.candidate is not candidate:
+                # 로드 중에 폐기/교체된 후보
+                await self._retire(candidate)
+                return
+            candidate.state = "ready"
+            logger.info(f"Candidate model {candidate.version} ready in {candidate.load_ms}ms")
+        except Exception as e:
+            candidate.state = "failed"
+            candidate.error = str(e)
+            logger.error(f"Candidate model {candidate.version} failed to load: {e}")
+            await self._retire(candidate)
+
+    async def load_candidate(self, weights: str, version: Optional[str] = None,
+                             backend: Optional[str] = None, shadow_percent: Optional[float] = None) -> ModelVersion:
+        """후보 버전 로드를 시작한다 (전용 워커 풀 생성 + warmup은 백그라운드에서 진행)"""
+        if INFERENCE_WORKERS <= 0:
+            # in-process 모드는 모델이 프로세스 전역이라 두 버전을 동시에 둘 수 없다
+            raise RegistryError("Hot swap requires INFERENCE_WORKERS >= 1.")
+
+        async with self._get_lock():
+            if self.candidate is not None and self.candidate.state == "loading":
+                raise RegistryError(f"Candidate {self.candidate.version} is still loading.")
+            weights_path = self.resolve_weights(weights)
+            if self.candidate is not None:
+                await self._retire(self.candidate)
+
+            digest = await asyncio.to_thread(weights_digest, weights_path)
+            candidate = ModelVersion(version or digest, weights_path, digest, backend or self.active.backend)
+            self.candidate = candidate
+            self.shadow = ShadowStats()
+            if shadow_percent is not None:
+                self.shadow_percent = max(0.0, min(100.0, shadow_percent))
+
+        self._load_task = asyncio.create_task(self._load(candidate))
+        return candidate
+
+    async def promote(self) -> ModelVersion:
+        """준비된 후보를 활성 버전으로 교체하고 이전 버전 풀을 정리"""
+        async with self._get_lock():
+            candidate = self.candidate
+            if candidate is None or candidate.state != "ready":
+                raise RegistryError("No ready candidate to promote.")
+
+            previous = self.active
+            executors.inference_executor = candidate.executor
+            self.active, self.candidate = candidate, None
+            self.history.append({
+                "version": candidate.version,
+                "previous": previous.version if previous else None,
+                "promoted_at": time.time(),
+                "shadow": self.shadow.stats(),
+            })
+            logger.info(f"Promoted model {candidate.version} (previous: {previous.version if previous else None})")
+
+        if previous is not None:
+            asyncio.create_task(self._retire(previous))
+        return candidate
+
+    async def discard_candidate(self):
+        async with self._get_lock():
+            candidate, self.candidate = self.candidate, None
+        if candidate is None:
+            raise RegistryError("No candidate to discard.")
+        await self._retire(candidate)
+
+    async def _retire(self, version: ModelVersion):
+        if version.state != "failed":
+            version.state = "retired"
+        executor, version.executor = version.executor, None
+        if executor is not None:
+            await asyncio.to_thread(executors.retire_executor, executor)
+        inference.release(version.digest, version.backend)
+
+    def wants_shadow(self) -> bool:
+        """이번 배치를 후보 버전에서도 실행할지 결정 (shadow_percent 확률)"""
+        candidate = self.candidate
+        if candidate is None or candidate.state != "ready" or self.shadow_percent <= 0:
+            return False
+        if random.uniform(0, 100) >= self.shadow_percent:
+            return False
+        if len(self._shadow_tasks) >= max(1, INFERENCE_WORKERS):
+            # 후보 풀이 밀려 있으면 shadow를 건너뛴다 (운영 트래픽 보호)
+            self.shadow.skipped += 1
+            return False
+        return True
+
+    def start_shadow(self, func, images: list, active_results: list, active_ms: float):
+        """활성 버전 결과가 나온 뒤 같은 배치를 후보 버전에서 실행 (응답 지연 없음)"""
+        candidate = self.candidate
+        if candidate is None or candidate.executor is None:
+            return
+
+        executor = candidate.executor
+
+        async def run():
+            started = time.perf_counter()
+            try:
+                candidate_results = await executors.run_on(executor, func, images)
+            except Exception as e:
+                self.shadow.errors += 1
+                logger.warning(f"Shadow inference failed on {candidate.version}: {e}")
+                return
+            candidate_results = candidate_results[0] if isinstance(candidate_results, tuple) else candidate_results
+            self.shadow.record(active_results, candidate_results, active_ms, (time.perf_counter() - started) * 1000)
+
+        task = asyncio.create_task(run())
+        self._shadow_tasks.add(task)
+        task.add_done_callback(self._shadow_tasks.discard)
+
+    async def close(self):
+        """종료 시 후보 버전 풀 정리 (활성 버전 풀은 executors.shutdown_executors에서 종료)"""
+        if self.candidate is not None:
+            candidate, self.candidate = self.candidate, None
+            await self._retire(candidate)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active.info() if self.active else None,
+            "candidate": self.candidate.info() if self.candidate else None,
+            "shadow_percent": self.shadow_percent,
+            "shadow": self.shadow.stats(),
+            "history": self.history[-10:],
+        }
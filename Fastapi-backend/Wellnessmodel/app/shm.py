@@ -0,0 +1,47 @@
+# shm.py
+# 공유 메모리 ring buffer 슬롯 참조 (로컬 전송 경로에서 이미지 바이트를 복사/pickle 없이 워커에 전달)
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import NamedTuple, Union
+
+# 워커가 동시에 열어 둘 공유 메모리 segment 수 (연결이 바뀌면 오래된 것부터 닫는다)
+MAX_ATTACHED_SEGMENTS = 8
+
+_segments: "OrderedDict[str, shared_memory.SharedMemory]" = OrderedDict()
+
+
+class ShmRef(NamedTuple):
+    """공유 메모리 segment 안의 이미지 위치 (pickle 시 수십 바이트)"""
+    name: str
+    offset: int
+    length: int
+
+
+def _get_segment(name: str) -> shared_memory.SharedMemory:
+    segment = _segments.get(name)
+    if segment is None:
+        # 추론 워커는 segment를 만든 모델 서비스 프로세스와 같은 resource tracker를 공유하므로
+        # 여기서 등록 해제하지 않는다 (unlink는 local_transport 서버가 연결 종료 시 수행)
+        segment = shared_memory.SharedMemory(name=name)
+        _segments[name] = segment
+        while len(_segments) > MAX_ATTACHED_SEGMENTS:
+            _, stale = _segments.popitem(last=False)
+            try:
+                stale.close()
+            except BufferError:
+                pass
+    else:
+        _segments.move_to_end(name)
+    return segment
+
+
+def read(item: Union[bytes, ShmRef]) -> Union[bytes, memoryview]:
+    """이미지 바이트 또는 공유 메모리 슬롯 참조를 바이트 버퍼로 변환 (슬롯은 복사하지 않고 memoryview 반환)"""
+    if isinstance(item, ShmRef):
+        return _get_segment(item.name).buf[item.offset:item.offset + item.length]
+    return item
+
+
+def materialize(item: Union[bytes, ShmRef]) -> bytes:
+    """슬롯이 재사용된 뒤에도 쓸 수 있도록 바이트로 복사 (shadow 실행 등)"""
+    return bytes(read(item)) if isinstance(item, ShmRef) else item
@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+
+from batching import MicroBatcher, QueueFullError
+
+
+class RecordingHandler:
+    """호출된 배치를 기록하고 입력을 두 배로 돌려주는 handler"""
+
+    def __init__(self, delay: float = 0.0):
+        self.batches = []
+        self.delay = delay
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return [item * 2 for item in items]
+
+
+@pytest.fixture
+async def make_batcher():
+    batchers = []
+
+    async def factory(handler, **kwargs):
+        batcher = MicroBatcher(handler, **kwargs)
+        await batcher.start()
+        batchers.append(batcher)
+        return batcher
+
+    yield factory
+    for batcher in batchers:
+        await batcher.stop()
+
+
+async def test_flushes_when_batch_is_full(make_batcher):
+    handler = RecordingHandler()
+    # 대기 시간이 길어도 max_batch_size가 차면 바로 처리
+    batcher = await make_batcher(handler, max_batch_size=4, max_wait_ms=5000)
+
+    results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(4))), 1)
+
+    assert results == [0, 2, 4, 6]
+    assert handler.batches == [[0, 1, 2, 3]]
+
+
+async def test_flushes_partial_batch_after_max_wait(make_batcher):
+    handler = RecordingHandler()
+    batcher = await make_batcher(handler, max_batch_size=16, max_wait_ms=20)
+
+    results = await asyncio.wait_for(asyncio.gather(batcher.submit(1), batcher.submit(2)), 1)
+
+    assert results == [2, 4]
+    assert handler.batches == [[1, 2]]
+    assert batcher.stats()["batch_size_histogram"] == {2: 1}
+
+
+async def test_splits_requests_larger_than_batch_size(make_batcher):
+    handler = RecordingHandler()
+    batcher = await make_batcher(handler, max_batch_size=2, max_wait_ms=20)
+
+    results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(5))), 1)
+
+    assert results == [0, 2, 4, 6, 8]
+    assert [len(batch) for batch in handler.batches] == [2, 2, 1]
+
+
+async def test_item_exception_fails_only_that_request(make_batcher):
+    async def handler(items):
+        return [ValueError("bad image") if item < 0 else item for item in items]
+
+    batcher = await make_batcher(handler, max_wait_ms=10)
+    ok, failed = await asyncio.gather(batcher.submit(3), batcher.submit(-1), return_exceptions=True)
+
+    assert ok == 3
+    assert isinstance(failed, ValueError)
+
+
+async def test_handler_error_fails_whole_batch(make_batcher):
+    async def handler(items):
+        raise RuntimeError("model crashed")
+
+    batcher = await make_batcher(handler, max_wait_ms=10)
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+async def test_result_count_mismatch_fails_batch(make_batcher):
+    async def handler(items):
+        return items[:-1]
+
+    batcher = await make_batcher(handler, max_wait_ms=10)
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+async def test_stop_fails_queued_requests():
+    handler = RecordingHandler(delay=0.2)
+    batcher = MicroBatcher(handler, max_batch_size=1, max_wait_ms=0, max_queue_size=8)
+    await batcher.start()
+
+    first = asyncio.ensure_future(batcher.submit(1))
+    second = asyncio.ensure_future(batcher.submit(2))
+    await asyncio.sleep(0.05)
+    await batcher.stop()
+
+    # 실행 중이던 배치는 끝까지 처리하고, 대기 중이던 요청은 실패
+    assert await first == 2
+    with pytest.raises(RuntimeError):
+        await second
+
+
+async def test_submit_before_start_raises():
+    batcher = MicroBatcher(RecordingHandler())
+    with pytest.raises(RuntimeError):
+        await batcher.submit(1)
+
+
+async def test_submit_many_returns_results_in_order(make_batcher):
+    handler = RecordingHandler()
+    batcher = await make_batcher(handler, max_batch_size=3, max_wait_ms=10)
+
+    results = await asyncio.wait_for(batcher.submit_many([1, 2, 3, 4]), 1)
+
+    assert results == [2, 4, 6, 8]
+    assert [len(batch) for batch in handler.batches] == [3, 1]
+
+
+async def test_submit_many_returns_item_errors_in_place(make_batcher):
+    async def handler(items):
+        return [ValueError("bad image") if item < 0 else item for item in items]
+
+    batcher = await make_batcher(handler, max_wait_ms=10)
+    results = await batcher.submit_many([1, -1, 2])
+
+    assert results[0] == 1 and results[2] == 2
+    assert isinstance(results[1], ValueError)
+
+
+async def test_submit_many_rejects_whole_request_when_queue_is_short():
+    handler = RecordingHandler()
+    batcher = MicroBatcher(handler, max_queue_size=3)
+    await batcher.start()
+    try:
+        with pytest.raises(QueueFullError):
+            await batcher.submit_many([1, 2, 3, 4])
+        # 하나도 큐에 넣지 않는다
+        assert batcher.stats()["queue_depth"] == 0
+        assert batcher.rejected_requests == 4
+        assert await asyncio.wait_for(batcher.submit_many([1, 2, 3]), 1) == [2, 4, 6]
+    finally:
+        await batcher.stop()